@@ -0,0 +1,137 @@
+"""
+Prompt Registry — versioned, cache-friendly system prompts
+
+Server-side prompt caching (Azure OpenAI / OpenAI) only reuses work when
+consecutive requests share a byte-identical prompt *prefix*.  The registry
+assembles each agent's system prompt once, with the static parts first
+(role instructions, then grounding), normalises whitespace so the bytes
+never drift, and content-hashes the result.
+
+Each ``PromptRecord`` exposes:
+  - ``sha256``     — full content hash (cache key / telemetry attribute)
+  - ``version``    — ``<name>@<hash12>``, bumped automatically on any edit
+  - ``revision``   — how many distinct versions this process has seen
+
+Usage:
+    registry = get_prompt_registry()
+    record = registry.register("Creator", CREATOR_INSTRUCTIONS, grounding_block)
+    agent = Agent(client=client, name="Creator", instructions=record.text)
+    span.set_attribute("agent.prompt_version", record.version)
+"""
+
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+@dataclass(frozen=True)
+class PromptRecord:
+    """An assembled, immutable system prompt."""
+    name: str
+    text: str
+    sha256: str
+    revision: int = 1
+
+    @property
+    def version(self) -> str:
+        return f"{self.name}@{self.sha256[:12]}"
+
+    @property
+    def cache_key(self) -> str:
+        """Stable key suitable for provider prompt-cache routing."""
+        return f"zava-{self.name.lower()}-{self.sha256[:16]}"
+
+    @property
+    def estimated_tokens(self) -> int:
+        return len(self.text) // 4
+
+
+def _normalise(part: str) -> str:
+    """Normalise line endings and trailing whitespace so bytes never drift."""
+    lines = part.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip("\n")
+
+
+def assemble_prompt(*parts: str) -> str:
+    """Join static prompt parts (in order) into one normalised prompt."""
+    return "\n\n".join(_normalise(p) for p in parts if p and p.strip())
+
+
+class PromptRegistry:
+    """
+    Process-wide registry of assembled agent prompts.
+
+    Registering identical content again returns the existing record without
+    re-hashing; changed content creates a new revision.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._records: Dict[str, PromptRecord] = {}
+        self._history: Dict[str, List[str]] = {}
+        # (name, parts) → record, so re-registering the same parts is free
+        self._by_parts: Dict[tuple, PromptRecord] = {}
+
+    def register(self, name: str, *parts: str) -> PromptRecord:
+        """Assemble *parts* (static first) into the system prompt for *name*."""
+        key = (name, parts)
+        with self._lock:
+            cached = self._by_parts.get(key)
+            if cached is not None and self._records.get(name) is cached:
+                return cached
+
+            text = assemble_prompt(*parts)
+            digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+            current = self._records.get(name)
+            if current is not None and current.sha256 == digest:
+                self._by_parts[key] = current
+                return current
+
+            history = self._history.setdefault(name, [])
+            history.append(digest)
+            record = PromptRecord(
+                name=name, text=text, sha256=digest, revision=len(history),
+            )
+            self._records[name] = record
+            self._by_parts = {
+                k: v for k, v in self._by_parts.items() if k[0] != name
+            }
+            self._by_parts[key] = record
+            return record
+
+    def get(self, name: str) -> Optional[PromptRecord]:
+        """Return the current record for *name*, if registered."""
+        return self._records.get(name)
+
+    def versions(self) -> Dict[str, str]:
+        """Map of agent name → current prompt version (for telemetry)."""
+        return {name: rec.version for name, rec in self._records.items()}
+
+
+_registry = PromptRegistry()
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """Return the process-wide prompt registry."""
+    return _registry
+
+
+def cached_prompt_ratio(usage) -> Optional[float]:
+    """
+    Fraction of prompt tokens served from the provider's prompt cache.
+
+    Reads the ``UsageDetails`` mapping produced by the agent-framework
+    OpenAI clients (``prompt/cached_tokens`` for Chat Completions,
+    ``openai.cached_input_tokens`` for Responses).  Returns ``None`` when
+    the provider did not report usage.
+    """
+    if not usage:
+        return None
+    get = usage.get if hasattr(usage, "get") else lambda k, d=None: getattr(usage, k, d)
+    prompt_tokens = get("input_token_count") or 0
+    if not prompt_tokens:
+        return None
+    cached = get("prompt/cached_tokens") or get("openai.cached_input_tokens") or 0
+    return cached / prompt_tokens
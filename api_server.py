@@ -9,12 +9,14 @@ Usage:
     uvicorn api_server:app --reload          # dev mode with auto-reload
 """
 
+import asyncio
+import json
 import os
 import re
 import sys
 from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List, Optional
+from typing import Awaitable, Callable, List, Optional
 
 from dotenv import load_dotenv
 
@@ -26,11 +28,11 @@ validate_environment()
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from azure.identity import DefaultAzureCredential
 from agent_framework import Agent
-from agent_framework.azure import AzureOpenAIChatClient
 from agent_framework_orchestrations import GroupChatBuilder
 
 try:
@@ -38,16 +40,26 @@ try:
 except ImportError:
     GitHubCopilotAgent = None
 
-from agents.creator import CREATOR_INSTRUCTIONS
-from agents.reviewer import REVIEWER_INSTRUCTIONS
-from agents.publisher import PUBLISHER_INSTRUCTIONS
+from agents.prompt_registry import get_prompt_registry
 from orchestration.speaker_selection import speaker_selector
 from orchestration.termination import should_terminate
+from orchestration.context_policy import build_context_middleware
+from orchestration.model_router import build_model_routing_middleware
+from orchestration.draft_sampling import build_draft_sampling_middleware, get_draft_sampler, review_outcome
+from orchestration.review_cache import build_review_cache_middleware, get_review_cache
+from orchestration.llm_client import create_chat_client, llm_mode
+from orchestration.upstream import get_upstreams
+from orchestration.deployment_pool import get_deployment_pool
+from orchestration.post_stream import PlatformPost, PostStreamParser
 from grounding.file_search import create_grounded_agent
+from grounding.brand_registry import get_brand_registry
+from grounding.fact_index import get_fact_index
+from grounding.pitfall_memory import pitfall_section, record_transcript
 from tools.filesystem_mcp import get_filesystem_tools, _cleanup_gateway
 from monitoring import configure_tracing, get_tracer, AgentTelemetryMiddleware
 from opentelemetry import trace
-from safety import ContentSafetyShield
+from safety import ContentSafetyShield, check_claims
+from safety.stream_guard import build_stream_guard_middleware, get_stream_guard
 
 # Initialise observability
 configure_tracing()
@@ -123,44 +135,11 @@ REASONING_PATTERNS = {
 
 def parse_platform_posts(publisher_text: str) -> dict:
     """Extract individual platform posts from Publisher's output."""
+    parser = PostStreamParser()
+    parser.feed(publisher_text)
+    parser.close()
     posts = {"linkedin": "", "twitter": "", "instagram": ""}
-
-    # Split by horizontal rules (--- or more dashes)
-    sections = re.split(r"\n-{3,}\s*\n", publisher_text)
-
-    for section in sections:
-        s = section.strip()
-
-        # LinkedIn
-        if "**LINKEDIN POST**" in s and not posts["linkedin"]:
-            content = re.sub(
-                r".*?\*\*LINKEDIN POST\*\*\s*\n?", "", s,
-                count=1, flags=re.DOTALL,
-            )
-            content = re.split(r"\n\s*\*\*Reflection", content, maxsplit=1)[0]
-            posts["linkedin"] = content.strip()
-
-        # X / Twitter
-        elif re.search(r"\*\*X/?TWITTER POST\*\*", s) and not posts["twitter"]:
-            content = re.sub(
-                r".*?\*\*X/?TWITTER POST\*\*\s*\n?", "", s,
-                count=1, flags=re.DOTALL,
-            )
-            content = re.split(
-                r"\n\s*\*\*(?:Character count|Reflection)", content, maxsplit=1,
-            )[0]
-            posts["twitter"] = content.strip()
-
-        # Instagram
-        elif "**INSTAGRAM POST**" in s and not posts["instagram"]:
-            content = re.sub(
-                r".*?\*\*INSTAGRAM POST\*\*\s*\n?", "", s,
-                count=1, flags=re.DOTALL,
-            )
-            content = re.split(r"\n\s*\*\*Reflection", content, maxsplit=1)[0]
-            # Strip [Image: …] visual-suggestion line
-            content = re.sub(r"\n\[Image:.*?\]", "", content, flags=re.DOTALL)
-            posts["instagram"] = content.strip()
+    posts.update((platform, post.text) for platform, post in parser.posts.items())
 
     # Fallback: raw text if parsing failed
     if not any(posts.values()):
@@ -207,54 +186,72 @@ def consolidate_messages(messages) -> list:
 # ============================================================================
 
 async def generate_campaign_images(
-    brand_name: str, destinations: str, key_message: str,
+    brand_name: str, destinations: str, key_message: str, visual: str = "",
 ) -> GeneratedImages:
-    """Generate campaign images using Azure OpenAI gpt-image-1.5."""
+    """Generate campaign images using Azure OpenAI gpt-image-1.5.
+
+    *visual* is the Publisher's ``[Image: …]`` suggestion from the Instagram
+    post, when there is one; it is added to every platform's prompt.
+    """
     try:
-        from openai import AzureOpenAI
-        from azure.identity import get_bearer_token_provider
+        from openai import AsyncAzureOpenAI
+        from azure.identity.aio import DefaultAzureCredential as AsyncDefaultAzureCredential
+        from azure.identity.aio import get_bearer_token_provider
 
         endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
         deployment = os.getenv("AZURE_OPENAI_IMAGE_DEPLOYMENT_NAME", "gpt-image-1.5")
 
-        credential = DefaultAzureCredential()
-        token_provider = get_bearer_token_provider(
-            credential, "https://cognitiveservices.azure.com/.default",
-        )
+        credential = None
+        if os.getenv("AZURE_OPENAI_API_KEY"):
+            auth = {"api_key": os.getenv("AZURE_OPENAI_API_KEY")}
+        else:
+            credential = AsyncDefaultAzureCredential()
+            auth = {"azure_ad_token_provider": get_bearer_token_provider(
+                credential, "https://cognitiveservices.azure.com/.default",
+            )}
 
-        client = AzureOpenAI(
+        # Retries, pacing and the image bulkhead live in the upstream layer
+        client = AsyncAzureOpenAI(
             azure_endpoint=endpoint,
-            azure_ad_token_provider=token_provider,
             api_version="2025-04-01-preview",
+            max_retries=0,
+            **auth,
         )
+        upstream = get_upstreams().get(f"image:{deployment}")
 
         prompts = {
             "linkedin": f"Professional travel photography for LinkedIn: {destinations}. {key_message}. Breathtaking landscape, golden hour, cinematic, 16:9 aspect ratio.",
             "twitter": f"Eye-catching social media image for Twitter: {destinations}. {key_message}. Vibrant colors, adventure travel theme, square crop.",
             "instagram": f"Beautiful Instagram-worthy travel photo: {destinations}. {key_message}. Stunning scenic view, warm tones, lifestyle travel aesthetic.",
         }
+        if visual:
+            prompts = {platform: f"{prompt} Scene: {visual}." for platform, prompt in prompts.items()}
 
-        images = {}
-        for platform, prompt in prompts.items():
+        async def generate(platform: str, prompt: str):
             try:
-                resp = client.images.generate(
+                resp = await upstream.call(lambda: client.images.generate(
                     model=deployment,
                     prompt=prompt,
                     n=1,
                     quality="low",
-                )
+                ))
                 # gpt-image returns base64; build a data URI for the frontend
                 if resp.data[0].b64_json:
-                    images[platform] = f"data:image/png;base64,{resp.data[0].b64_json}"
-                elif resp.data[0].url:
-                    images[platform] = resp.data[0].url
-                else:
-                    images[platform] = None
+                    return f"data:image/png;base64,{resp.data[0].b64_json}"
+                return resp.data[0].url or None
             except Exception as img_err:
                 print(f"\u26a0\ufe0f  gpt-image failed for {platform}: {img_err}")
-                images[platform] = None
+                return None
+
+        # The upstream's concurrency limit decides how many run at once
+        try:
+            results = await asyncio.gather(*(generate(p, prompt) for p, prompt in prompts.items()))
+        finally:
+            await client.close()
+            if credential is not None:
+                await credential.close()
 
-        return GeneratedImages(**images)
+        return GeneratedImages(**dict(zip(prompts, results)))
 
     except ImportError:
         print("\u26a0\ufe0f  openai package not installed \u2014 using placeholder images")
@@ -274,31 +271,61 @@ def _placeholder_images(brand_name: str, destinations: str) -> GeneratedImages:
     )
 
 
-async def run_workflow_api(brief_text: str, content_type: str = "both", brand_name: str = "", destinations: str = "", key_message: str = "") -> WorkflowResult:
-    """Run the full Creator → Reviewer → Publisher workflow."""
+async def run_workflow_api(
+    brief_text: str, content_type: str = "both", brand_name: str = "", destinations: str = "", key_message: str = "",
+    on_post: Optional[Callable[[PlatformPost], Awaitable[None]]] = None,
+) -> WorkflowResult:
+    """Run the full Creator → Reviewer → Publisher workflow.
+
+    The Publisher's text is parsed as it streams: *on_post* is awaited with
+    each platform post the moment it is complete, and image generation
+    starts as soon as the Instagram post (and its visual suggestion) is.
+    """
     print(f"\n{'='*60}")
     print("API: Starting content generation workflow")
     print(f"{'='*60}\n")
 
     credential = DefaultAzureCredential()
-    azure_client = AzureOpenAIChatClient(
-        endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-        credential=credential,
-        deployment_name=os.getenv("AZURE_OPENAI_CHAT_DEPLOYMENT_NAME"),
-    )
+    azure_client = create_chat_client(credential)
+
+    # Agent telemetry middleware for per-agent spans
+    _agent_telemetry = AgentTelemetryMiddleware()
+
+    # --- brand (lazily loaded, LRU-cached) ---
+    brand = get_brand_registry().get(brand_name)
 
     # --- agents ---
     creator = create_grounded_agent(
         client=azure_client,
         name="Creator",
-        instructions=CREATOR_INSTRUCTIONS,
-        brand_guidelines_path="grounding/brand-guidelines.md",
+        instructions=brand.instructions("Creator"),
+        brand_guidelines_path=brand.guidelines_path,
+        brief=brief_text,
+        prompt_name=brand.prompt_name("Creator"),
+        guideline_index=brand.index,
+        pitfalls=pitfall_section(brand.rules),
+        middleware=[
+            *build_model_routing_middleware("Creator", _agent_telemetry, brand.rules),
+            *build_draft_sampling_middleware("Creator", _agent_telemetry, brand.rules, downstream=[
+                *build_context_middleware("Creator", _agent_telemetry),
+                *build_stream_guard_middleware("Creator", _agent_telemetry, brand.rules),
+                _agent_telemetry.usage_middleware("Creator"),
+            ]),
+        ],
+    )
+
+    prompts = get_prompt_registry()
+    reviewer_prompt = prompts.register(
+        brand.prompt_name("Reviewer"), brand.instructions("Reviewer"),
+    )
+    publisher_prompt = prompts.register(
+        brand.prompt_name("Publisher"), brand.instructions("Publisher"),
     )
 
     try:
-        if GitHubCopilotAgent:
+        if GitHubCopilotAgent and llm_mode() == "live":
             reviewer = GitHubCopilotAgent(
-                name="Reviewer", instructions=REVIEWER_INSTRUCTIONS,
+                name="Reviewer", instructions=reviewer_prompt.text,
             )
         else:
             raise ImportError()
@@ -306,15 +333,27 @@ async def run_workflow_api(brief_text: str, content_type: str = "both", brand_na
         reviewer = Agent(
             client=azure_client,
             name="Reviewer",
-            instructions=REVIEWER_INSTRUCTIONS,
+            instructions=reviewer_prompt.text,
+            middleware=[
+                *build_model_routing_middleware("Reviewer", _agent_telemetry, brand.rules),
+                *build_review_cache_middleware("Reviewer", _agent_telemetry),
+                *build_context_middleware("Reviewer", _agent_telemetry),
+                _agent_telemetry.usage_middleware("Reviewer"),
+            ],
         )
 
     filesystem_tools = get_filesystem_tools()
     publisher = Agent(
         client=azure_client,
         name="Publisher",
-        instructions=PUBLISHER_INSTRUCTIONS,
+        instructions=publisher_prompt.text,
         tools=filesystem_tools if filesystem_tools else None,
+        middleware=[
+            *build_model_routing_middleware("Publisher", _agent_telemetry, brand.rules),
+            *build_context_middleware("Publisher", _agent_telemetry),
+            *build_stream_guard_middleware("Publisher", _agent_telemetry, brand.rules),
+            _agent_telemetry.usage_middleware("Publisher"),
+        ],
     )
 
     # --- orchestration ---
@@ -329,27 +368,57 @@ async def run_workflow_api(brief_text: str, content_type: str = "both", brand_na
     start_time = datetime.now()
     messages = []
     current_agent = None
-
-    # Agent telemetry middleware for per-agent spans
-    _agent_telemetry = AgentTelemetryMiddleware()
+    creator_rounds = 0
+    post_parser: Optional[PostStreamParser] = None
+    image_task: Optional[asyncio.Future] = None
+
+    async def post_ready(post: PlatformPost) -> None:
+        nonlocal image_task
+        print(f"  📮 {post.platform} post ready ({len(post.text)} chars)", flush=True)
+        if post.platform == "instagram" and image_task is None and content_type in ("images", "both"):
+            print("🎨 Instagram post ready — generating campaign images...")
+            image_task = asyncio.ensure_future(
+                generate_campaign_images(brand_name, destinations, key_message, visual=post.visual),
+            )
+        if on_post is not None:
+            await on_post(post)
 
     stream = workflow.run(brief_text, stream=True)
-    async for event in stream:
-        if event.type == "group_chat" and event.data is not None:
-            data = event.data
-            participant = getattr(data, "participant_name", None)
-            if participant:
-                _agent_telemetry.on_agent_end(participant)
-                current_agent = None
+    try:
+        async for event in stream:
+            # Streamed agent text arrives as "output" updates; parse the
+            # Publisher's into posts as they complete
+            if event.type == "output" and getattr(event.data, "author_name", None) == "Publisher":
+                post_parser = post_parser or PostStreamParser()
+                for post in post_parser.feed(event.data.text or ""):
+                    await post_ready(post)
                 continue
-            author = getattr(data, "author_name", None) or ""
-            text = getattr(data, "text", None) or ""
-            if author and text:
-                if author != current_agent:
-                    _agent_telemetry.on_agent_start(author)
-                    current_agent = author
-                _agent_telemetry.on_agent_text(text)
-                print(f"  [{author}] {text[:80]}…", flush=True)
+            if event.type == "group_chat" and event.data is not None:
+                data = event.data
+                participant = getattr(data, "participant_name", None)
+                if participant:
+                    _agent_telemetry.on_agent_end(participant)
+                    received = type(data).__name__.endswith("ResponseReceivedEvent")
+                    if participant == "Creator" and received:
+                        creator_rounds += 1
+                    if participant == "Publisher" and received and post_parser is not None:
+                        for post in post_parser.close():
+                            await post_ready(post)
+                        post_parser = None
+                    current_agent = None
+                    continue
+                author = getattr(data, "author_name", None) or ""
+                text = getattr(data, "text", None) or ""
+                if author and text:
+                    if author != current_agent:
+                        _agent_telemetry.on_agent_start(author)
+                        current_agent = author
+                    _agent_telemetry.on_agent_text(text)
+                    print(f"  [{author}] {text[:80]}…", flush=True)
+    except BaseException:
+        if image_task is not None:
+            image_task.cancel()
+        raise
 
     result = await stream.get_final_response()
     outputs = result.get_outputs() if hasattr(result, "get_outputs") else []
@@ -370,6 +439,9 @@ async def run_workflow_api(brief_text: str, content_type: str = "both", brand_na
 
     # --- transform results ---
     turns = consolidate_messages(messages)
+    first_pass, _ = review_outcome((t["name"], t["text"]) for t in turns)
+    get_draft_sampler().record_run(first_pass, creator_rounds)
+    record_transcript(((t["name"], t["text"]) for t in turns), brand.rules)
 
     transcript = [
         AgentMessage(
@@ -399,7 +471,9 @@ async def run_workflow_api(brief_text: str, content_type: str = "both", brand_na
 
     # --- optional image generation ---
     images = None
-    if content_type in ("images", "both"):
+    if image_task is not None:
+        images = await image_task
+    elif content_type in ("images", "both"):
         print("🎨 Generating campaign images...")
         images = await generate_campaign_images(brand_name, destinations, key_message)
 
@@ -446,6 +520,91 @@ async def health():
     return {"status": "ok", "service": "zava-content-api"}
 
 
+@app.get("/api/upstreams")
+async def upstreams():
+    """Pacing, retry, throttle and circuit-breaker state of every upstream."""
+    return get_upstreams().snapshot()
+
+
+@app.get("/api/deployments")
+async def deployments():
+    """Chat deployment pool: health, load and failovers per member, plus hedging."""
+    if llm_mode() in ("fake", "replay"):
+        return {"members": {}, "exhausted": 0}
+    return get_deployment_pool().snapshot()
+
+
+@app.get("/api/drafts")
+async def drafts():
+    """Creator draft sampling: picks, score gains, first-pass approval and rounds per run."""
+    return get_draft_sampler().summary()
+
+
+@app.get("/api/review-cache")
+async def review_cache():
+    """Reviewer verdict cache: entries, hits, misses and hit rate (this worker and all workers)."""
+    return get_review_cache().stats()
+
+
+@app.get("/api/stream-guard")
+async def stream_guard():
+    """Streaming safety guard: turns cut early, regenerations and tokens saved."""
+    return get_stream_guard().snapshot()
+
+
+def _brief_text(brief: CampaignBriefRequest) -> str:
+    return (
+        f"Create social media content for {brief.brand_name}'s campaign.\n\n"
+        f"Brand: {brief.brand_name}\n"
+        f"Industry: {brief.industry}\n"
+        f"Target Audience: {brief.target_audience}\n"
+        f"Key Message: {brief.key_message}\n"
+        f"Destinations: {brief.destinations}\n"
+        f"Tone: Adventurous and inspiring\n"
+        f"Platforms: {', '.join(brief.platforms)}\n"
+    )
+
+
+def _screen_input(brief_text: str) -> None:
+    input_check = _safety_shield.screen_input(brief_text)
+    if not input_check.allowed:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Content safety blocked the request: {input_check.summary}",
+        )
+
+
+def _safety_result(check) -> SafetyCheckResult:
+    return SafetyCheckResult(
+        status=(
+            "blocked" if not check.allowed
+            else "warnings" if check.flags
+            else "passed"
+        ),
+        flags=[f.detail for f in check.flags],
+    )
+
+
+def _screen_output(result: WorkflowResult, brief_text: str, brand_name: str) -> None:
+    """Attach the output safety check (shield + claim check) to *result*."""
+    combined_posts = (
+        f"{result.posts.linkedin}\n"
+        f"{result.posts.twitter}\n"
+        f"{result.posts.instagram}"
+    )
+    brand = get_brand_registry().get(brand_name)
+    output_check = _safety_shield.screen_output(combined_posts, rules=brand.rules)
+
+    # ── Local claim check: prices / destinations / offers vs facts ──
+    facts = get_fact_index(brief_text, brand.guidelines_path, brand.rules)
+    for platform in ("linkedin", "twitter", "instagram"):
+        output_check.flags.extend(
+            check_claims(getattr(result.posts, platform), facts, label=platform)
+        )
+
+    result.safety = _safety_result(output_check)
+
+
 @app.post("/api/generate", response_model=WorkflowResult)
 async def generate(brief: CampaignBriefRequest):
     """Run the multi-agent workflow with the given campaign brief."""
@@ -457,24 +616,10 @@ async def generate(brief: CampaignBriefRequest):
             "workflow.platforms": ", ".join(brief.platforms),
         },
     ):
-        brief_text = (
-            f"Create social media content for {brief.brand_name}'s campaign.\n\n"
-            f"Brand: {brief.brand_name}\n"
-            f"Industry: {brief.industry}\n"
-            f"Target Audience: {brief.target_audience}\n"
-            f"Key Message: {brief.key_message}\n"
-            f"Destinations: {brief.destinations}\n"
-            f"Tone: Adventurous and inspiring\n"
-            f"Platforms: {', '.join(brief.platforms)}\n"
-        )
+        brief_text = _brief_text(brief)
 
         # ── Content Safety: Screen input ──────────────────────────────
-        input_check = _safety_shield.screen_input(brief_text)
-        if not input_check.allowed:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Content safety blocked the request: {input_check.summary}",
-            )
+        _screen_input(brief_text)
 
         try:
             result = await run_workflow_api(
@@ -492,23 +637,72 @@ async def generate(brief: CampaignBriefRequest):
             raise HTTPException(status_code=500, detail=str(e))
 
         # ── Content Safety: Screen output ─────────────────────────────
-        combined_posts = (
-            f"{result.posts.linkedin}\n"
-            f"{result.posts.twitter}\n"
-            f"{result.posts.instagram}"
-        )
-        output_check = _safety_shield.screen_output(combined_posts)
-        result.safety = SafetyCheckResult(
-            status=(
-                "blocked" if not output_check.allowed
-                else "warnings" if output_check.flags
-                else "passed"
-            ),
-            flags=[f.detail for f in output_check.flags],
-        )
+        _screen_output(result, brief_text, brief.brand_name)
 
         return result
 
+
+@app.post("/api/generate/stream")
+async def generate_stream(brief: CampaignBriefRequest):
+    """
+    Run the workflow and stream Server-Sent Events: a ``post`` event for
+    each platform post the moment the Publisher finishes it (already
+    safety-screened), then ``result`` with the full WorkflowResult (or
+    ``error``).
+    """
+    brief_text = _brief_text(brief)
+    _screen_input(brief_text)
+    rules = get_brand_registry().get(brief.brand_name).rules
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def on_post(post: PlatformPost) -> None:
+        check = await asyncio.to_thread(_safety_shield.screen_output, post.text, "Publisher", rules)
+        await queue.put(("post", {
+            "platform": post.platform,
+            "text": post.text,
+            "visual": post.visual,
+            "truncated": post.truncated,
+            "safety": _safety_result(check).model_dump(),
+        }))
+
+    async def run() -> None:
+        with _tracer.start_as_current_span(
+            "api-generate-content-stream",
+            attributes={
+                "workflow.brand": brief.brand_name,
+                "workflow.content_type": brief.content_type,
+                "workflow.platforms": ", ".join(brief.platforms),
+            },
+        ):
+            try:
+                result = await run_workflow_api(
+                    brief_text,
+                    content_type=brief.content_type,
+                    brand_name=brief.brand_name,
+                    destinations=brief.destinations,
+                    key_message=brief.key_message,
+                    on_post=on_post,
+                )
+                _screen_output(result, brief_text, brief.brand_name)
+                await queue.put(("result", result.model_dump()))
+            except Exception as e:
+                import traceback
+                traceback.print_exc()
+                await queue.put(("error", {"detail": str(e)}))
+            finally:
+                await queue.put(None)
+
+    async def events():
+        task = asyncio.ensure_future(run())
+        try:
+            while (item := await queue.get()) is not None:
+                name, data = item
+                yield f"event: {name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+        finally:
+            task.cancel()
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
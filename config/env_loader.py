@@ -21,12 +21,21 @@ def validate_environment() -> bool:
         sys.exit(1) if any required variables are missing
     """
     load_dotenv()  # Load .env file
-    
+
+    # Offline LLM modes (orchestration/llm_client.py) need no Azure settings
+    llm_mode = os.getenv("ZAVA_LLM_MODE", "live").strip().lower()
+    if llm_mode in ("fake", "replay"):
+        print(f"✅ Environment configuration validated (offline LLM mode: {llm_mode})\n")
+        return True
+
     required_vars = [
         "AZURE_AI_FOUNDRY_PROJECT_ENDPOINT",
         "AZURE_OPENAI_ENDPOINT",
         "AZURE_OPENAI_CHAT_DEPLOYMENT_NAME",
     ]
+    # A deployment pool (orchestration/deployment_pool.py) replaces the single chat deployment
+    if os.getenv("AZURE_OPENAI_DEPLOYMENTS"):
+        required_vars.remove("AZURE_OPENAI_CHAT_DEPLOYMENT_NAME")
     
     missing = [var for var in required_vars if not os.getenv(var)]
     
@@ -5,14 +5,29 @@ Runs the Creator → Reviewer → Publisher workflow for each campaign brief
 in the evaluation dataset and saves the responses to a JSONL file that
 can be consumed by the Azure AI Evaluation SDK.
 
+Briefs run concurrently (bounded by ``--concurrency``) and share one
+credential, chat client and MCP filesystem tool; the Creator, Reviewer and
+Publisher agents (and their middleware state or Copilot session) are built
+per brief, so concurrent briefs never share a conversation.  Each row is appended to the JSONL as soon as it finishes,
+so an interrupted run loses nothing: re-running skips ids that already
+have a successful row (failed rows are retried).  The dataset is read
+lazily, so generated datasets (``brief_generator.py``) larger than memory
+can be run; ``--limit`` runs only the first N briefs.
+
 Usage:
-    python evaluation/agent_runner.py
+    python evaluation/agent_runner.py                     # resume
+    python evaluation/agent_runner.py --concurrency 8
+    python evaluation/agent_runner.py --fresh             # start over
+    python evaluation/agent_runner.py --input briefs.jsonl --limit 500
 """
 
 import os
 import sys
 import json
+import time
+import argparse
 import asyncio
+from dataclasses import dataclass
 from datetime import datetime
 
 # Add project root to path
@@ -24,11 +39,8 @@ load_dotenv()
 
 from config.env_loader import validate_environment
 
-validate_environment()
-
 from azure.identity import DefaultAzureCredential
 from agent_framework import Agent
-from agent_framework.azure import AzureOpenAIChatClient
 from agent_framework_orchestrations import GroupChatBuilder
 
 try:
@@ -39,9 +51,17 @@ except ImportError:
 from agents.creator import CREATOR_INSTRUCTIONS
 from agents.reviewer import REVIEWER_INSTRUCTIONS
 from agents.publisher import PUBLISHER_INSTRUCTIONS
+from agents.prompt_registry import get_prompt_registry
 from orchestration.speaker_selection import speaker_selector
 from orchestration.termination import should_terminate
+from orchestration.context_policy import build_context_middleware
+from orchestration.model_router import build_model_routing_middleware
+from orchestration.draft_sampling import build_draft_sampling_middleware
+from orchestration.review_cache import build_review_cache_middleware
+from orchestration.llm_client import create_chat_client, llm_mode
 from grounding.file_search import create_grounded_agent
+from grounding.pitfall_memory import pitfall_section, record_transcript
+from evaluation.brief_generator import iter_briefs
 from tools.filesystem_mcp import get_filesystem_tools, _cleanup_gateway
 
 import re
@@ -76,38 +96,85 @@ def parse_platform_posts(publisher_text: str) -> dict:
     return posts
 
 
-async def run_single_workflow(brief_text: str) -> dict:
-    """Run the full Creator → Reviewer → Publisher workflow for one brief."""
+@dataclass
+class SharedResources:
+    """Clients reused by every brief in a run (agents are built per brief)."""
+    credential: object
+    azure_client: object
+    filesystem_tools: list
+    reviewer_instructions: str
+    publisher_instructions: str
+
+
+def build_shared_resources() -> SharedResources:
+    """Create the credential, chat client and MCP tool once."""
     credential = DefaultAzureCredential()
-    azure_client = AzureOpenAIChatClient(
-        endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+    azure_client = create_chat_client(credential)
+
+    reviewer_prompt = get_prompt_registry().register("Reviewer", REVIEWER_INSTRUCTIONS)
+    publisher_prompt = get_prompt_registry().register("Publisher", PUBLISHER_INSTRUCTIONS)
+
+    return SharedResources(
         credential=credential,
-        deployment_name=os.getenv("AZURE_OPENAI_CHAT_DEPLOYMENT_NAME"),
+        azure_client=azure_client,
+        filesystem_tools=get_filesystem_tools() or [],
+        reviewer_instructions=reviewer_prompt.text,
+        publisher_instructions=publisher_prompt.text,
     )
 
-    creator = create_grounded_agent(
-        client=azure_client,
-        name="Creator",
-        instructions=CREATOR_INSTRUCTIONS,
-        brand_guidelines_path="grounding/brand-guidelines.md",
-    )
 
+def build_reviewer(shared: SharedResources):
+    """A Reviewer for one brief: its own Copilot session / middleware state."""
     try:
-        if GitHubCopilotAgent:
-            reviewer = GitHubCopilotAgent(name="Reviewer", instructions=REVIEWER_INSTRUCTIONS)
-        else:
-            raise ImportError()
+        if GitHubCopilotAgent and llm_mode() == "live":
+            return GitHubCopilotAgent(name="Reviewer", instructions=shared.reviewer_instructions)
+        raise ImportError()
     except Exception:
-        reviewer = Agent(client=azure_client, name="Reviewer", instructions=REVIEWER_INSTRUCTIONS)
-
-    filesystem_tools = get_filesystem_tools()
-    publisher = Agent(
-        client=azure_client,
+        return Agent(
+            client=shared.azure_client,
+            name="Reviewer",
+            instructions=shared.reviewer_instructions,
+            middleware=[
+                *build_model_routing_middleware("Reviewer"),
+                *build_review_cache_middleware("Reviewer"),
+                *build_context_middleware("Reviewer"),
+            ] or None,
+        )
+
+
+def build_publisher(shared: SharedResources) -> Agent:
+    """A Publisher for one brief, with its own middleware state."""
+    return Agent(
+        client=shared.azure_client,
         name="Publisher",
-        instructions=PUBLISHER_INSTRUCTIONS,
-        tools=filesystem_tools if filesystem_tools else None,
+        instructions=shared.publisher_instructions,
+        tools=shared.filesystem_tools or None,
+        middleware=[*build_model_routing_middleware("Publisher"), *build_context_middleware("Publisher")] or None,
     )
 
+
+async def run_single_workflow(
+    brief_text: str,
+    shared: SharedResources | None = None,
+    label: str = "",
+) -> dict:
+    """Run the full Creator → Reviewer → Publisher workflow for one brief."""
+    shared = shared or build_shared_resources()
+
+    creator = create_grounded_agent(
+        client=shared.azure_client,
+        name="Creator",
+        instructions=CREATOR_INSTRUCTIONS,
+        brand_guidelines_path="grounding/brand-guidelines.md",
+        middleware=[
+            *build_model_routing_middleware("Creator"),
+            *build_draft_sampling_middleware("Creator", downstream=build_context_middleware("Creator")),
+        ],
+        brief=brief_text,
+        pitfalls=pitfall_section(),
+    )
+    reviewer, publisher = build_reviewer(shared), build_publisher(shared)
+
     workflow = GroupChatBuilder(
         participants=[creator, reviewer, publisher],
         selection_func=speaker_selector,
@@ -126,7 +193,7 @@ async def run_single_workflow(brief_text: str) -> dict:
             author = getattr(data, "author_name", None) or ""
             text = getattr(data, "text", None) or ""
             if author and text:
-                print(f"    [{author}] {text[:60]}...", flush=True)
+                print(f"    {label}[{author}] {text[:60]}...", flush=True)
 
     result = await stream.get_final_response()
     outputs = result.get_outputs() if hasattr(result, "get_outputs") else []
@@ -146,6 +213,8 @@ async def run_single_workflow(brief_text: str) -> dict:
         if text:
             consolidated.append({"name": name, "text": text})
 
+    record_transcript((t["name"], t["text"]) for t in consolidated)
+
     publisher_text = ""
     for t in reversed(consolidated):
         if t["name"] == "Publisher":
@@ -161,56 +230,147 @@ async def run_single_workflow(brief_text: str) -> dict:
     }
 
 
-async def main():
-    """Run the agent workflow for each brief in the evaluation dataset."""
-    input_path = os.path.join(os.path.dirname(__file__), "eval_dataset.jsonl")
-    output_path = os.path.join(os.path.dirname(__file__), "eval_results.jsonl")
+def _error_row(brief: dict, error: Exception) -> dict:
+    return {
+        "id": brief["id"],
+        "query": brief["query"],
+        "context": brief["context"],
+        "response": f"ERROR: {error}",
+        "twitter_post": "",
+        "linkedin_post": "",
+        "instagram_post": "",
+        "duration_seconds": 0,
+    }
+
 
-    with open(input_path, "r", encoding="utf-8") as f:
-        briefs = [json.loads(line) for line in f if line.strip()]
+def _completed_ids(output_path: str) -> set:
+    """Ids with a successful row in an existing results file."""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # partial line from an interrupted run
+            if not str(row.get("response", "")).startswith("ERROR:"):
+                done.add(row.get("id"))
+    return done
+
+
+def _compact_results(output_path: str) -> None:
+    """Keep one row per id (retried failures replace earlier errors).
+
+    Two passes over the file — only the chosen line number per id is held
+    in memory, so large result files compact without loading every row.
+    """
+    if not os.path.exists(output_path):
+        return
+    keep = {}  # id → (line number, succeeded)
+    with open(output_path, "r", encoding="utf-8") as f:
+        for n, line in enumerate(f):
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            prev = keep.get(row.get("id"))
+            if prev is None or not prev[1]:
+                keep[row.get("id")] = (n, not str(row.get("response", "")).startswith("ERROR:"))
+    lines = {n for n, _ in keep.values()}
+    tmp_path = output_path + ".tmp"
+    with open(output_path, "r", encoding="utf-8") as src, open(tmp_path, "w", encoding="utf-8") as dst:
+        for n, line in enumerate(src):
+            if n in lines:
+                dst.write(line)
+    os.replace(tmp_path, output_path)
+
+
+async def main(argv=None):
+    """Run the agent workflow for each brief in the evaluation dataset."""
+    validate_environment()
+    parser = argparse.ArgumentParser(description="Run the workflow over the eval dataset")
+    parser.add_argument("--input", default=os.path.join(os.path.dirname(__file__), "eval_dataset.jsonl"))
+    parser.add_argument("--output", default=os.path.join(os.path.dirname(__file__), "eval_results.jsonl"))
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("EVAL_CONCURRENCY", "4")))
+    parser.add_argument("--fresh", action="store_true", help="Discard existing results instead of resuming")
+    parser.add_argument("--limit", type=int, default=None, help="Only run the first N briefs of the dataset")
+    args = parser.parse_args(argv)
+    input_path, output_path = args.input, args.output
+
+    if args.fresh and os.path.exists(output_path):
+        os.remove(output_path)
+    done_ids = _completed_ids(output_path)
+    total = pending_count = 0
+    for brief in iter_briefs(input_path, args.limit):
+        total += 1
+        pending_count += brief["id"] not in done_ids
 
     print(f"\n{'='*60}")
-    print(f"Agent Runner — Processing {len(briefs)} campaign briefs")
+    print(f"Agent Runner — Processing {total} campaign briefs")
+    print(f"  Resuming:    {total - pending_count} already done, {pending_count} to run")
+    print(f"  Concurrency: {args.concurrency}")
     print(f"{'='*60}\n")
 
-    results = []
-    for i, brief in enumerate(briefs, 1):
-        print(f"\n--- Brief {i}/{len(briefs)}: {brief['id']} ---")
-        try:
-            workflow_result = await run_single_workflow(brief["query"])
-            row = {
-                "id": brief["id"],
-                "query": brief["query"],
-                "context": brief["context"],
-                "response": workflow_result["response"],
-                "twitter_post": workflow_result["posts"].get("twitter", ""),
-                "linkedin_post": workflow_result["posts"].get("linkedin", ""),
-                "instagram_post": workflow_result["posts"].get("instagram", ""),
-                "duration_seconds": workflow_result["duration_seconds"],
-            }
-            results.append(row)
-            print(f"  ✅ Completed in {workflow_result['duration_seconds']}s")
-        except Exception as e:
-            print(f"  ❌ Failed: {e}")
-            results.append({
-                "id": brief["id"],
-                "query": brief["query"],
-                "context": brief["context"],
-                "response": f"ERROR: {e}",
-                "twitter_post": "",
-                "linkedin_post": "",
-                "instagram_post": "",
-                "duration_seconds": 0,
-            })
-
-    # Write results
-    with open(output_path, "w", encoding="utf-8") as f:
-        for row in results:
-            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    if pending_count:
+        shared = build_shared_resources()
+        pending = (b for b in iter_briefs(input_path, args.limit) if b["id"] not in done_ids)
+        write_lock = asyncio.Lock()
+        started = time.monotonic()
+        finished = 0
+        failed = 0
+
+        async def run_one(brief: dict):
+            nonlocal finished, failed
+            print(f"\n--- Brief {brief['id']} started ---")
+            try:
+                workflow_result = await run_single_workflow(
+                    brief["query"], shared, label=f"{brief['id']} ",
+                )
+                row = {
+                    "id": brief["id"],
+                    "query": brief["query"],
+                    "context": brief["context"],
+                    "response": workflow_result["response"],
+                    "twitter_post": workflow_result["posts"].get("twitter", ""),
+                    "linkedin_post": workflow_result["posts"].get("linkedin", ""),
+                    "instagram_post": workflow_result["posts"].get("instagram", ""),
+                    "duration_seconds": workflow_result["duration_seconds"],
+                }
+                status = f"✅ {brief['id']} completed in {workflow_result['duration_seconds']}s"
+            except Exception as e:
+                row = _error_row(brief, e)
+                status = f"❌ {brief['id']} failed: {e}"
+                failed += 1
+
+            async with write_lock:
+                with open(output_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(row, ensure_ascii=False) + "\n")
+                    f.flush()
+                finished += 1
+                elapsed = time.monotonic() - started
+                rate = finished / elapsed if elapsed else 0.0
+                eta = (pending_count - finished) / rate if rate else 0.0
+                print(f"  {status}")
+                print(f"  📈 {finished}/{pending_count} done · "
+                      f"{rate * 60:.1f} briefs/min · ETA {eta / 60:.1f} min")
+
+        async def worker():
+            # Workers pull from one lazy iterator, so at most --concurrency
+            # briefs are in memory / in flight at a time
+            for brief in pending:
+                await run_one(brief)
+
+        await asyncio.gather(*(worker() for _ in range(max(1, args.concurrency))))
+        _compact_results(output_path)
+        elapsed = time.monotonic() - started
+        print(f"\n  ⏱️  {pending_count} briefs in {elapsed:.1f}s ({failed} failed)")
 
     print(f"\n{'='*60}")
     print(f"✅ Results saved to: {output_path}")
-    print(f"   {len(results)} briefs processed")
+    print(f"   {len(_completed_ids(output_path))}/{total} briefs completed")
     print(f"{'='*60}\n")
 
     # Cleanup MCP — suppress stderr to silence async generator noise
@@ -0,0 +1,382 @@
+"""
+Performance Benchmark — latency and token regressions per prompt change
+
+Runs the evaluation briefs (the same CB-xxx briefs as the quality
+baselines in ``test-data/evaluation-baselines/quality-baselines.md``)
+through the Creator → Reviewer → Publisher workflow, one at a time, and
+records for each brief:
+
+  - wall-clock seconds, total and per stage (Creator / Reviewer / Publisher)
+  - turns (agent responses) per run
+  - prompt and completion tokens, total and per agent (provider-reported)
+  - Publisher parse time (``parse_platform_posts``, median of repeated runs)
+  - Creator rounds and whether the first review approved the draft
+    (reported as average rounds and first-pass approval rate; compare runs
+    with and without ``CREATOR_DRAFTS``)
+
+The results are compared with a stored baseline JSON; any metric that is
+worse than the baseline by more than its tolerance is a regression and
+the command exits with status 1, so a prompt edit that doubles token use
+fails CI.
+
+Models:
+    fake   (default) deterministic offline client — tokens and turns are
+           exact, so token tolerances can be tight
+    replay cassettes recorded with ZAVA_LLM_MODE=record, played back with
+           their original timing (``ZAVA_REPLAY_SPEED`` scales it)
+    record Azure OpenAI, saving cassettes for later replay runs
+    live   Azure OpenAI (needs the usual .env)
+
+Tolerances are relative ("0.10" = 10% worse allowed), with a small
+absolute floor for timings so sub-millisecond noise never fails a run.
+Override per metric with ``--tolerance tokens=0.05`` or
+``BENCH_TOLERANCE_<METRIC>`` env vars.
+
+Usage:
+    python evaluation/benchmark.py                         # compare with baseline
+    python evaluation/benchmark.py --update-baseline       # record a new baseline
+    python evaluation/benchmark.py --tolerance tokens=0.05 --latency-ms 200
+    python evaluation/benchmark.py --dataset briefs.jsonl --limit 500 --output bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from agent_framework import Agent
+from agent_framework_orchestrations import GroupChatBuilder
+
+from agents.creator import CREATOR_INSTRUCTIONS
+from agents.reviewer import REVIEWER_INSTRUCTIONS
+from agents.publisher import PUBLISHER_INSTRUCTIONS
+from evaluation.agent_runner import parse_platform_posts
+from evaluation.brief_generator import iter_briefs
+from grounding.file_search import create_grounded_agent
+from monitoring.agent_middleware import AgentTelemetryMiddleware
+from orchestration.context_policy import build_context_middleware
+from orchestration.model_router import build_model_routing_middleware
+from orchestration.draft_sampling import build_draft_sampling_middleware, review_outcome
+from orchestration.llm_client import LLM_MODES, create_chat_client
+from orchestration.speaker_selection import speaker_selector
+from orchestration.termination import should_terminate
+
+EVAL_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATASET = os.path.join(EVAL_DIR, "eval_dataset.jsonl")
+DEFAULT_BASELINE = os.path.join(EVAL_DIR, "benchmark_baseline.json")
+
+AGENTS = ("Creator", "Reviewer", "Publisher")
+
+# metric → (relative tolerance, absolute floor)
+DEFAULT_TOLERANCES = {
+    "prompt_tokens": (0.10, 0),
+    "completion_tokens": (0.10, 0),
+    "turns": (0.0, 0),
+    "wall_seconds": (0.50, 0.25),
+    "stage_seconds": (0.50, 0.25),
+    "parse_ms": (1.00, 0.5),
+}
+_TOLERANCE_GROUPS = {"tokens": ("prompt_tokens", "completion_tokens"),
+                     "latency": ("wall_seconds", "stage_seconds")}
+
+
+# ============================================================================
+# Model clients
+# ============================================================================
+
+def build_client(model: str, latency_ms: float = 0.0):
+    """Chat client for the benchmark (any ``ZAVA_LLM_MODE``)."""
+    if model == "fake":
+        from orchestration.fake_chat_client import FakeChatClient
+        return FakeChatClient(latency_ms=latency_ms, ttft_ms=latency_ms / 4)
+    if model in ("live", "record"):
+        from config.env_loader import validate_environment
+        validate_environment()
+    return create_chat_client(mode=model)
+
+
+# ============================================================================
+# One brief
+# ============================================================================
+
+def _agent_middleware(name: str, telemetry: AgentTelemetryMiddleware) -> list:
+    downstream = [
+        *build_context_middleware(name, telemetry),
+        telemetry.usage_middleware(name),
+    ]
+    if name == "Creator":
+        downstream = build_draft_sampling_middleware(name, telemetry, downstream=downstream)
+    return [*build_model_routing_middleware(name, telemetry), *downstream]
+
+
+def _parse_ms(publisher_text: str, repeats: int = 200) -> float:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        parse_platform_posts(publisher_text)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+async def run_brief(client, brief: str) -> dict:
+    """Run one brief and return its performance record."""
+    telemetry = AgentTelemetryMiddleware()
+    creator = create_grounded_agent(
+        client=client,
+        name="Creator",
+        instructions=CREATOR_INSTRUCTIONS,
+        brand_guidelines_path="grounding/brand-guidelines.md",
+        middleware=_agent_middleware("Creator", telemetry),
+        brief=brief,
+    )
+    reviewer = Agent(client=client, name="Reviewer", instructions=REVIEWER_INSTRUCTIONS,
+                     middleware=_agent_middleware("Reviewer", telemetry))
+    publisher = Agent(client=client, name="Publisher", instructions=PUBLISHER_INSTRUCTIONS,
+                      middleware=_agent_middleware("Publisher", telemetry))
+    workflow = GroupChatBuilder(
+        participants=[creator, reviewer, publisher],
+        selection_func=speaker_selector,
+        termination_condition=should_terminate,
+        max_rounds=5,
+        intermediate_outputs=True,
+    ).build()
+
+    stage_seconds = {a: 0.0 for a in AGENTS}
+    sent_at: Dict[str, float] = {}
+    turns = 0
+    texts: Dict[str, List[str]] = {}
+    order: List[str] = []
+    current: Optional[str] = None
+
+    start = time.perf_counter()
+    stream = workflow.run(brief, stream=True)
+    async for event in stream:
+        data = event.data
+        if event.type == "group_chat" and data is not None:
+            participant = getattr(data, "participant_name", None)
+            kind = type(data).__name__
+            if participant and kind.endswith("RequestSentEvent"):
+                sent_at[participant] = time.perf_counter()
+            elif participant and kind.endswith("ResponseReceivedEvent"):
+                turns += 1
+                began = sent_at.pop(participant, start)
+                stage_seconds[participant] = stage_seconds.get(participant, 0.0) + time.perf_counter() - began
+        elif event.type == "output" and data is not None:
+            author = getattr(data, "author_name", None)
+            text = getattr(data, "text", None) or ""
+            if author:
+                if author != current:
+                    texts.setdefault(author, []).append("")
+                    order.append(author)
+                    current = author
+                texts[author][-1] += text
+    await stream.get_final_response()
+    wall = time.perf_counter() - start
+
+    summary = telemetry.finalise(duration_seconds=wall, total_rounds=turns)
+    usage = summary.get("usage_by_agent", {})
+    publisher_text = (texts.get("Publisher") or [""])[-1]
+    seen: Dict[str, int] = {}
+    history = []
+    for author in order:
+        history.append((author, texts[author][seen.get(author, 0)]))
+        seen[author] = seen.get(author, 0) + 1
+    first_pass, rounds = review_outcome(history)
+    return {
+        "wall_seconds": round(wall, 3),
+        "stage_seconds": {a: round(s, 3) for a, s in stage_seconds.items()},
+        "turns": turns,
+        "prompt_tokens": sum(u["prompt_tokens"] for u in usage.values()),
+        "completion_tokens": sum(u["completion_tokens"] for u in usage.values()),
+        "tokens_by_agent": {
+            a: {"prompt": u["prompt_tokens"], "completion": u["completion_tokens"], "calls": u["calls"]}
+            for a, u in usage.items()
+        },
+        "parse_ms": round(_parse_ms(publisher_text), 4),
+        "posts_found": sum(1 for p in parse_platform_posts(publisher_text).values() if p),
+        "creator_rounds": rounds,
+        "first_pass_approved": first_pass,
+    }
+
+
+async def run_benchmark(briefs: Iterable[dict], model: str, latency_ms: float = 0.0) -> dict:
+    client = build_client(model, latency_ms)
+    per_brief = {}
+    for brief in briefs:
+        print(f"  ⏱️  {brief['id']} …", flush=True)
+        per_brief[brief["id"]] = await run_brief(client, brief["query"])
+    totals = {
+        "wall_seconds": round(sum(r["wall_seconds"] for r in per_brief.values()), 3),
+        "stage_seconds": {
+            a: round(sum(r["stage_seconds"].get(a, 0.0) for r in per_brief.values()), 3) for a in AGENTS
+        },
+        "turns": sum(r["turns"] for r in per_brief.values()),
+        "prompt_tokens": sum(r["prompt_tokens"] for r in per_brief.values()),
+        "completion_tokens": sum(r["completion_tokens"] for r in per_brief.values()),
+        "parse_ms": round(sum(r["parse_ms"] for r in per_brief.values()), 4),
+        "avg_creator_rounds": round(statistics.mean(r["creator_rounds"] for r in per_brief.values()), 2)
+        if per_brief else 0.0,
+        "first_pass_approval_rate": round(
+            sum(r["first_pass_approved"] for r in per_brief.values()) / len(per_brief), 3
+        ) if per_brief else 0.0,
+    }
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "model": model,
+        "latency_ms": latency_ms,
+        "briefs": per_brief,
+        "totals": totals,
+    }
+
+
+# ============================================================================
+# Baseline comparison
+# ============================================================================
+
+def resolve_tolerances(overrides: List[str]) -> Dict[str, tuple]:
+    """Defaults, then BENCH_TOLERANCE_<METRIC> env vars, then CLI overrides."""
+    tolerances = dict(DEFAULT_TOLERANCES)
+
+    def apply(name: str, value: float):
+        for metric in _TOLERANCE_GROUPS.get(name, (name,)):
+            if metric not in tolerances:
+                raise ValueError(f"Unknown tolerance metric '{name}'")
+            tolerances[metric] = (value, tolerances[metric][1])
+
+    for name in list(DEFAULT_TOLERANCES) + list(_TOLERANCE_GROUPS):
+        env = os.getenv(f"BENCH_TOLERANCE_{name.upper()}")
+        if env:
+            apply(name, float(env))
+    for item in overrides:
+        name, _, value = item.partition("=")
+        apply(name.strip(), float(value))
+    return tolerances
+
+
+def _metric_values(record: dict) -> Dict[str, float]:
+    values = {}
+    for metric in DEFAULT_TOLERANCES:
+        value = record.get(metric)
+        if isinstance(value, dict):
+            for sub, v in value.items():
+                values[f"{metric}.{sub}"] = v
+        elif value is not None:
+            values[metric] = value
+    return values
+
+
+def compare(current: dict, baseline: dict, tolerances: Dict[str, tuple]) -> List[dict]:
+    """Every metric of every brief (and the totals) against the baseline."""
+    rows = []
+    scopes = []
+    # Totals are only comparable when both runs covered the same briefs
+    if set(current["briefs"]) == set(baseline.get("briefs", {})):
+        scopes.append(("total", current["totals"], baseline.get("totals", {})))
+    scopes += [(bid, rec, baseline.get("briefs", {}).get(bid)) for bid, rec in current["briefs"].items()]
+    for scope, now, then in scopes:
+        if not then:
+            continue
+        base_values = _metric_values(then)
+        for key, value in _metric_values(now).items():
+            if key not in base_values:
+                continue
+            relative, floor = tolerances[key.split(".")[0]]
+            base = base_values[key]
+            limit = base * (1 + relative) + floor
+            rows.append({
+                "scope": scope,
+                "metric": key,
+                "baseline": base,
+                "current": value,
+                "change": round((value - base) / base, 4) if base else None,
+                "limit": round(limit, 4),
+                "regression": value > limit,
+            })
+    return rows
+
+
+def _print_comparison(rows: List[dict]) -> None:
+    print(f"\n  {'scope':<8} {'metric':<28} {'baseline':>10} {'current':>10} {'change':>8}")
+    for r in rows:
+        if r["scope"] != "total" and not r["regression"]:
+            continue
+        change = "—" if r["change"] is None else f"{r['change']:+.0%}"
+        flag = "❌" if r["regression"] else "  "
+        print(f"{flag}{r['scope']:<8} {r['metric']:<28} {r['baseline']:>10} {r['current']:>10} {change:>8}")
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Latency / token regression benchmark")
+    parser.add_argument("--dataset", default=DEFAULT_DATASET)
+    parser.add_argument("--limit", type=int, default=None, help="Only run the first N briefs of the dataset")
+    parser.add_argument("--baseline", default=os.getenv("BENCH_BASELINE", DEFAULT_BASELINE))
+    parser.add_argument("--model", choices=LLM_MODES, default=os.getenv("BENCH_MODEL", "fake"))
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated per-call latency (fake model)")
+    parser.add_argument("--tolerance", action="append", default=[], metavar="METRIC=REL",
+                        help="Relative tolerance override, e.g. tokens=0.05, latency=1.0, turns=0")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--output", help="Also write the current results to this JSON file")
+    args = parser.parse_args(argv)
+
+    print(f"\n{'='*60}")
+    print("🏁 Zava Travel — Performance Benchmark")
+    print(f"{'='*60}")
+    print(f"  Dataset:  {args.dataset}" + (f" (first {args.limit})" if args.limit else ""))
+    print(f"  Model:    {args.model}" + (f" ({args.latency_ms:.0f} ms/call)" if args.latency_ms else ""))
+    print(f"  Baseline: {args.baseline}")
+    print(f"{'='*60}\n")
+
+    current = asyncio.run(run_benchmark(iter_briefs(args.dataset, args.limit), args.model, args.latency_ms))
+    t = current["totals"]
+    print(f"\n  Totals ({len(current['briefs'])} briefs): {t['wall_seconds']:.2f}s · {t['turns']} turns · "
+          f"{t['prompt_tokens']:,} prompt + {t['completion_tokens']:,} completion tokens · "
+          f"parse {t['parse_ms']:.3f} ms")
+    print(f"  Reviews: {t['first_pass_approval_rate']:.0%} approved first pass · "
+          f"{t['avg_creator_rounds']:.2f} Creator rounds per run")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(f"\n  📌 Baseline updated: {args.baseline}\n")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\n  ⚠️ No baseline at {args.baseline} — run with --update-baseline first.\n")
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("model") != current["model"]:
+        print(f"\n  ⚠️ Baseline model is '{baseline.get('model')}', current is '{current['model']}' "
+              "— token and timing comparisons may not be meaningful.")
+
+    rows = compare(current, baseline, resolve_tolerances(args.tolerance))
+    _print_comparison(rows)
+    regressions = [r for r in rows if r["regression"]]
+    if regressions:
+        print(f"\n  ❌ {len(regressions)} regression(s) beyond tolerance\n")
+        return 1
+    print(f"\n  ✅ No regressions ({len(rows)} metrics checked)\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,405 @@
+"""
+Synthetic Campaign-Brief Generator — seeded datasets for scale testing
+
+Combines destinations, audiences, campaign themes, key messages, price
+points and platform sets into campaign briefs in the same shape as
+``eval_dataset.jsonl`` (``id`` / ``query`` / ``context``), plus a
+``kind`` column.  A configurable share of rows are the edge cases from
+``test-data/edge-cases/edge-case-inputs.md``:
+
+  EDGE-001  vague brief (minimal input)
+  EDGE-002  oversized brief (> 500 chars)
+  EDGE-003  missing optional fields
+  EDGE-004  non-English request
+  EDGE-005  competitor-heavy brief
+  EDGE-006  single-platform request
+  EDGE-007  empty / whitespace input
+  EDGE-008  rapid duplicate (re-submits one of the previous briefs)
+
+Destinations, highlights and price ranges come from the brand guidelines
+table, so prices in standard briefs are always within the published
+range; tagline, hashtags, competitors and banned words come from the
+brand rules.
+
+Every row is generated from its own ``Random(f"{seed}:{index}")``, so a
+dataset is reproducible row by row, ``--start`` shards a large dataset
+across machines, and nothing is held in memory: rows are written to the
+JSONL as they are generated and ``iter_briefs`` reads them back lazily.
+
+Usage:
+    python evaluation/brief_generator.py --count 10000 --seed 7 --output briefs.jsonl
+    python evaluation/brief_generator.py --count 50 --edge-rate 0.5 --output -
+    python evaluation/agent_runner.py --input briefs.jsonl --limit 200
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import re
+import sys
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from grounding.brand_rules import BrandRules, load_brand_rules
+from grounding.guideline_cache import load_guidelines
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_GUIDELINES_PATH = os.path.join(PROJECT_ROOT, "grounding", "brand-guidelines.md")
+
+EDGE_KINDS = (
+    "EDGE-001", "EDGE-002", "EDGE-003", "EDGE-004",
+    "EDGE-005", "EDGE-006", "EDGE-007", "EDGE-008",
+)
+
+AUDIENCES = (
+    "Millennials & Gen-Z adventure seekers",
+    "Budget-conscious millennials who follow travel deals",
+    "Gen-Z backpackers planning their first big trip",
+    "Young professionals with limited vacation days",
+    "Couples looking for an affordable adventure honeymoon",
+    "Solo travelers who want a group to explore with",
+    "Remote workers planning a working-holiday",
+    "Food lovers who travel for street food and markets",
+    "Outdoor enthusiasts into trekking, surfing and kayaking",
+    "Friends planning a group trip on a shared budget",
+)
+
+CAMPAIGNS = (
+    ("Summer Adventure Campaign", "for Zava Travel's Summer Adventure Campaign"),
+    ("Itinerary Launch", "announcing Zava Travel's new {dest} itineraries"),
+    ("Flash Sale", "for a 48-hour flash sale on {dest} itineraries"),
+    ("Early-Bird Offer", "for an early-bird offer on {season} trips to {dest}"),
+    ("Community Spotlight", "sharing traveler stories from Zava Travel's {dest} trips"),
+    ("Off-Season Escape", "promoting off-season escapes to {dest}"),
+    ("Group Trip Promotion", "promoting small-group departures to {dest}"),
+    ("Local Guides Feature", "featuring the local guides behind Zava Travel's {dest} itineraries"),
+)
+
+KEY_MESSAGES = (
+    "\"{tagline}\" — affordable curated itineraries to {dest}",
+    "Experience {highlight} in {dest} — starting at {price}",
+    "{dest} on a budget — curated itineraries from {price}",
+    "Real adventures, real prices: {highlight} from {price}",
+    "Book by Sunday and explore {dest} from {price} with local expert guides",
+    "No hidden fees, just {highlight} — {dest} from {price}",
+)
+
+PLATFORM_SETS = (
+    ("LinkedIn", "X/Twitter", "Instagram"),
+    ("LinkedIn", "X/Twitter", "Instagram"),
+    ("LinkedIn", "X/Twitter", "Instagram"),
+    ("Instagram", "X/Twitter", "LinkedIn"),
+    ("X/Twitter", "Instagram", "LinkedIn"),
+)
+
+NON_ENGLISH = (
+    ("Spanish", "Latin America", "\"Viaja Más, Gasta Menos\" — aventuras accesibles para todos"),
+    ("Portuguese", "Brazil", "\"Viaje Mais, Gaste Menos\" — aventuras acessíveis para todos"),
+    ("French", "France and Canada", "\"Voyagez plus, dépensez moins\" — l'aventure accessible à tous"),
+    ("German", "Germany and Austria", "\"Mehr erleben, weniger ausgeben\" — Abenteuer für alle"),
+)
+
+# | **Bali, Indonesia** | Apr-Oct | Rice terraces, temples, surf | $899-$1,299 |
+_TIER1_ROW = re.compile(
+    r"^\|\s*\*\*(?P<name>[^*]+)\*\*\s*\|\s*(?P<season>[^|]+)\|\s*(?P<highlights>[^|]+)\|"
+    r"\s*\$(?P<low>[\d,]+)\s*-\s*\$(?P<high>[\d,]+)\s*\|",
+    re.MULTILINE,
+)
+# - Colombia (Medellín & Cartagena)
+_TIER2_ROW = re.compile(r"^-\s*(?P<name>[A-Z][\w ]+?)\s*\((?P<highlights>[^)]+)\)\s*$", re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class Destination:
+    """One destination from the brand guidelines' destination tables."""
+    name: str
+    region: str
+    season: str
+    highlights: Tuple[str, ...]
+    price_range: Optional[Tuple[int, int]] = None
+
+    def price(self, rng: random.Random) -> Optional[int]:
+        """A price point inside the published range, rounded to ...49 / ...99."""
+        if not self.price_range:
+            return None
+        low, high = self.price_range
+        value = rng.randrange(low, high + 1, 50)
+        return max(low, value - 1 if value % 100 == 0 else value)
+
+
+def destination_catalog(guidelines_path: str = DEFAULT_GUIDELINES_PATH) -> Tuple[Destination, ...]:
+    """Tier 1 (priced) and Tier 2 destinations parsed from the guidelines."""
+    doc = load_guidelines(guidelines_path)
+    text = doc.content if doc else ""
+    catalog = []
+    for m in _TIER1_ROW.finditer(text):
+        name, _, region = m.group("name").partition(",")
+        catalog.append(Destination(
+            name=name.strip(),
+            region=region.strip() or name.strip(),
+            season=m.group("season").strip(),
+            highlights=tuple(h.strip().lower() for h in m.group("highlights").split(",") if h.strip()),
+            price_range=(int(m.group("low").replace(",", "")), int(m.group("high").replace(",", ""))),
+        ))
+    tier2 = text.split("Tier 2", 1)[1].split("\n## ", 1)[0] if "Tier 2" in text else ""
+    for m in _TIER2_ROW.finditer(tier2):
+        catalog.append(Destination(
+            name=m.group("name").strip(),
+            region=m.group("name").strip(),
+            season="seasonal",
+            highlights=tuple(h.strip() for h in re.split(r"&|,", m.group("highlights")) if h.strip()),
+        ))
+    if not catalog:
+        rules = load_brand_rules()
+        catalog = [Destination(name=d, region=d, season="year-round", highlights=("adventure",))
+                   for d in rules.destinations]
+    return tuple(catalog)
+
+
+def brand_context(rules: BrandRules) -> str:
+    """The ``context`` column — brand rules in the eval dataset's wording."""
+    p = {name: rules.platform(name) for name in ("linkedin", "twitter", "instagram")}
+    ig_words = p["instagram"].typical_words or p["instagram"].words or (125, 150)
+    return (
+        f"{rules.brand_name} Brand: Adventurous and Inspiring tone. Tagline: {rules.tagline}. "
+        "Target: Millennials & Gen-Z adventure seekers. Budget-friendly adventure travel. "
+        f"Approved hashtags: {', '.join(rules.approved_hashtags)}. "
+        f"Do NOT mention competitors: {', '.join(rules.competitors)}. "
+        f"Words to avoid: {', '.join(rules.banned_words)}. "
+        "LinkedIn: Professional-conversational 1-3 paragraphs. "
+        f"Twitter: Under {p['twitter'].max_chars or 280} chars punchy. "
+        f"Instagram: {ig_words[0]}-{ig_words[1]} words storytelling with emojis and hashtags."
+    )
+
+
+# ============================================================================
+# Generator
+# ============================================================================
+
+class BriefGenerator:
+    """Seeded, row-addressable campaign-brief generator."""
+
+    def __init__(self, seed: int = 0, edge_rate: float = 0.1,
+                 edge_kinds: Sequence[str] = EDGE_KINDS,
+                 rules: Optional[BrandRules] = None,
+                 guidelines_path: str = DEFAULT_GUIDELINES_PATH):
+        unknown = set(edge_kinds) - set(EDGE_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown edge kinds: {', '.join(sorted(unknown))}")
+        self.seed = seed
+        self.edge_rate = edge_rate
+        self.edge_kinds = tuple(edge_kinds)
+        self.rules = rules or load_brand_rules()
+        self.destinations = destination_catalog(guidelines_path)
+        self.priced = [d for d in self.destinations if d.price_range]
+        self.context = brand_context(self.rules)
+
+    def _rng(self, index: int) -> random.Random:
+        return random.Random(f"{self.seed}:{index}")
+
+    def brief(self, index: int) -> dict:
+        """Row ``index`` of the dataset (same seed + index → same row)."""
+        rng = self._rng(index)
+        kind = "standard"
+        if self.edge_kinds and rng.random() < self.edge_rate:
+            kind = rng.choice(self.edge_kinds)
+        if kind == "EDGE-008" and index == 0:
+            kind = "standard"
+        query = getattr(self, f"_edge_{kind[-3:]}" if kind != "standard" else "_standard")(rng, index)
+        return {"id": f"SYN-{index + 1:06d}", "kind": kind, "query": query, "context": self.context}
+
+    def generate(self, count: int, start: int = 0) -> Iterator[dict]:
+        """Rows ``start`` .. ``start + count - 1``, lazily."""
+        for index in range(start, start + count):
+            yield self.brief(index)
+
+    # ---- standard briefs --------------------------------------------------
+
+    def _pick(self, rng: random.Random) -> dict:
+        pool = self.priced if self.priced and rng.random() < 0.8 else list(self.destinations)
+        dests = rng.sample(pool, k=min(len(pool), rng.choice((1, 1, 1, 2, 3))))
+        lead = dests[0]
+        prices = [p for p in (d.price(rng) for d in dests) if p]
+        return {
+            "dests": dests,
+            "dest": ", ".join(d.name for d in dests[:-1]) + (f" and {dests[-1].name}" if len(dests) > 1 else lead.name),
+            "highlight": rng.choice(lead.highlights),
+            "season": lead.season,
+            "price": f"${min(prices):,}" if prices else "",
+            "audience": rng.choice(AUDIENCES),
+            "campaign": rng.choice(CAMPAIGNS),
+            "platforms": rng.choice(PLATFORM_SETS),
+        }
+
+    def _key_message(self, rng: random.Random, p: dict) -> str:
+        templates = [t for t in KEY_MESSAGES if p["price"] or "{price}" not in t]
+        return rng.choice(templates).format(tagline=self.rules.tagline, **p)
+
+    def _standard(self, rng: random.Random, index: int) -> str:
+        p = self._pick(rng)
+        opening = p["campaign"][1].format(**p)
+        destinations = ", ".join(
+            f"{d.name} ({', '.join(d.highlights[:2])})" if rng.random() < 0.3 else d.name for d in p["dests"]
+        )
+        return (
+            f"Create social media content {opening}.\n"
+            f"Brand: {self.rules.brand_name}\n"
+            f"Industry: {self.rules.industry}\n"
+            f"Target Audience: {p['audience']}\n"
+            f"Key Message: {self._key_message(rng, p)}\n"
+            f"Destinations: {destinations}\n"
+            f"Platforms: {', '.join(p['platforms'])}"
+        )
+
+    # ---- edge cases ---------------------------------------------------------
+
+    def _edge_001(self, rng: random.Random, index: int) -> str:
+        return (
+            f"Create {rng.choice(('social media content', 'some posts', 'content'))}.\n"
+            f"Brand: {self.rules.brand_name}\n"
+            "Industry: Travel\n"
+            "Target Audience: Travelers\n"
+            f"Key Message: {rng.choice(('Travel is fun', 'Go somewhere', 'Adventure is great'))}\n"
+            "Platforms: LinkedIn, X/Twitter, Instagram"
+        )
+
+    def _edge_002(self, rng: random.Random, index: int) -> str:
+        dests = rng.sample(self.priced or list(self.destinations), k=min(5, len(self.priced or self.destinations)))
+        prices = [d.price(rng) for d in dests if d.price_range]
+        detail = " and also ".join(
+            f"{d.name}{'' if d.region == d.name else ' in ' + d.region} known for its {' '.join(d.highlights)}"
+            for d in dests
+        )
+        return (
+            "Create social media content for Zava Travel's comprehensive multi-destination "
+            f"extravaganza campaign featuring {detail} all starting from just ${min(prices or [699]):,} "
+            "per person including local expert guides authentic cultural experiences comfortable "
+            "accommodations and zero hidden fees because we believe that extraordinary adventure travel "
+            "should be accessible to everyone especially millennials and Gen-Z adventure seekers who "
+            "want to explore the world without breaking the bank.\n"
+            f"Brand: {self.rules.brand_name}\n"
+            f"Industry: {self.rules.industry}\n"
+            f"Target Audience: {rng.choice(AUDIENCES)} who are budget-conscious but experience-hungry "
+            "digital natives who discover travel inspiration on social media and prioritize authentic "
+            "cultural immersion over resort-style vacations\n"
+            f"Key Message: \"{self.rules.tagline}\" — Your dream adventure is more affordable than you "
+            f"think with curated itineraries starting at ${min(prices or [699]):,}\n"
+            f"Destinations: {', '.join(d.name for d in dests)}\n"
+            "Platforms: LinkedIn, X/Twitter, Instagram"
+        )
+
+    def _edge_003(self, rng: random.Random, index: int) -> str:
+        p = self._pick(rng)
+        lines = [f"Create social media content for {rng.choice(('summer travel', p['dest'] + ' trips', 'adventure travel'))}.",
+                 f"Brand: {self.rules.brand_name}"]
+        optional = [f"Industry: {self.rules.industry}", f"Target Audience: {p['audience']}",
+                    f"Key Message: {self._key_message(rng, p)}", f"Destinations: {p['dest']}"]
+        lines += [line for line in optional if rng.random() < 0.3]
+        lines.append(f"Platforms: {', '.join(p['platforms'])}")
+        return "\n".join(lines)
+
+    def _edge_004(self, rng: random.Random, index: int) -> str:
+        language, region, message = rng.choice(NON_ENGLISH)
+        p = self._pick(rng)
+        return (
+            f"Create social media content in {language} for Zava Travel's {region} campaign.\n"
+            f"Brand: {self.rules.brand_name}\n"
+            f"Industry: {self.rules.industry}\n"
+            f"Target Audience: {language}-speaking millennials in {region}\n"
+            f"Key Message: {message}\n"
+            f"Destinations: {p['dest']}\n"
+            "Platforms: LinkedIn, X/Twitter, Instagram"
+        )
+
+    def _edge_005(self, rng: random.Random, index: int) -> str:
+        rivals = rng.sample(list(self.rules.competitors), k=min(2, len(self.rules.competitors)))
+        named = " and ".join(rivals)
+        return (
+            f"Create social media content showing why Zava Travel is better than {named} "
+            "for budget adventure travel.\n"
+            f"Brand: {self.rules.brand_name}\n"
+            f"Industry: {self.rules.industry}\n"
+            f"Target Audience: Millennials currently using {' or '.join(rivals)}\n"
+            "Key Message: Switch from overpriced tour operators to Zava Travel's affordable adventures\n"
+            "Platforms: LinkedIn, X/Twitter, Instagram"
+        )
+
+    def _edge_006(self, rng: random.Random, index: int) -> str:
+        p = self._pick(rng)
+        platform = rng.choice(("Instagram", "LinkedIn", "X/Twitter"))
+        post = {"Instagram": "an Instagram post", "LinkedIn": "a LinkedIn post", "X/Twitter": "a tweet"}[platform]
+        return (
+            f"Create {post} for Zava Travel's {p['dests'][0].name} campaign.\n"
+            f"Brand: {self.rules.brand_name}\n"
+            "Industry: Travel\n"
+            f"Target Audience: {p['audience']}\n"
+            f"Key Message: {self._key_message(rng, p)}\n"
+            f"Destinations: {p['dests'][0].name}\n"
+            f"Platforms: {platform}"
+        )
+
+    def _edge_007(self, rng: random.Random, index: int) -> str:
+        return rng.choice(("", "   ", "\n", " \t \n ", "\n\n   \n"))
+
+    def _edge_008(self, rng: random.Random, index: int) -> str:
+        # Re-submit one of the last few briefs verbatim (accidental double-click)
+        previous = max(0, index - rng.randint(1, 5))
+        row = self.brief(previous)
+        return row["query"]
+
+
+def write_jsonl(rows: Iterator[dict], path: str) -> int:
+    """Stream rows to ``path`` (``-`` = stdout); returns the row count."""
+    out = sys.stdout if path == "-" else open(path, "w", encoding="utf-8")
+    written = 0
+    try:
+        for row in rows:
+            out.write(json.dumps(row, ensure_ascii=False) + "\n")
+            written += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return written
+
+
+def iter_briefs(path: str, limit: Optional[int] = None) -> Iterator[dict]:
+    """Read a brief dataset lazily, one JSON row at a time."""
+    with open(path, "r", encoding="utf-8") as f:
+        count = 0
+        for line in f:
+            if not line.strip():
+                continue
+            if limit is not None and count >= limit:
+                return
+            yield json.loads(line)
+            count += 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate synthetic campaign briefs (JSONL)")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=int(os.getenv("BRIEF_SEED", "0")))
+    parser.add_argument("--start", type=int, default=0, help="First row index (for sharding)")
+    parser.add_argument("--edge-rate", type=float, default=0.1, help="Share of edge-case rows (0-1)")
+    parser.add_argument("--edge-kinds", default=",".join(EDGE_KINDS),
+                        help="Comma-separated edge kinds to include (empty = none)")
+    parser.add_argument("--output", default="-", help="JSONL path, or - for stdout")
+    args = parser.parse_args(argv)
+
+    kinds = [k.strip() for k in args.edge_kinds.split(",") if k.strip()]
+    # Keep stdout clean for ``--output -`` (loaders print status lines)
+    with contextlib.redirect_stdout(sys.stderr):
+        generator = BriefGenerator(seed=args.seed, edge_rate=args.edge_rate, edge_kinds=kinds)
+    written = write_jsonl(generator.generate(args.count, start=args.start), args.output)
+    if args.output != "-":
+        print(f"✅ {written:,} briefs (seed {args.seed}, edge rate {args.edge_rate:.0%}) → {args.output}",
+              file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
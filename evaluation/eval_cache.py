@@ -0,0 +1,244 @@
+"""
+Evaluator Result Cache — only judge new or changed rows
+
+Persistent (SQLite) cache of evaluator outputs keyed by
+
+    sha256(query, response, context)  +  evaluator name  +  evaluator version
+
+``run_cached_evaluation`` looks up every (row, evaluator) pair, calls the
+Azure AI Evaluation ``evaluate()`` only for the misses — one call per
+evaluator, over just its missing rows — stores the fresh outputs, and
+merges cached + fresh outputs into one result shaped like the SDK's
+(``rows`` with ``inputs.*`` / ``outputs.<name>.*`` columns, ``metrics``).
+Rows whose outputs are missing, error-valued or NaN (a failed judge call)
+are not stored, so they are retried on the next run, and NaN values are
+left out of the aggregate metrics.
+
+Evaluator versions:
+  - built-in SDK evaluators: class name + azure-ai-evaluation version +
+    judge deployment, so upgrading the SDK or switching models re-judges
+  - custom evaluators: ``VERSION`` attribute if present, otherwise a hash
+    of the class source, so editing the code re-scores automatically
+
+Configuration (env vars):
+    EVAL_CACHE        "1" (default) to use the cache, "0" to always re-judge
+    EVAL_CACHE_PATH   SQLite file (default evaluation/.eval_cache.sqlite)
+"""
+
+import hashlib
+import inspect
+import json
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+from importlib import metadata
+from typing import Callable, Dict, List, Optional, Tuple
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".eval_cache.sqlite")
+
+
+def cache_enabled() -> bool:
+    return os.getenv("EVAL_CACHE", "1").strip().lower() not in ("0", "false", "no")
+
+
+def row_key(row: dict) -> str:
+    """Content hash of the fields the evaluators read."""
+    payload = json.dumps(
+        [row.get("query", ""), row.get("response", ""), row.get("context", "")],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def evaluator_version(evaluator, model: str = "") -> str:
+    """Version string that changes whenever the evaluator's behaviour can."""
+    cls = type(evaluator)
+    explicit = getattr(evaluator, "VERSION", None)
+    if explicit:
+        return f"{cls.__name__}:{explicit}"
+    if cls.__module__.startswith("azure.ai.evaluation"):
+        try:
+            sdk = metadata.version("azure-ai-evaluation")
+        except metadata.PackageNotFoundError:
+            sdk = "unknown"
+        return f"{cls.__name__}:sdk-{sdk}:{model}"
+    try:
+        source = inspect.getsource(cls)
+    except (OSError, TypeError):
+        source = cls.__qualname__
+    return f"{cls.__name__}:{hashlib.sha256(source.encode('utf-8')).hexdigest()[:12]}"
+
+
+class EvalCache:
+    """SQLite-backed store of evaluator outputs."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " row_key TEXT, evaluator TEXT, version TEXT, outputs TEXT,"
+            " created_at TEXT DEFAULT CURRENT_TIMESTAMP,"
+            " PRIMARY KEY (row_key, evaluator, version))"
+        )
+        self._conn.commit()
+
+    def get(self, key: str, evaluator: str, version: str) -> Optional[dict]:
+        with self._lock:
+            cur = self._conn.execute(
+                "SELECT outputs FROM results WHERE row_key=? AND evaluator=? AND version=?",
+                (key, evaluator, version),
+            )
+            hit = cur.fetchone()
+        return json.loads(hit[0]) if hit else None
+
+    def put(self, key: str, evaluator: str, version: str, outputs: dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (row_key, evaluator, version, outputs)"
+                " VALUES (?, ?, ?, ?)",
+                (key, evaluator, version, json.dumps(outputs, ensure_ascii=False, default=str)),
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+# ============================================================================
+# Cached evaluate()
+# ============================================================================
+
+def _outputs_for(sdk_row: dict, name: str) -> dict:
+    prefix = f"outputs.{name}."
+    return {k[len(prefix):]: v for k, v in sdk_row.items() if k.startswith(prefix)}
+
+
+def _is_nan(value) -> bool:
+    return isinstance(value, float) and math.isnan(value)
+
+
+def _cacheable(outputs: dict) -> bool:
+    """A result worth keeping: present, no error field, no missing or NaN values."""
+    if not outputs:
+        return False
+    for k, v in outputs.items():
+        if v is None or _is_nan(v) or ("error" in k.lower() and v):
+            return False
+    return True
+
+
+def _aggregate(rows: List[dict], names: List[str]) -> Dict[str, float]:
+    """Mean of numeric outputs and pass-rate of ``*_result`` outputs."""
+    metrics: Dict[str, float] = {}
+    for name in names:
+        prefix = f"outputs.{name}."
+        fields = {k for r in rows for k in r if k.startswith(prefix)}
+        for col in sorted(fields):
+            field = col[len(prefix):]
+            values = [r.get(col) for r in rows]
+            if field.endswith("_result"):
+                verdicts = [v for v in values if v in ("pass", "fail")]
+                if verdicts:
+                    metrics[f"{name}.binary_aggregate"] = (
+                        sum(v == "pass" for v in verdicts) / len(verdicts)
+                    )
+                continue
+            present = [v for v in values if v is not None and not _is_nan(v)]
+            numbers = [v for v in present if isinstance(v, (int, float)) and not isinstance(v, bool)]
+            if numbers and len(numbers) == len(present):
+                if field.endswith(("_tokens", "_threshold")):
+                    continue
+                metrics[f"{name}.{field}"] = sum(numbers) / len(numbers)
+    return metrics
+
+
+def run_cached_evaluation(
+    rows: List[dict],
+    evaluators: Dict[str, object],
+    evaluator_config: Dict[str, dict],
+    evaluate_fn: Callable,
+    cache: EvalCache,
+    output_path: Optional[str] = None,
+    judge_names: Tuple[str, ...] = (),
+    model: str = "",
+) -> dict:
+    """
+    Evaluate *rows*, calling *evaluate_fn* only for uncached (row, evaluator) pairs.
+
+    Args:
+        rows: Processed dataset rows (must contain query/response/context).
+        evaluators: name → evaluator, as passed to ``evaluate()``.
+        evaluator_config: name → config (column mappings), as for ``evaluate()``.
+        evaluate_fn: ``azure.ai.evaluation.evaluate``.
+        cache: Result store.
+        output_path: Where to write the merged SDK-style result JSON.
+        judge_names: Evaluators that are LLM-judged (for "calls saved").
+        model: Judge deployment name (part of built-in evaluator versions).
+
+    Returns:
+        dict with ``rows``, ``metrics`` and ``cache`` statistics.
+    """
+    keys = [row_key(r) for r in rows]
+    merged = [{f"inputs.{k}": v for k, v in r.items()} for r in rows]
+    stats = {"hits": 0, "misses": 0, "judge_calls_saved": 0, "judge_calls_made": 0}
+
+    for name, evaluator in evaluators.items():
+        version = evaluator_version(evaluator, model)
+        missing = []
+        for i, key in enumerate(keys):
+            cached = cache.get(key, name, version)
+            if cached is None:
+                missing.append(i)
+                continue
+            stats["hits"] += 1
+            if name in judge_names:
+                stats["judge_calls_saved"] += 1
+            merged[i].update({f"outputs.{name}.{k}": v for k, v in cached.items()})
+
+        if not missing:
+            print(f"  ♻️  {name}: all {len(rows)} rows cached")
+            continue
+
+        print(f"  🧪 {name}: {len(missing)} new/changed rows, {len(rows) - len(missing)} cached")
+        stats["misses"] += len(missing)
+        if name in judge_names:
+            stats["judge_calls_made"] += len(missing)
+
+        fd, tmp_path = tempfile.mkstemp(suffix=".jsonl", prefix=f"eval_{name}_")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                for i in missing:
+                    f.write(json.dumps(rows[i], ensure_ascii=False) + "\n")
+            result = evaluate_fn(
+                data=tmp_path,
+                evaluators={name: evaluator},
+                evaluator_config={name: evaluator_config.get(name, {})},
+            )
+        finally:
+            os.remove(tmp_path)
+
+        failed = 0
+        for i, sdk_row in zip(missing, result.get("rows", [])):
+            outputs = _outputs_for(sdk_row, name)
+            # A failed judge row is retried next run instead of cached forever
+            if _cacheable(outputs):
+                cache.put(keys[i], name, version, outputs)
+            else:
+                failed += 1
+            merged[i].update({f"outputs.{name}.{k}": v for k, v in outputs.items()})
+        if failed:
+            print(f"  ⚠️  {name}: {failed} rows had missing / error / NaN outputs — not cached")
+
+    combined = {
+        "rows": merged,
+        "metrics": _aggregate(merged, list(evaluators)),
+        "cache": stats,
+    }
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump({k: combined[k] for k in ("rows", "metrics")}, f, ensure_ascii=False, default=str)
+    return combined
@@ -10,6 +10,10 @@ Evaluators:
   3. RelevanceEvaluator      (built-in) — Does the output address the brief?
   4. GroundednessEvaluator   (built-in) — Is content grounded in brand guidelines?
   5. PlatformComplianceEvaluator (custom) — Platform-specific constraints check
+  6. ClaimGroundednessEvaluator  (custom) — Local fact check of prices,
+     destinations, offers, durations, brand hashtags and URLs (no LLM call)
+  7-11. Local evaluator pack (custom, ``local_evaluators.py``) — brief
+     coverage, readability, structure, overlap groundedness, duplication
 
 Usage:
     # Step 1: Run agent runner to generate responses (if not already done)
@@ -17,18 +21,26 @@ Usage:
 
     # Step 2: Run evaluation on the responses
     python evaluation/evaluate.py
+
+    # Offline: code evaluators only, no Azure calls (seconds, for CI)
+    python evaluation/evaluate.py --local
 """
 
 import os
 import sys
+import glob
 import json
-import re
 from datetime import datetime
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from dotenv import load_dotenv
 
+from grounding.fact_index import get_fact_index, verify_claims
+from utils.batch_compliance import AUDIT_CHECKS, audit_responses
+from evaluation.local_evaluators import local_evaluator_config, local_evaluators
+from evaluation.eval_cache import DEFAULT_CACHE_PATH, EvalCache, cache_enabled, run_cached_evaluation
+
 load_dotenv()
 
 
@@ -44,110 +56,62 @@ class PlatformComplianceEvaluator:
     - LinkedIn: professional tone (no excessive emojis)
     - All: contains #ZavaTravel hashtag
     - All: does NOT mention competitors by name
-    """
 
-    COMPETITORS = ["voyagenow", "cooktravel", "wanderpath"]
-    BANNED_WORDS = ["cheap", "tourist", "package deal", "discount", "basic"]
+    Competitors, banned words, the brand hashtag and the Twitter limit come
+    from the compiled brand rules (``grounding/brand-rules.json``).  Scores
+    one response via ``utils.batch_compliance.audit_responses``, which
+    audits whole datasets in one vectorized pass.
+    """
 
-    def __init__(self):
-        pass
+    def __init__(self, rules=None):
+        self._rules = rules
 
     def __call__(self, *, response: str, **kwargs) -> dict:
         """Evaluate platform compliance from the full publisher response."""
-        checks = {
-            "twitter_char_limit": True,
-            "instagram_has_hashtags": True,
-            "instagram_has_emojis": True,
-            "contains_brand_hashtag": False,
-            "no_competitor_mentions": True,
-            "no_banned_words": True,
+        row = audit_responses([response], self._rules, workers=1).row(0)
+        issues = row["issues"]
+        return {
+            "platform_compliance": row["platform_compliance"],
+            "platform_compliance_details": json.dumps({c: row[c] for c in AUDIT_CHECKS}),
+            "platform_compliance_issues": "; ".join(issues) if issues else "All checks passed",
         }
-        issues = []
-        response_lower = response.lower()
-
-        # --- Extract platform posts ---
-        twitter_post = self._extract_section(response, r"\*\*X/?TWITTER POST\*\*")
-        instagram_post = self._extract_section(response, r"\*\*INSTAGRAM POST\*\*")
-
-        # Twitter: character limit
-        if twitter_post:
-            # Strip markdown formatting for char count
-            clean = re.sub(r"\*\*.*?\*\*", "", twitter_post).strip()
-            clean = re.sub(r"\[.*?\]\(.*?\)", "", clean).strip()
-            if len(clean) > 280:
-                checks["twitter_char_limit"] = False
-                issues.append(f"Twitter post is {len(clean)} chars (limit: 280)")
-
-        # Instagram: hashtags
-        if instagram_post:
-            if "#" not in instagram_post:
-                checks["instagram_has_hashtags"] = False
-                issues.append("Instagram post missing hashtags")
-            # Emojis (basic Unicode emoji range check)
-            emoji_pattern = re.compile(
-                "[\U0001F300-\U0001F9FF"
-                "\U00002702-\U000027B0"
-                "\U0001F680-\U0001F6FF"
-                "\u2600-\u26FF"
-                "\u2700-\u27BF]+",
-                flags=re.UNICODE,
-            )
-            if not emoji_pattern.search(instagram_post):
-                checks["instagram_has_emojis"] = False
-                issues.append("Instagram post missing emojis")
 
-        # Brand hashtag
-        if "#zavatravel" in response_lower:
-            checks["contains_brand_hashtag"] = True
-        else:
-            issues.append("Missing mandatory #ZavaTravel hashtag")
-
-        # Competitor mentions
-        for comp in self.COMPETITORS:
-            if comp in response_lower:
-                checks["no_competitor_mentions"] = False
-                issues.append(f"Mentions competitor: {comp}")
-                break
-
-        # Banned words
-        for word in self.BANNED_WORDS:
-            if word in response_lower:
-                checks["no_banned_words"] = False
-                issues.append(f"Uses banned word: '{word}'")
-                break
-
-        # Calculate overall score (0-5 scale to match built-in evaluators)
-        passed = sum(1 for v in checks.values() if v)
-        total = len(checks)
-        score = round((passed / total) * 5, 1)
 
+# ============================================================================
+# Custom Code-Based Evaluator: Claim Groundedness
+# ============================================================================
+
+class ClaimGroundednessEvaluator:
+    """
+    Local, millisecond groundedness check.
+
+    Extracts prices, offers, destinations, durations, brand hashtags and
+    URLs from the response and checks each against facts from the brand
+    guidelines plus the brief (``query``) and ``context``.  Scored 1-5 by
+    the share of supported claims (5 when there is nothing to check).
+    """
+
+    def __init__(self, guidelines_path: str = "grounding/brand-guidelines.md"):
+        self.guidelines_path = guidelines_path
+
+    def __call__(self, *, response: str, query: str = "", context: str = "", **kwargs) -> dict:
+        facts = get_fact_index(f"{query}\n{context}", self.guidelines_path)
+        report = verify_claims(response, facts)
+        unsupported = [f"{c.kind}: {c.text}" for c in report.unsupported]
         return {
-            "platform_compliance": score,
-            "platform_compliance_details": json.dumps(checks),
-            "platform_compliance_issues": "; ".join(issues) if issues else "All checks passed",
+            "claim_groundedness": report.score,
+            "claim_groundedness_claims": len(report.claims),
+            "claim_groundedness_unsupported": "; ".join(unsupported) if unsupported else "All claims supported",
         }
 
-    @staticmethod
-    def _extract_section(text: str, header_pattern: str) -> str:
-        """Extract a section from the publisher output by header pattern."""
-        match = re.search(header_pattern, text, re.IGNORECASE)
-        if not match:
-            return ""
-        start = match.end()
-        # Find next section header or end
-        next_header = re.search(r"\*\*(?:LINKEDIN|X/?TWITTER|INSTAGRAM) POST\*\*", text[start:], re.IGNORECASE)
-        end = start + next_header.start() if next_header else len(text)
-        return text[start:end].strip()
-
 
 # ============================================================================
 # Main evaluation
 # ============================================================================
 
-def run_evaluation():
-    """Run the Azure AI Evaluation SDK evaluate() on agent results."""
+def _llm_evaluators() -> dict:
+    """The four built-in, LLM-judged evaluators (needs Azure OpenAI)."""
     from azure.ai.evaluation import (
-        evaluate,
         TaskAdherenceEvaluator,
         CoherenceEvaluator,
         RelevanceEvaluator,
@@ -163,20 +127,58 @@ def run_evaluation():
     )
     credential = DefaultAzureCredential()
 
-    # --- Initialize evaluators ---
-    task_adherence = TaskAdherenceEvaluator(
-        model_config=model_config, credential=credential,
-    )
-    coherence = CoherenceEvaluator(
-        model_config=model_config, credential=credential,
-    )
-    relevance = RelevanceEvaluator(
-        model_config=model_config, credential=credential,
-    )
-    groundedness = GroundednessEvaluator(
-        model_config=model_config, credential=credential,
+    return {
+        "task_adherence": TaskAdherenceEvaluator(
+            model_config=model_config, credential=credential,
+        ),
+        "coherence": CoherenceEvaluator(
+            model_config=model_config, credential=credential,
+        ),
+        "relevance": RelevanceEvaluator(
+            model_config=model_config, credential=credential,
+        ),
+        "groundedness": GroundednessEvaluator(
+            model_config=model_config, credential=credential,
+        ),
+    }
+
+
+def load_previous_responses(eval_dir: str, current_path: str) -> list:
+    """
+    Responses from the latest earlier ``eval_processed_*.jsonl`` run.
+
+    Responses that also appear in *current_path* are dropped: a row the
+    agent runner did not regenerate is the same response, not a copy.
+    """
+    earlier = sorted(
+        p for p in glob.glob(os.path.join(eval_dir, "eval_processed_*.jsonl"))
+        if os.path.basename(p) < os.path.basename(current_path)
     )
+    if not earlier:
+        return []
+
+    def _responses(path: str) -> list:
+        with open(path, "r", encoding="utf-8") as f:
+            return [json.loads(line).get("response", "") for line in f if line.strip()]
+
+    current = set(_responses(current_path))
+    return [r for r in dict.fromkeys(_responses(earlier[-1])) if r and r not in current]
+
+
+def run_evaluation(local_only: bool = False):
+    """
+    Run the Azure AI Evaluation SDK evaluate() on agent results.
+
+    Args:
+        local_only: Skip the LLM-judged built-ins and run only the code
+            evaluators (no Azure calls) — for CI quality gates.
+    """
+    from azure.ai.evaluation import evaluate
+
+    # --- Initialize evaluators ---
+    llm_evaluators = {} if local_only else _llm_evaluators()
     platform_compliance = PlatformComplianceEvaluator()
+    claim_groundedness = ClaimGroundednessEvaluator()
 
     # --- Paths ---
     eval_dir = os.path.dirname(os.path.abspath(__file__))
@@ -214,6 +216,10 @@ def run_evaluation():
     # Use the processed file for evaluation
     eval_data_path = processed_path
 
+    # Earlier runs' responses, for the duplication evaluator's cross-run check
+    history = load_previous_responses(eval_dir, processed_path)
+    local = local_evaluators(history)
+
     # Count rows
     with open(eval_data_path, "r", encoding="utf-8") as f:
         row_count = sum(1 for line in f if line.strip())
@@ -223,56 +229,91 @@ def run_evaluation():
     print(f"{'='*60}")
     print(f"  Dataset:    {data_path} (processed → clean posts)")
     print(f"  Rows:       {row_count}")
-    print(f"  Evaluators: 5 (4 built-in + 1 custom)")
+    print(f"  Evaluators: {len(llm_evaluators) + 2 + len(local)} "
+          f"({len(llm_evaluators)} built-in + {2 + len(local)} custom)"
+          f"{'  — local only, no Azure calls' if local_only else ''}")
+    print(f"  History:    {len(history)} earlier responses (duplication cross-run)")
     print(f"  Output:     {output_path}")
     print(f"{'='*60}\n")
 
     # --- Run evaluation ---
     # Note: eval_data_path has the cleaned response (posts only, no meta-reasoning)
     # so TaskAdherenceEvaluator sees actual deliverables, not internal agent reflections.
-    result = evaluate(
-        data=eval_data_path,
-        evaluators={
-            "task_adherence": task_adherence,
-            "coherence": coherence,
-            "relevance": relevance,
-            "groundedness": groundedness,
-            "platform_compliance": platform_compliance,
+    evaluators = {
+        **llm_evaluators,
+        "platform_compliance": platform_compliance,
+        "claim_groundedness": claim_groundedness,
+        **local,
+    }
+    evaluator_config = {
+        "task_adherence": {
+            "column_mapping": {
+                "query": "${data.query}",
+                "response": "${data.response}",
+            },
         },
-        evaluator_config={
-            "task_adherence": {
-                "column_mapping": {
-                    "query": "${data.query}",
-                    "response": "${data.response}",
-                },
+        "coherence": {
+            "column_mapping": {
+                "query": "${data.query}",
+                "response": "${data.response}",
             },
-            "coherence": {
-                "column_mapping": {
-                    "query": "${data.query}",
-                    "response": "${data.response}",
-                },
+        },
+        "relevance": {
+            "column_mapping": {
+                "query": "${data.query}",
+                "response": "${data.response}",
             },
-            "relevance": {
-                "column_mapping": {
-                    "query": "${data.query}",
-                    "response": "${data.response}",
-                },
+        },
+        "groundedness": {
+            "column_mapping": {
+                "query": "${data.query}",
+                "response": "${data.response}",
+                "context": "${data.context}",
             },
-            "groundedness": {
-                "column_mapping": {
-                    "query": "${data.query}",
-                    "response": "${data.response}",
-                    "context": "${data.context}",
-                },
+        },
+        "platform_compliance": {
+            "column_mapping": {
+                "response": "${data.response}",
             },
-            "platform_compliance": {
-                "column_mapping": {
-                    "response": "${data.response}",
-                },
+        },
+        "claim_groundedness": {
+            "column_mapping": {
+                "query": "${data.query}",
+                "response": "${data.response}",
+                "context": "${data.context}",
             },
         },
-        output_path=output_path,
-    )
+    }
+    evaluator_config.update(local_evaluator_config())
+
+    cache_stats = None
+    if cache_enabled():
+        cache = EvalCache(os.getenv("EVAL_CACHE_PATH", DEFAULT_CACHE_PATH))
+        with open(eval_data_path, "r", encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        result = run_cached_evaluation(
+            rows,
+            evaluators,
+            evaluator_config,
+            evaluate_fn=evaluate,
+            cache=cache,
+            output_path=output_path,
+            judge_names=tuple(llm_evaluators),
+            model=os.getenv("AZURE_OPENAI_CHAT_DEPLOYMENT_NAME", ""),
+        )
+        cache.close()
+        cache_stats = result["cache"]
+        print(
+            f"\n  ♻️  Eval cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+            f"{cache_stats['judge_calls_saved']} judge calls saved"
+        )
+    else:
+        result = evaluate(
+            data=eval_data_path,
+            evaluators=evaluators,
+            evaluator_config=evaluator_config,
+            output_path=output_path,
+        )
 
     # --- Print summary ---
     # Binary evaluators output 0/1 (pass/fail); quality evaluators use 1-5 scale
@@ -287,6 +328,11 @@ def run_evaluation():
         if isinstance(metric_value, (int, float)):
             # Detect binary metrics by checking if any keyword matches
             is_binary = any(bm in metric_name for bm in BINARY_METRICS)
+            evaluator_name, _, field = metric_name.partition(".")
+            if not is_binary and field not in (evaluator_name, f"gpt_{evaluator_name}"):
+                # Auxiliary outputs (ratios, counts, raw Flesch) are not 1-5 scores
+                print(f"  {metric_name:<45} {metric_value:>8.2f}")
+                continue
             if is_binary:
                 label = "PASS ✅" if metric_value >= 1.0 else "FAIL ❌"
                 print(f"  {metric_name:<45} {label}")
@@ -319,15 +365,25 @@ def run_evaluation():
             "rows": row_count,
         },
         "evaluators": [
-            {"name": "TaskAdherenceEvaluator", "type": "built-in", "category": "Agent"},
-            {"name": "CoherenceEvaluator", "type": "built-in", "category": "Quality"},
-            {"name": "RelevanceEvaluator", "type": "built-in", "category": "Quality"},
-            {"name": "GroundednessEvaluator", "type": "built-in", "category": "RAG"},
+            *([] if local_only else [
+                {"name": "TaskAdherenceEvaluator", "type": "built-in", "category": "Agent"},
+                {"name": "CoherenceEvaluator", "type": "built-in", "category": "Quality"},
+                {"name": "RelevanceEvaluator", "type": "built-in", "category": "Quality"},
+                {"name": "GroundednessEvaluator", "type": "built-in", "category": "RAG"},
+            ]),
             {"name": "PlatformComplianceEvaluator", "type": "custom-code", "category": "Business"},
+            {"name": "ClaimGroundednessEvaluator", "type": "custom-code", "category": "RAG"},
+            {"name": "BriefCoverageEvaluator", "type": "custom-code", "category": "Quality"},
+            {"name": "ReadabilityEvaluator", "type": "custom-code", "category": "Quality"},
+            {"name": "StructureEvaluator", "type": "custom-code", "category": "Agent"},
+            {"name": "OverlapGroundednessEvaluator", "type": "custom-code", "category": "RAG"},
+            {"name": "DuplicationEvaluator", "type": "custom-code", "category": "Quality"},
         ],
         "aggregate_metrics": {k: v for k, v in sorted(metrics.items()) if isinstance(v, (int, float))},
         "row_results": row_results,
     }
+    if cache_stats is not None:
+        report["cache"] = cache_stats
 
     report_path = os.path.join(eval_dir, "eval_report.json")
     with open(report_path, "w", encoding="utf-8") as f:
@@ -337,4 +393,4 @@ def run_evaluation():
 
 
 if __name__ == "__main__":
-    run_evaluation()
+    run_evaluation(local_only="--local" in sys.argv[1:])
@@ -0,0 +1,466 @@
+"""
+Local Evaluator Pack — deterministic, offline scoring for CI
+
+Code-only evaluators with the same call signature as the Azure AI
+Evaluation built-ins, so they plug into ``evaluate()`` next to
+``PlatformComplianceEvaluator``.  No network, no model: the whole pack
+scores a dataset in seconds and gives the same answer every run.
+
+  1. BriefCoverageEvaluator      — share of the brief's key terms (key
+                                   message, destinations, audience) that
+                                   appear in the response          ~ Relevance
+  2. ReadabilityEvaluator        — Flesch reading ease of the posts
+                                   (hashtags, URLs and emojis removed) ~ Coherence
+  3. StructureEvaluator          — conformance to the Publisher output
+                                   format: three platform sections in order,
+                                   non-empty, hashtags + CTA, no leftover
+                                   reflection notes                ~ TaskAdherence
+  4. OverlapGroundednessEvaluator — share of the response's content words
+                                   found in the brief, context and brand
+                                   guidelines                      ~ Groundedness
+  5. DuplicationEvaluator        — copy-paste between the platform posts,
+                                   and near-duplicates of earlier responses
+
+All scores are on the 1-5 scale used by the built-in evaluators.
+
+Calibration against the LLM judges (``eval_output_*`` files written by
+``evaluate.py``) reports, per local/LLM metric pair, the correlation, the
+mean absolute difference and pass/fail agreement at the built-in threshold
+of 3, plus a least-squares linear map from local to LLM score:
+
+    python evaluation/local_evaluators.py --calibrate
+    python evaluation/local_evaluators.py --calibrate evaluation/eval_output_2026*
+
+Offline evaluation of the latest agent results (no Azure):
+
+    python evaluation/evaluate.py --local
+"""
+
+import glob
+import hashlib
+import inspect
+import json
+import os
+import re
+import sys
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from grounding.guideline_cache import load_guidelines
+
+DEFAULT_GUIDELINES_PATH = "grounding/brand-guidelines.md"
+
+_STOPWORDS = frozenset("""
+a an and are as at be been but by can do for from get has have how i if in
+into is it its just more most my no not of on or our out so than that the
+their them then there these they this to up us was we what when where which
+who will with you your all any every from about over new now one only very
+create content social media brand platforms industry key message target
+audience destinations post posts linkedin twitter instagram x
+""".split())
+
+_WORD = re.compile(r"[a-zà-öø-ÿ0-9][a-zà-öø-ÿ0-9'’-]*", re.IGNORECASE)
+_HASHTAG = re.compile(r"#\w+")
+_URL = re.compile(r"\b(?:https?://)?(?:www\.)?[\w-]+(?:\.[\w-]+)*\.(?:com|net|org|io|co|travel)\S*", re.IGNORECASE)
+_EMOJI = re.compile("[\U0001F000-\U0001FAFF☀-➿️‍]")
+_SENTENCE_END = re.compile(r"[.!?]+(?:\s|$)|\n+")
+_BRIEF_FIELD = re.compile(r"^(Key Message|Destinations|Target Audience)\s*:\s*(.+)$", re.IGNORECASE | re.MULTILINE)
+
+# Section headers: Publisher output (**LINKEDIN POST**) or the processed
+# evaluation response (LINKEDIN POST:).
+_SECTIONS = (
+    ("linkedin", re.compile(r"^\s*(?:\*\*LINKEDIN POST\*\*|LINKEDIN POST:)", re.IGNORECASE | re.MULTILINE)),
+    ("twitter", re.compile(r"^\s*(?:\*\*X/?TWITTER POST\*\*|X/?TWITTER POST:)", re.IGNORECASE | re.MULTILINE)),
+    ("instagram", re.compile(r"^\s*(?:\*\*INSTAGRAM POST\*\*|INSTAGRAM POST:)", re.IGNORECASE | re.MULTILINE)),
+)
+_CTA = re.compile(
+    r"\b(book|explore|discover|learn|start|join|plan|tag|share|drop|comment|visit|"
+    r"click|tap|sign up|check out|follow|save|dm)\b|👉|→",
+    re.IGNORECASE,
+)
+_META = re.compile(r"Reflection Checks|PASS/FAIL|\[Agent Name|Character count:", re.IGNORECASE)
+
+
+# ============================================================================
+# Text helpers
+# ============================================================================
+
+def _stem(word: str) -> str:
+    word = word.lower().strip("'’-").replace("’", "'")
+    if word.endswith("'s"):
+        word = word[:-2]
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def _plain(text: str) -> str:
+    """Text without hashtags, URLs and emojis."""
+    return _EMOJI.sub(" ", _URL.sub(" ", _HASHTAG.sub(" ", text or "")))
+
+
+def content_terms(text: str) -> List[str]:
+    """Stemmed, non-stopword words of *text* in order of appearance."""
+    terms = []
+    for w in _WORD.findall(_plain(text)):
+        stem = _stem(w)
+        if len(stem) > 2 and stem not in _STOPWORDS and not stem.isdigit():
+            terms.append(stem)
+    return terms
+
+
+def split_platform_posts(response: str) -> Dict[str, str]:
+    """Platform → post text, in the order the sections appear."""
+    found = []
+    for name, pattern in _SECTIONS:
+        m = pattern.search(response or "")
+        if m:
+            found.append((m.start(), m.end(), name))
+    found.sort()
+    posts = {}
+    for i, (_, end, name) in enumerate(found):
+        stop = found[i + 1][0] if i + 1 < len(found) else len(response)
+        body = response[end:stop].strip()
+        posts[name] = re.sub(r"\n-{3,}\s*$", "", body).strip()
+    return posts
+
+
+def _posts_text(response: str) -> str:
+    posts = split_platform_posts(response)
+    return "\n\n".join(posts.values()) if posts else (response or "")
+
+
+def _syllables(word: str) -> int:
+    word = word.lower()
+    groups = re.findall(r"[aeiouy]+", word)
+    count = len(groups)
+    if word.endswith("e") and not word.endswith(("le", "ee")) and count > 1:
+        count -= 1
+    return max(1, count)
+
+
+def _shingles(text: str, size: int = 3) -> Set[Tuple[str, ...]]:
+    words = [w.lower() for w in _WORD.findall(_plain(text))]
+    return {tuple(words[i:i + size]) for i in range(max(len(words) - size + 1, 0))}
+
+
+def _jaccard(a: Set, b: Set) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def _scale(fraction: float) -> float:
+    """0..1 → 1..5."""
+    return round(1 + 4 * max(0.0, min(1.0, fraction)), 2)
+
+
+# ============================================================================
+# Evaluators
+# ============================================================================
+
+class BriefCoverageEvaluator:
+    """
+    Lexical coverage of the brief: the key message, destinations and target
+    audience terms from the ``query`` that the response actually mentions.
+    """
+
+    def __call__(self, *, response: str, query: str = "", **kwargs) -> dict:
+        fields = _BRIEF_FIELD.findall(query or "")
+        source = " ".join(value for _, value in fields) or (query or "")
+        terms = list(dict.fromkeys(content_terms(source)))
+        present = set(content_terms(response))
+        missing = [t for t in terms if t not in present]
+        coverage = 1 - len(missing) / len(terms) if terms else 1.0
+        return {
+            "brief_coverage": _scale(coverage),
+            "brief_coverage_ratio": round(coverage, 3),
+            "brief_coverage_missing": ", ".join(missing) if missing else "All key terms covered",
+        }
+
+
+class ReadabilityEvaluator:
+    """
+    Flesch reading ease of the post text.  Social copy reads best at 60+
+    (plain English); the score drops one point per 10 FRE below that.
+    """
+
+    def __call__(self, *, response: str, **kwargs) -> dict:
+        text = _plain(_posts_text(response))
+        words = _WORD.findall(text)
+        sentences = [s for s in _SENTENCE_END.split(text) if _WORD.search(s)]
+        if not words:
+            return {"readability": 1.0, "readability_flesch": 0.0, "readability_words_per_sentence": 0.0}
+        per_sentence = len(words) / max(1, len(sentences))
+        syllables = sum(_syllables(w) for w in words) / len(words)
+        flesch = 206.835 - 1.015 * per_sentence - 84.6 * syllables
+        score = max(1.0, min(5.0, 5 - (60 - flesch) / 10)) if flesch < 60 else 5.0
+        return {
+            "readability": round(score, 2),
+            "readability_flesch": round(flesch, 1),
+            "readability_words_per_sentence": round(per_sentence, 1),
+        }
+
+
+class StructureEvaluator:
+    """Conformance of the response to the Publisher's three-platform format."""
+
+    CHECKS = (
+        "all_platforms_present",
+        "platform_order",
+        "no_empty_posts",
+        "hashtags_in_every_post",
+        "cta_in_every_post",
+        "no_reflection_leftovers",
+    )
+
+    def __call__(self, *, response: str, **kwargs) -> dict:
+        posts = split_platform_posts(response)
+        bodies = list(posts.values())
+        checks = {
+            "all_platforms_present": len(posts) == len(_SECTIONS),
+            "platform_order": list(posts) == [n for n, _ in _SECTIONS if n in posts],
+            "no_empty_posts": bool(bodies) and all(bodies),
+            "hashtags_in_every_post": bool(bodies) and all(_HASHTAG.search(b) for b in bodies),
+            "cta_in_every_post": bool(bodies) and all(_CTA.search(b) for b in bodies),
+            "no_reflection_leftovers": not any(_META.search(b) for b in bodies),
+        }
+        failed = [name for name in self.CHECKS if not checks[name]]
+        passed = len(self.CHECKS) - len(failed)
+        return {
+            "structure": round(passed / len(self.CHECKS) * 5, 1),
+            "structure_details": json.dumps(checks),
+            "structure_issues": "; ".join(failed) if failed else "All checks passed",
+        }
+
+
+class OverlapGroundednessEvaluator:
+    """
+    Share of the response's content words that appear in the brief
+    (``query``), ``context`` or brand guidelines.  Words with no source are
+    listed (most frequent first) so drift is easy to spot.
+    """
+
+    def __init__(self, guidelines_path: str = DEFAULT_GUIDELINES_PATH):
+        self.guidelines_path = guidelines_path
+
+    def _guideline_terms(self) -> Set[str]:
+        doc = load_guidelines(self.guidelines_path)
+        return set(content_terms(doc.content)) if doc else set()
+
+    def __call__(self, *, response: str, query: str = "", context: str = "", **kwargs) -> dict:
+        source = self._guideline_terms() | set(content_terms(f"{query}\n{context}"))
+        terms = content_terms(_posts_text(response))
+        if not terms:
+            return {"overlap_groundedness": 5.0, "overlap_groundedness_ratio": 1.0,
+                    "overlap_groundedness_unsupported": ""}
+        unsupported: Dict[str, int] = {}
+        for t in terms:
+            if t not in source:
+                unsupported[t] = unsupported.get(t, 0) + 1
+        ratio = 1 - sum(unsupported.values()) / len(terms)
+        top = sorted(unsupported, key=lambda t: (-unsupported[t], t))[:10]
+        return {
+            "overlap_groundedness": _scale(ratio),
+            "overlap_groundedness_ratio": round(ratio, 3),
+            "overlap_groundedness_unsupported": ", ".join(top),
+        }
+
+
+class DuplicationEvaluator:
+    """
+    Copy-paste detection with 3-word shingles.
+
+    Within a response: the highest Jaccard similarity between any two
+    platform posts (each platform should be rewritten, not pasted).
+    Across runs: the highest similarity to any response in ``history``.
+    Score 5 at ≤ 0.2 similarity, falling to 1 at ≥ 0.8.
+
+    ``VERSION`` includes a digest of the history, so the eval cache does
+    not reuse cross-run scores computed against different earlier runs.
+    """
+
+    def __init__(self, history: Optional[Iterable[str]] = None):
+        history = list(history or ())
+        self._history = [s for s in (_shingles(_posts_text(h)) for h in history) if s]
+        digest = hashlib.sha256()
+        for h in history:
+            digest.update(h.encode("utf-8") + b"\0")
+        source = hashlib.sha256(inspect.getsource(type(self)).encode("utf-8")).hexdigest()[:12]
+        self.VERSION = f"{source}:history-{digest.hexdigest()[:12]}"
+
+    def __call__(self, *, response: str, **kwargs) -> dict:
+        posts = split_platform_posts(response)
+        pairs = {
+            f"{a}/{b}": _jaccard(_shingles(posts[a]), _shingles(posts[b]))
+            for a, b in combinations(posts, 2)
+        }
+        cross_post = max(pairs.values(), default=0.0)
+        whole = _shingles(_posts_text(response))
+        cross_run = max((_jaccard(whole, h) for h in self._history), default=0.0)
+        worst = max(cross_post, cross_run)
+        return {
+            "duplication": _scale(1 - (worst - 0.2) / 0.6),
+            "duplication_cross_post": round(cross_post, 3),
+            "duplication_cross_run": round(cross_run, 3),
+        }
+
+
+def find_near_duplicates(responses: List[str], threshold: float = 0.6) -> List[Tuple[int, int, float]]:
+    """Pairs of dataset rows whose posts are near-duplicates of each other."""
+    shingles = [_shingles(_posts_text(r)) for r in responses]
+    return [
+        (i, j, round(sim, 3))
+        for i, j in combinations(range(len(responses)), 2)
+        for sim in (_jaccard(shingles[i], shingles[j]),)
+        if sim >= threshold
+    ]
+
+
+# ============================================================================
+# evaluate() wiring
+# ============================================================================
+
+def local_evaluators(history: Optional[Iterable[str]] = None) -> Dict[str, object]:
+    """Name → evaluator for every evaluator in the pack."""
+    return {
+        "brief_coverage": BriefCoverageEvaluator(),
+        "readability": ReadabilityEvaluator(),
+        "structure": StructureEvaluator(),
+        "overlap_groundedness": OverlapGroundednessEvaluator(),
+        "duplication": DuplicationEvaluator(history),
+    }
+
+
+def local_evaluator_config() -> Dict[str, dict]:
+    """``evaluator_config`` column mappings for ``local_evaluators()``."""
+    full = {"query": "${data.query}", "response": "${data.response}", "context": "${data.context}"}
+    return {name: {"column_mapping": dict(full)} for name in local_evaluators()}
+
+
+# ============================================================================
+# Calibration against LLM judges
+# ============================================================================
+
+# Local metric → LLM metrics it approximates.
+CALIBRATION_PAIRS = {
+    "brief_coverage": ("relevance", "task_adherence"),
+    "readability": ("coherence",),
+    "structure": ("task_adherence", "coherence"),
+    "overlap_groundedness": ("groundedness",),
+    "duplication": ("coherence",),
+}
+
+PASS_THRESHOLD = 3
+
+
+def _pearson(xs: List[float], ys: List[float]) -> Optional[float]:
+    n = len(xs)
+    if n < 2:
+        return None
+    mx, my = sum(xs) / n, sum(ys) / n
+    sxx = sum((x - mx) ** 2 for x in xs)
+    syy = sum((y - my) ** 2 for y in ys)
+    if sxx == 0 or syy == 0:
+        return None
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / (sxx * syy) ** 0.5
+
+
+def _linear_fit(xs: List[float], ys: List[float]) -> Tuple[float, float]:
+    """Least-squares ``y ≈ a * x + b`` (offset only when x is constant)."""
+    n = len(xs)
+    mx, my = sum(xs) / n, sum(ys) / n
+    sxx = sum((x - mx) ** 2 for x in xs)
+    if sxx == 0:
+        return 1.0, my - mx
+    a = sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / sxx
+    return a, my - a * mx
+
+
+def _llm_scores(row: dict, metric: str) -> Optional[float]:
+    value = row.get(f"outputs.{metric}.{metric}")
+    if metric == "task_adherence" and isinstance(value, (int, float)):
+        return 5.0 if value >= 1 else 1.0   # binary judge → scale ends
+    return float(value) if isinstance(value, (int, float)) else None
+
+
+def calibrate(paths: List[str]) -> dict:
+    """Score every row of the given ``eval_output_*`` files locally and compare."""
+    evaluators = local_evaluators()
+    pairs: Dict[Tuple[str, str], List[Tuple[float, float]]] = {}
+    rows_seen = 0
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            rows = json.load(f).get("rows", [])
+        for row in rows:
+            rows_seen += 1
+            inputs = {
+                "response": row.get("inputs.response", ""),
+                "query": row.get("inputs.query", ""),
+                "context": row.get("inputs.context", ""),
+            }
+            for name, evaluator in evaluators.items():
+                local = evaluator(**inputs)[name]
+                for metric in CALIBRATION_PAIRS[name]:
+                    llm = _llm_scores(row, metric)
+                    if llm is not None:
+                        pairs.setdefault((name, metric), []).append((local, llm))
+
+    results = []
+    for (name, metric), values in sorted(pairs.items()):
+        xs, ys = [v[0] for v in values], [v[1] for v in values]
+        a, b = _linear_fit(xs, ys)
+        fitted = [a * x + b for x in xs]
+        results.append({
+            "local": name,
+            "llm": metric,
+            "n": len(values),
+            "local_mean": round(sum(xs) / len(xs), 3),
+            "llm_mean": round(sum(ys) / len(ys), 3),
+            "pearson_r": None if _pearson(xs, ys) is None else round(_pearson(xs, ys), 3),
+            "mean_abs_diff": round(sum(abs(x - y) for x, y in values) / len(values), 3),
+            "mean_abs_diff_fitted": round(sum(abs(f - y) for f, y in zip(fitted, ys)) / len(ys), 3),
+            "pass_agreement": round(
+                sum((x >= PASS_THRESHOLD) == (y >= PASS_THRESHOLD) for x, y in values) / len(values), 3),
+            "fit": {"slope": round(a, 4), "intercept": round(b, 4)},
+        })
+    return {"files": [os.path.relpath(p) for p in paths], "rows": rows_seen, "pairs": results}
+
+
+def _main(argv: List[str]) -> None:
+    import argparse
+
+    eval_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Local evaluator pack")
+    parser.add_argument("--calibrate", nargs="*", metavar="EVAL_OUTPUT",
+                        help="Compare with LLM scores (default: evaluation/eval_output_*)")
+    parser.add_argument("--output", default=os.path.join(eval_dir, "local_calibration.json"))
+    args = parser.parse_args(argv)
+
+    if args.calibrate is None:
+        parser.print_help()
+        return
+    paths = args.calibrate or sorted(glob.glob(os.path.join(eval_dir, "eval_output_*")))
+    paths = [p for p in paths if os.path.isfile(p)]
+    if not paths:
+        print("❌ No eval_output_* files found. Run evaluate.py with the LLM judges first.")
+        sys.exit(1)
+
+    report = calibrate(paths)
+    print(f"\n📐 Local evaluator calibration — {report['rows']} rows from {len(paths)} file(s)\n")
+    print(f"  {'local → llm':<38} {'n':>3} {'local':>6} {'llm':>6} {'r':>6} {'MAD':>6} {'fitMAD':>7} {'agree':>6}")
+    for p in report["pairs"]:
+        r = "—" if p["pearson_r"] is None else f"{p['pearson_r']:.2f}"
+        print(f"  {p['local'] + ' → ' + p['llm']:<38} {p['n']:>3} {p['local_mean']:>6.2f} "
+              f"{p['llm_mean']:>6.2f} {r:>6} {p['mean_abs_diff']:>6.2f} "
+              f"{p['mean_abs_diff_fitted']:>7.2f} {p['pass_agreement']:>6.0%}")
+    print("\n  r = Pearson correlation (— when either side is constant)")
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n  📄 Calibration report: {args.output}\n")
+
+
+if __name__ == "__main__":
+    _main(sys.argv[1:])
@@ -0,0 +1,235 @@
+"""
+Brand Registry — multi-brand tenancy
+
+Maps brand ids (and display-name aliases such as the ``brand_name`` of a
+``CampaignBriefRequest``) to that brand's guideline file, compiled rule set
+and agent prompt variants, as declared in ``grounding/brands.json``:
+
+    {
+      "default": "zava-travel",
+      "brands": {
+        "zava-travel": {
+          "name": "Zava Travel Inc.",
+          "aliases": ["Zava Travel"],
+          "guidelines": "grounding/brand-guidelines.md",
+          "rules": "grounding/brand-rules.json",
+          "prompts": {"Creator": "brands/zava/creator.md"}   # optional
+        }
+      }
+    }
+
+Only the manifest is read at startup.  A brand is loaded on first use and
+kept in a bounded LRU (``BRAND_CACHE_SIZE``, default 64) together with its
+compiled rules, grounding index and rendered instructions; evicted brands
+release their cached guideline document and rules unless a brand still
+loaded uses the same files.  Unknown brand names fall back to the default
+brand (with one warning per name).
+
+Prompt variants are instruction templates with the same ``{placeholders}``
+as ``agents/*.py``; agents without a variant use the shared template.
+
+Configuration (env vars):
+    BRAND_REGISTRY_PATH   Manifest path (default grounding/brands.json)
+    BRAND_CACHE_SIZE      Max brands kept loaded (default 64)
+
+Usage:
+    brand = get_brand_registry().get(brief.brand_name)
+    creator = create_grounded_agent(
+        client, "Creator", brand.instructions("Creator"),
+        brand_guidelines_path=brand.guidelines_path,
+        prompt_name=brand.prompt_name("Creator"),
+    )
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from grounding.brand_rules import BrandRules, evict_brand_rules, load_brand_rules
+from grounding.guideline_cache import get_guideline_cache
+from grounding.guideline_index import GuidelineIndex
+
+DEFAULT_REGISTRY_PATH = "grounding/brands.json"
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", (name or "").lower()).strip("-")
+
+
+def _default_templates() -> Dict[str, str]:
+    # Imported lazily: the agent modules render their own default prompt
+    # from the default rules at import time.
+    from agents.creator import CREATOR_INSTRUCTIONS_TEMPLATE
+    from agents.publisher import PUBLISHER_INSTRUCTIONS_TEMPLATE
+    from agents.reviewer import REVIEWER_INSTRUCTIONS_TEMPLATE
+
+    return {
+        "Creator": CREATOR_INSTRUCTIONS_TEMPLATE,
+        "Reviewer": REVIEWER_INSTRUCTIONS_TEMPLATE,
+        "Publisher": PUBLISHER_INSTRUCTIONS_TEMPLATE,
+    }
+
+
+@dataclass(frozen=True)
+class BrandConfig:
+    """One brand entry from the manifest (paths only — nothing loaded)."""
+    id: str
+    name: str
+    guidelines_path: str
+    rules_path: str
+    aliases: Tuple[str, ...] = ()
+    prompt_paths: Tuple[Tuple[str, str], ...] = ()
+
+
+@dataclass
+class BrandContext:
+    """A loaded brand: rules, grounding index and rendered instructions."""
+    config: BrandConfig
+    is_default: bool = False
+    index: GuidelineIndex = field(init=False)
+    _templates: Dict[str, str] = field(default_factory=dict, repr=False)
+    _rendered: Dict[Tuple[str, str], str] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self):
+        self.index = GuidelineIndex(self.config.guidelines_path)
+        self.index.refresh()
+        defaults = _default_templates()
+        self._templates = dict(defaults)
+        for agent, path in self.config.prompt_paths:
+            with open(path, "r", encoding="utf-8") as f:
+                self._templates[agent] = f.read()
+        load_brand_rules(self.config.rules_path)  # compile and validate on load
+
+    @property
+    def id(self) -> str:
+        return self.config.id
+
+    @property
+    def guidelines_path(self) -> str:
+        return self.config.guidelines_path
+
+    @property
+    def rules(self) -> BrandRules:
+        """Compiled rules (mtime-checked, so rule edits hot-reload)."""
+        return load_brand_rules(self.config.rules_path)
+
+    def instructions(self, agent: str) -> str:
+        """Rendered instructions for *agent*, memoised per rules version."""
+        rules = self.rules
+        key = (agent, rules.sha256)
+        text = self._rendered.get(key)
+        if text is None:
+            text = rules.render(self._templates[agent])
+            self._rendered = {k: v for k, v in self._rendered.items() if k[1] == rules.sha256}
+            self._rendered[key] = text
+        return text
+
+    def prompt_name(self, agent: str) -> str:
+        """Prompt-registry name: the agent name, brand-qualified off-default."""
+        return agent if self.is_default else f"{self.id}:{agent}"
+
+    def release(self, in_use: frozenset = frozenset()) -> None:
+        """Drop process-wide caches held for this brand, except paths in *in_use*."""
+        if os.path.abspath(self.config.guidelines_path) not in in_use:
+            get_guideline_cache().invalidate(self.config.guidelines_path)
+        if os.path.abspath(self.config.rules_path) not in in_use:
+            evict_brand_rules(self.config.rules_path)
+
+
+class BrandRegistry:
+    """Lazy, bounded-LRU registry of brands declared in a manifest."""
+
+    def __init__(self, path: Optional[str] = None, capacity: Optional[int] = None):
+        self.path = path or os.getenv("BRAND_REGISTRY_PATH", DEFAULT_REGISTRY_PATH)
+        self.capacity = max(1, capacity or int(os.getenv("BRAND_CACHE_SIZE", "64")))
+        self._lock = threading.Lock()
+        self._loaded: "OrderedDict[str, BrandContext]" = OrderedDict()
+        self._warned: set = set()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.configs: Dict[str, BrandConfig] = {}
+        self._aliases: Dict[str, str] = {}
+        for brand_id, spec in manifest.get("brands", {}).items():
+            config = BrandConfig(
+                id=brand_id,
+                name=spec.get("name", brand_id),
+                guidelines_path=spec["guidelines"],
+                rules_path=spec["rules"],
+                aliases=tuple(spec.get("aliases", [])),
+                prompt_paths=tuple(sorted(spec.get("prompts", {}).items())),
+            )
+            self.configs[brand_id] = config
+            for alias in (brand_id, config.name, *config.aliases):
+                self._aliases[_slug(alias)] = brand_id
+        self.default_id = manifest.get("default") or next(iter(self.configs), "")
+
+    def resolve(self, brand: Optional[str]) -> str:
+        """Map a brand id or display name to a brand id (default if unknown)."""
+        brand_id = self._aliases.get(_slug(brand or ""))
+        if brand_id is None:
+            if brand and brand not in self._warned and len(self._warned) < 1024:
+                self._warned.add(brand)
+                print(f"⚠️ Unknown brand '{brand}' — using '{self.default_id}'")
+            return self.default_id
+        return brand_id
+
+    def get(self, brand: Optional[str] = None) -> BrandContext:
+        """Return the loaded context for *brand*, loading it on first use."""
+        brand_id = self.resolve(brand)
+        with self._lock:
+            ctx = self._loaded.get(brand_id)
+            if ctx is not None:
+                self._loaded.move_to_end(brand_id)
+                self.hits += 1
+                return ctx
+            self.misses += 1
+
+        ctx = BrandContext(self.configs[brand_id], is_default=brand_id == self.default_id)
+        with self._lock:
+            existing = self._loaded.get(brand_id)
+            if existing is not None:  # loaded concurrently
+                return existing
+            self._loaded[brand_id] = ctx
+            while len(self._loaded) > self.capacity:
+                _, evicted = self._loaded.popitem(last=False)
+                # Brands can share guideline / rules files: keep those warm
+                in_use = frozenset(
+                    os.path.abspath(path) for c in self._loaded.values()
+                    for path in (c.config.guidelines_path, c.config.rules_path)
+                )
+                evicted.release(in_use)
+                self.evictions += 1
+        return ctx
+
+    def stats(self) -> dict:
+        return {
+            "brands": len(self.configs),
+            "loaded": len(self._loaded),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+_registry: Optional[BrandRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_brand_registry() -> BrandRegistry:
+    """Return the process-wide brand registry (manifest read on first call)."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = BrandRegistry()
+        return _registry
@@ -0,0 +1,260 @@
+"""
+Brand Rules Compiler
+
+Competitors, banned words, hashtag rules and platform limits live in one
+structured file (``grounding/brand-rules.json``).  This module compiles it
+into a single immutable ``BrandRules`` object that every consumer loads:
+
+  - safety/brand_filters.py    (competitor / banned-word output filters)
+  - evaluation/evaluate.py     (PlatformComplianceEvaluator)
+  - utils/formatting.py        (per-platform validators)
+  - agents/*.py                (rule values rendered into the instructions)
+
+Competitor and banned-word patterns are precompiled into one alternation so
+a post is scanned in a single pass.  Compiled rules are cached per path and
+versioned by the sha256 of the file, so editing a rule never requires
+touching the consumers — the next lookup picks up the new version.
+
+Usage:
+    rules = load_brand_rules()
+    hits = rules.scan(text)            # competitors + banned words, one pass
+    limit = rules.platform("twitter").max_chars
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(__file__), "brand-rules.json")
+
+
+# ============================================================================
+# Compiled rule objects
+# ============================================================================
+
+@dataclass(frozen=True)
+class PlatformRules:
+    """Formatting constraints for one social platform."""
+    name: str
+    hashtags: Tuple[int, int]
+    max_chars: Optional[int] = None
+    words: Optional[Tuple[int, int]] = None
+    typical_words: Optional[Tuple[int, int]] = None
+    min_emojis: int = 0
+    paragraphs: Optional[bool] = None      # True = required, False = forbidden
+    image_suggestion: bool = False
+
+    @property
+    def hashtag_range(self) -> str:
+        return f"{self.hashtags[0]}-{self.hashtags[1]}"
+
+
+@dataclass(frozen=True)
+class RuleMatches:
+    """Result of a single-pass scan: canonical terms in rule order."""
+    competitors: Tuple[str, ...] = ()
+    banned_words: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class BrandRules:
+    """Immutable, precompiled brand rule set."""
+    brand_id: str
+    brand_name: str
+    short_name: str
+    industry: str
+    tagline: str
+    competitors: Tuple[str, ...]
+    banned_words: Mapping[str, str]          # word → suggested replacement
+    mandatory_hashtag: str
+    approved_hashtags: Tuple[str, ...]
+    destinations: Tuple[str, ...]
+    platforms: Mapping[str, PlatformRules]
+    sha256: str = ""
+    source: str = ""
+    _scan_re: re.Pattern = field(default=None, repr=False, compare=False)
+
+    @property
+    def version(self) -> str:
+        return f"{self.brand_id}@{self.sha256[:12]}"
+
+    # ── checking ───────────────────────────────────────────────────────
+    def scan(self, text: str) -> RuleMatches:
+        """Find competitor mentions and banned words in one regex pass."""
+        competitors, banned = set(), set()
+        for m in self._scan_re.finditer(text or ""):
+            if m.lastgroup == "competitor":
+                competitors.add(m.group().lower())
+            else:
+                banned.add(re.sub(r"\s+", " ", m.group().lower()))
+        return RuleMatches(
+            competitors=tuple(c for c in self.competitor_keys if c in competitors),
+            banned_words=tuple(w for w in self.banned_words if w in banned),
+        )
+
+    @property
+    def competitor_keys(self) -> Tuple[str, ...]:
+        """Lower-cased competitor names (the form used in flags / issues)."""
+        return tuple(c.lower() for c in self.competitors)
+
+    def has_brand_hashtag(self, text: str) -> bool:
+        return self.mandatory_hashtag.lower() in (text or "").lower()
+
+    def platform(self, name: str) -> PlatformRules:
+        """Constraints for *name* ("linkedin", "twitter"/"x", "instagram")."""
+        key = name.lower().replace("x/twitter", "twitter")
+        key = "twitter" if key == "x" else key
+        return self.platforms[key]
+
+    # ── prompts ────────────────────────────────────────────────────────
+    def prompt_fields(self) -> Dict[str, object]:
+        """Values substituted into the agent instruction templates."""
+        fields: Dict[str, object] = {
+            "brand_name": self.brand_name,
+            "brand_short_name": self.short_name,
+            "industry": self.industry,
+            "brand_hashtag": self.mandatory_hashtag,
+            "approved_hashtags": ", ".join(self.approved_hashtags),
+            "destinations": ", ".join(self.destinations),
+            "competitors": ", ".join(self.competitors),
+        }
+        for name, p in self.platforms.items():
+            fields[f"{name}_hashtags"] = p.hashtag_range
+            fields[f"{name}_hashtags_min"], fields[f"{name}_hashtags_max"] = p.hashtags
+            if p.max_chars:
+                fields[f"{name}_max_chars"] = p.max_chars
+        return fields
+
+    def render(self, template: str) -> str:
+        """Fill ``{placeholders}`` in an instruction template from the rules."""
+        return template.format(**self.prompt_fields())
+
+
+# ============================================================================
+# Compiler
+# ============================================================================
+
+def _range(value) -> Optional[Tuple[int, int]]:
+    if value is None:
+        return None
+    low, high = value
+    return (int(low), int(high))
+
+
+def compile_brand_rules(data: dict, source: str = "", sha256: str = "") -> BrandRules:
+    """
+    Compile a parsed brand-rules document into a ``BrandRules`` object.
+
+    Raises:
+        ValueError: when a required section is missing or malformed.
+    """
+    try:
+        brand = data["brand"]
+        hashtags = data["hashtags"]
+        platforms = {
+            name.lower(): PlatformRules(
+                name=name.lower(),
+                hashtags=_range(spec["hashtags"]),
+                max_chars=spec.get("max_chars"),
+                words=_range(spec.get("words")),
+                typical_words=_range(spec.get("typical_words")),
+                min_emojis=int(spec.get("min_emojis", 0)),
+                paragraphs=spec.get("paragraphs"),
+                image_suggestion=bool(spec.get("image_suggestion", False)),
+            )
+            for name, spec in data["platforms"].items()
+        }
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid brand rules {source or ''}: {e}") from e
+
+    competitors = tuple(data.get("competitors", []))
+    banned = {w.lower(): r for w, r in data.get("banned_words", {}).items()}
+
+    # Competitors match anywhere (substring); banned words match on a word
+    # start so "cheap" also catches "cheaper" / "cheapest".
+    alternatives = []
+    if competitors:
+        alternatives.append(
+            "(?P<competitor>" + "|".join(re.escape(c.lower()) for c in competitors) + ")"
+        )
+    if banned:
+        words = sorted(banned, key=len, reverse=True)
+        alternatives.append(
+            r"(?P<banned>\b(?:"
+            + "|".join(re.escape(w).replace(r"\ ", r"\s+") for w in words)
+            + "))"
+        )
+    scan_re = re.compile("|".join(alternatives) or r"(?!x)x", re.IGNORECASE)
+
+    return BrandRules(
+        brand_id=brand.get("id", ""),
+        brand_name=brand.get("name", ""),
+        short_name=brand.get("short_name", brand.get("name", "")),
+        industry=brand.get("industry", ""),
+        tagline=brand.get("tagline", ""),
+        competitors=competitors,
+        banned_words=MappingProxyType(banned),
+        mandatory_hashtag=hashtags.get("mandatory", ""),
+        approved_hashtags=tuple(hashtags.get("approved", [])),
+        destinations=tuple(data.get("destinations", [])),
+        platforms=MappingProxyType(platforms),
+        sha256=sha256,
+        source=source,
+        _scan_re=scan_re,
+    )
+
+
+# ============================================================================
+# Cached loader
+# ============================================================================
+
+_cache: Dict[str, Tuple[Tuple[float, int], BrandRules]] = {}
+_lock = threading.Lock()
+
+
+def read_brand_rules(path: str) -> BrandRules:
+    """Read and compile *path* without caching."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    return compile_brand_rules(
+        json.loads(raw), source=path, sha256=hashlib.sha256(raw).hexdigest(),
+    )
+
+
+def evict_brand_rules(path: str) -> None:
+    """Drop the cached rules for *path* (e.g. when a brand is unloaded)."""
+    with _lock:
+        _cache.pop(os.path.abspath(path), None)
+
+
+def load_brand_rules(path: str = DEFAULT_RULES_PATH) -> BrandRules:
+    """
+    Return the compiled rules for *path*, recompiling only when it changes.
+
+    The file is stat-ed on each call; a touched file with identical content
+    (same sha256) keeps the already compiled object.
+    """
+    key = os.path.abspath(path)
+    st = os.stat(key)
+    stamp = (st.st_mtime, st.st_size)
+    entry = _cache.get(key)
+    if entry is not None and entry[0] == stamp:
+        return entry[1]
+
+    with _lock:
+        with open(key, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        if entry is not None and entry[1].sha256 == digest:
+            rules = entry[1]
+        else:
+            rules = compile_brand_rules(json.loads(raw), source=path, sha256=digest)
+        _cache[key] = (stamp, rules)
+        return rules
@@ -0,0 +1,275 @@
+"""
+Local Fact Index & Claim Verifier
+
+A cheap, deterministic groundedness check: facts are extracted from the
+brand guidelines and the campaign brief, claims are extracted from each
+generated post, and any claim not backed by a fact is flagged — in
+milliseconds, with no LLM call.
+
+Fact / claim kinds:
+  - price        "$699", "$1,299"   supported if stated in the brief or within
+                                    the guidelines' price range ($699–$2,199)
+  - offer        "30%"              supported if stated in the brief/guidelines
+  - destination  "Bali", "Peru"     places from a small travel gazetteer;
+                                    supported if it, or the country / region
+                                    it lies in ("Hanoi" → Vietnam), is named
+                                    in the brief/guidelines
+  - duration     "7-day", "48 hours" supported if stated in the brief/guidelines
+  - hashtag      "#ZavaPeru"        brand-namespaced hashtags must be approved
+  - url          "zavatravel.com"   domain must appear in the brief/guidelines
+
+Guideline facts are cached per guideline version; brief facts are merged
+per call.
+
+Usage:
+    facts = get_fact_index(brief_text)
+    report = verify_claims(post_text, facts)
+    for claim in report.unsupported:
+        print(claim.kind, claim.text, claim.reason)
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from grounding.brand_rules import BrandRules, load_brand_rules
+from grounding.guideline_cache import load_guidelines
+
+DEFAULT_GUIDELINES_PATH = "grounding/brand-guidelines.md"
+
+# Places a travel post is likely to name.  Only used to *detect* destination
+# claims; whether a place is supported comes from the guidelines and brief.
+KNOWN_DESTINATIONS = (
+    "Bali", "Ubud", "Indonesia", "Patagonia", "Torres del Paine", "Argentina",
+    "Chile", "Iceland", "Reykjavik", "Vietnam", "Hanoi", "Halong Bay",
+    "Hoi An", "Ho Chi Minh City", "Saigon", "Costa Rica", "Colombia",
+    "Medellín", "Medellin", "Cartagena", "Georgia", "Morocco", "Marrakech",
+    "Sahara", "Portugal", "Lisbon", "Algarve", "Nepal", "Annapurna",
+    "Kathmandu", "Peru", "Machu Picchu", "Cusco", "Bolivia", "Ecuador",
+    "Galápagos", "Galapagos", "Mexico", "Tulum", "Cancun", "Thailand",
+    "Bangkok", "Phuket", "Cambodia", "Laos", "Philippines", "Malaysia",
+    "Japan", "Tokyo", "Kyoto", "India", "Sri Lanka", "Maldives", "Italy",
+    "Rome", "Amalfi", "France", "Paris", "Spain", "Barcelona", "Greece",
+    "Santorini", "Croatia", "Turkey", "Jordan", "Egypt", "Kenya", "Tanzania",
+    "South Africa", "Norway", "Scotland", "Ireland", "Switzerland", "Canada",
+    "Alaska", "Hawaii", "New Zealand", "Australia", "Fiji", "Dubai",
+)
+
+# Sub-destination → the country / region it lies in.  A post naming a city
+# of a destination the brief names ("Street food in Hanoi" for a Vietnam
+# brief) is grounded.
+PARENT_DESTINATIONS = {
+    "ubud": "bali", "bali": "indonesia",
+    "torres del paine": "patagonia", "patagonia": "chile",
+    "reykjavik": "iceland",
+    "hanoi": "vietnam", "halong bay": "vietnam", "hoi an": "vietnam",
+    "ho chi minh city": "vietnam", "saigon": "vietnam",
+    "medellín": "colombia", "medellin": "colombia", "cartagena": "colombia",
+    "marrakech": "morocco", "sahara": "morocco",
+    "lisbon": "portugal", "algarve": "portugal",
+    "annapurna": "nepal", "kathmandu": "nepal",
+    "machu picchu": "peru", "cusco": "peru",
+    "galápagos": "ecuador", "galapagos": "ecuador",
+    "tulum": "mexico", "cancun": "mexico",
+    "bangkok": "thailand", "phuket": "thailand",
+    "tokyo": "japan", "kyoto": "japan",
+    "rome": "italy", "amalfi": "italy", "paris": "france",
+    "barcelona": "spain", "santorini": "greece",
+}
+
+_PRICE = re.compile(r"\$\s?(\d{1,3}(?:,\d{3})+|\d+)(?:\.\d{2})?")
+_PERCENT = re.compile(r"\b(\d{1,3})\s?%")
+_DURATION = re.compile(r"\b(\d{1,3})[\s-]*(day|night|week|hour|hr)s?\b", re.IGNORECASE)
+_HASHTAG = re.compile(r"#\w+")
+_URL = re.compile(
+    r"\b(?:https?://)?(?:www\.)?((?:[a-z0-9-]+\.)+(?:com|net|org|io|co|travel))\b",
+    re.IGNORECASE,
+)
+_DESTINATION = re.compile(
+    r"\b(" + "|".join(re.escape(d) for d in sorted(KNOWN_DESTINATIONS, key=len, reverse=True)) + r")\b"
+)
+_BRAND_PREFIX = re.compile(r"#[A-Z][a-z0-9]+")
+
+_DURATION_UNITS = {"hr": "hour"}
+
+
+def _price(raw: str) -> int:
+    return int(raw.replace(",", ""))
+
+
+def _duration(num: str, unit: str) -> str:
+    unit = unit.lower()
+    return f"{int(num)} {_DURATION_UNITS.get(unit, unit)}"
+
+
+def _destination_supported(place: str, facts: "FactIndex") -> bool:
+    """*place* or a country / region containing it is a known fact."""
+    seen = set()
+    while place and place not in seen:
+        if place in facts.destinations:
+            return True
+        seen.add(place)
+        place = PARENT_DESTINATIONS.get(place, "")
+    return False
+
+
+# ============================================================================
+# Facts
+# ============================================================================
+
+@dataclass(frozen=True)
+class FactIndex:
+    """Facts that generated content may claim."""
+    prices: FrozenSet[int] = frozenset()
+    price_range: Optional[Tuple[int, int]] = None   # from the guidelines only
+    offers: FrozenSet[int] = frozenset()
+    destinations: FrozenSet[str] = frozenset()      # lower-cased
+    durations: FrozenSet[str] = frozenset()
+    hashtags: FrozenSet[str] = frozenset()          # lower-cased
+    domains: FrozenSet[str] = frozenset()
+    brand_hashtag_prefix: str = ""                  # e.g. "#zava"
+
+    @classmethod
+    def from_text(cls, text: str, with_range: bool = False) -> "FactIndex":
+        prices = frozenset(_price(m) for m in _PRICE.findall(text))
+        return cls(
+            prices=prices,
+            price_range=(min(prices), max(prices)) if with_range and prices else None,
+            offers=frozenset(int(p) for p in _PERCENT.findall(text)),
+            destinations=frozenset(d.lower() for d in _DESTINATION.findall(text)),
+            durations=frozenset(_duration(n, u) for n, u in _DURATION.findall(text)),
+            hashtags=frozenset(h.lower() for h in _HASHTAG.findall(text)),
+            domains=frozenset(d.lower() for d in _URL.findall(text)),
+        )
+
+    def merged(self, other: "FactIndex") -> "FactIndex":
+        return FactIndex(
+            prices=self.prices | other.prices,
+            price_range=self.price_range or other.price_range,
+            offers=self.offers | other.offers,
+            destinations=self.destinations | other.destinations,
+            durations=self.durations | other.durations,
+            hashtags=self.hashtags | other.hashtags,
+            domains=self.domains | other.domains,
+            brand_hashtag_prefix=self.brand_hashtag_prefix or other.brand_hashtag_prefix,
+        )
+
+
+_guideline_facts: Dict[Tuple[str, str], FactIndex] = {}
+
+
+def _facts_for_guidelines(path: str, rules: BrandRules) -> FactIndex:
+    doc = load_guidelines(path)
+    key = (doc.sha256 if doc else "", rules.sha256)
+    facts = _guideline_facts.get(key)
+    if facts is None:
+        text = doc.content if doc else ""
+        base = FactIndex.from_text(text, with_range=True)
+        prefix = _BRAND_PREFIX.match(rules.mandatory_hashtag or "")
+        extra = FactIndex(
+            destinations=frozenset(d.lower() for d in rules.destinations),
+            hashtags=frozenset(h.lower() for h in rules.approved_hashtags),
+            brand_hashtag_prefix=prefix.group().lower() if prefix else "",
+        )
+        facts = base.merged(extra)
+        if len(_guideline_facts) >= 256:  # stale versions / evicted brands
+            _guideline_facts.clear()
+        _guideline_facts[key] = facts
+    return facts
+
+
+def get_fact_index(
+    brief: str = "",
+    guidelines_path: str = DEFAULT_GUIDELINES_PATH,
+    rules: Optional[BrandRules] = None,
+) -> FactIndex:
+    """Facts from the (cached) guidelines and rules, plus those in *brief*."""
+    facts = _facts_for_guidelines(guidelines_path, rules or load_brand_rules())
+    return facts.merged(FactIndex.from_text(brief)) if brief else facts
+
+
+# ============================================================================
+# Claims
+# ============================================================================
+
+@dataclass(frozen=True)
+class Claim:
+    """One checkable statement found in generated content."""
+    kind: str          # price | offer | destination | duration | hashtag | url
+    text: str
+    supported: bool
+    reason: str = ""
+
+
+@dataclass
+class ClaimReport:
+    """Claims found in one text and whether each is backed by a fact."""
+    claims: List[Claim] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+    @property
+    def unsupported(self) -> List[Claim]:
+        return [c for c in self.claims if not c.supported]
+
+    @property
+    def score(self) -> float:
+        """Share of supported claims on the 1-5 evaluator scale (5 if none)."""
+        if not self.claims:
+            return 5.0
+        supported = len(self.claims) - len(self.unsupported)
+        return round(1 + 4 * supported / len(self.claims), 2)
+
+
+def extract_claims(text: str, facts: FactIndex) -> List[Claim]:
+    """Extract claims from *text* and check each against *facts*."""
+    claims: List[Claim] = []
+    seen = set()
+
+    def add(kind: str, surface: str, supported: bool, reason: str):
+        key = (kind, surface.lower())
+        if key not in seen:
+            seen.add(key)
+            claims.append(Claim(kind, surface, supported, "" if supported else reason))
+
+    for m in _PRICE.finditer(text):
+        value = _price(m.group(1))
+        low_high = facts.price_range
+        ok = value in facts.prices or (
+            low_high is not None and low_high[0] <= value <= low_high[1]
+        )
+        bounds = f"${low_high[0]:,}–${low_high[1]:,}" if low_high else "none"
+        add("price", m.group(), ok, f"not in brief and outside guideline range ({bounds})")
+
+    for m in _PERCENT.finditer(text):
+        add("offer", m.group(), int(m.group(1)) in facts.offers,
+            "offer not stated in brief or guidelines")
+
+    for m in _DESTINATION.finditer(text):
+        add("destination", m.group(), _destination_supported(m.group().lower(), facts),
+            "destination not in brief or guidelines")
+
+    for m in _DURATION.finditer(text):
+        add("duration", m.group(), _duration(m.group(1), m.group(2)) in facts.durations,
+            "duration not stated in brief or guidelines")
+
+    if facts.brand_hashtag_prefix:
+        for tag in _HASHTAG.findall(text):
+            if tag.lower().startswith(facts.brand_hashtag_prefix):
+                add("hashtag", tag, tag.lower() in facts.hashtags,
+                    "brand hashtag not in approved list")
+
+    for m in _URL.finditer(text):
+        add("url", m.group(), m.group(1).lower() in facts.domains,
+            "domain not in brief or guidelines")
+
+    return claims
+
+
+def verify_claims(text: str, facts: FactIndex) -> ClaimReport:
+    """Run the extractor over *text* and time it."""
+    start = time.perf_counter()
+    claims = extract_claims(text or "", facts)
+    return ClaimReport(claims=claims, elapsed_ms=(time.perf_counter() - start) * 1000)
@@ -7,28 +7,48 @@ voice, tone, colours, hashtags, and constraints during content generation.
 
 This avoids the need for vector-store / File Search APIs and works with
 any Azure OpenAI deployment (Chat Completions or Responses).
+
+The final prompt is assembled through the prompt registry with the static
+role instructions first and the guidelines block second, so every request
+sends a byte-identical, versioned prefix that provider prompt caching can
+reuse.
+
+When a ``brief`` is supplied the whole document is no longer embedded:
+``grounding.guideline_index`` picks the always-on core rules (kept in the
+static prefix) plus the BM25 top-k sections for that brief, which are
+appended after the prefix.  Set ``GROUNDING_MODE=full`` to embed the whole
+file as before.
+
+Guideline files are read through ``grounding.guideline_cache``: one
+``os.stat`` per agent construction, re-read only when the file changes.
+
+``pitfalls`` (the "Known Pitfalls" section from ``grounding.pitfall_memory``)
+goes last, after the cached prefix and the retrieved sections.
 """
 
 from __future__ import annotations
 
-import os
-
 from agent_framework import Agent
 
+from agents.prompt_registry import get_prompt_registry
+from grounding.guideline_cache import build_grounding_block, load_guidelines
+from grounding.guideline_index import get_guideline_index, retrieval_enabled
+
+
+# Prompt versions already announced on stdout (print once, not per request)
+_announced: set[str] = set()
+
+
+def _announce(key: str, message: str) -> None:
+    if key not in _announced:
+        _announced.add(key)
+        print(message)
+
 
 def _load_brand_guidelines(file_path: str) -> str | None:
-    """Read the brand-guidelines file and return its content."""
-    if not os.path.exists(file_path):
-        print(f"⚠️ Brand guidelines not found: {file_path}")
-        return None
-    try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-        print(f"📄 Loaded brand guidelines ({len(content):,} chars) from {file_path}")
-        return content
-    except Exception as e:
-        print(f"❌ Failed to read brand guidelines: {e}")
-        return None
+    """Return the brand-guidelines content (cached; re-read only on change)."""
+    doc = load_guidelines(file_path)
+    return doc.content if doc else None
 
 
 def create_grounded_agent(
@@ -36,6 +56,11 @@ def create_grounded_agent(
     name: str,
     instructions: str,
     brand_guidelines_path: str = "grounding/brand-guidelines.md",
+    middleware: list | None = None,
+    brief: str | None = None,
+    prompt_name: str | None = None,
+    guideline_index=None,
+    pitfalls: str = "",
 ) -> Agent:
     """
     Create an Agent whose instructions include the full brand guidelines.
@@ -50,29 +75,79 @@ def create_grounded_agent(
         name: Agent display name.
         instructions: Base system-prompt instructions.
         brand_guidelines_path: Path to the brand-guidelines markdown file.
+        middleware: Optional agent / chat middleware (e.g. context policy).
+        brief: Campaign brief used to retrieve only the relevant guideline
+            sections. ``None`` embeds the full guidelines.
+        prompt_name: Prompt-registry name (defaults to *name*); brand-qualified
+            for non-default brands so their versions are tracked separately.
+        guideline_index: ``GuidelineIndex`` to retrieve from (e.g. a brand's
+            own index); defaults to the shared index for the path.
+        pitfalls: Instructions suffix with past Reviewer pitfalls (see
+            ``grounding.pitfall_memory.pitfall_section``).
 
     Returns:
         ``Agent`` instance with grounded instructions.
     """
-    guidelines = _load_brand_guidelines(brand_guidelines_path)
-
-    if guidelines:
-        instructions += (
-            "\n\n"
-            "## Brand Guidelines Reference\n"
-            "Use the following brand guidelines when generating content. "
-            "Cite specific brand elements (voice, tone, hashtags, pricing, "
-            "competitor restrictions) in your reasoning.\n\n"
-            "<brand-guidelines>\n"
-            f"{guidelines}\n"
-            "</brand-guidelines>"
+    if brief and retrieval_enabled() and load_guidelines(brand_guidelines_path):
+        return _create_retrieval_grounded_agent(
+            client, name, instructions, brand_guidelines_path, middleware, brief,
+            prompt_name or name, guideline_index, pitfalls,
         )
-        print("✅ Brand guidelines embedded in Creator instructions")
+
+    doc = load_guidelines(brand_guidelines_path)
+    grounding = doc.grounding_block if doc else ""
+
+    prompt = get_prompt_registry().register(prompt_name or name, instructions, grounding)
+    if grounding:
+        _announce(prompt.version, f"✅ Brand guidelines embedded in {name} instructions "
+                                  f"({prompt.version}, ~{doc.tokens:,} tokens)")
     else:
-        print("⚠️ Creator will run without brand guidelines grounding")
+        _announce(f"{name}:ungrounded", f"⚠️ {name} will run without brand guidelines grounding")
+
+    return Agent(
+        client=client,
+        name=name,
+        instructions=prompt.text + pitfalls,
+        middleware=middleware or None,
+    )
+
+
+def _create_retrieval_grounded_agent(
+    client,
+    name: str,
+    instructions: str,
+    brand_guidelines_path: str,
+    middleware: list | None,
+    brief: str,
+    prompt_name: str,
+    guideline_index=None,
+    pitfalls: str = "",
+) -> Agent:
+    """Ground *name* with core rules + the guideline sections relevant to *brief*."""
+    index = guideline_index or get_guideline_index(brand_guidelines_path)
+    selection = index.select(brief)
+
+    core = build_grounding_block(selection.core_text())
+    prompt = get_prompt_registry().register(prompt_name, instructions, core)
+
+    text = prompt.text
+    if selection.retrieved:
+        text += (
+            "\n\n## Brand Guidelines Relevant to This Brief\n"
+            "<brand-guidelines-retrieved>\n"
+            f"{selection.retrieved_text()}\n"
+            "</brand-guidelines-retrieved>"
+        )
+    text += pitfalls
+
+    titles = ", ".join(s.title for s, _ in selection.retrieved) or "none"
+    _announce(f"{prompt.version}:{titles}",
+              f"✅ Brand guidelines retrieved for {name} ({prompt.version}): "
+              f"core + [{titles}] (~{selection.tokens:,} tokens)")
 
     return Agent(
         client=client,
         name=name,
-        instructions=instructions,
+        instructions=text,
+        middleware=middleware or None,
     )
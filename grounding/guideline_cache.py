@@ -0,0 +1,150 @@
+"""
+Brand Guidelines Cache
+
+Process-wide, hot-reloadable cache for the brand-guidelines markdown.
+
+Each agent construction used to open and read the file from disk (and print
+about it).  The cache keeps one ``GuidelineDocument`` per path together with
+its derived forms — the ``<brand-guidelines>`` grounding block, content hash
+and token estimate — so repeated agent construction costs a single
+``os.stat``.
+
+Invalidation is by mtime + size: an edited file is re-read on the next
+lookup, so guideline changes apply without restarting the API server.
+``reload_guidelines()`` forces a re-read (e.g. after an atomic replace that
+preserved the mtime).
+
+Usage:
+    doc = load_guidelines("grounding/brand-guidelines.md")
+    if doc:
+        prompt = registry.register("Creator", CREATOR_INSTRUCTIONS, doc.grounding_block)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+
+def build_grounding_block(guidelines: str) -> str:
+    """Wrap the full guidelines in the delimited block used in instructions."""
+    return (
+        "## Brand Guidelines Reference\n"
+        "Use the following brand guidelines when generating content. "
+        "Cite specific brand elements (voice, tone, hashtags, pricing, "
+        "competitor restrictions) in your reasoning.\n\n"
+        "<brand-guidelines>\n"
+        f"{guidelines}\n"
+        "</brand-guidelines>"
+    )
+
+
+@dataclass(frozen=True)
+class GuidelineDocument:
+    """A loaded guidelines file plus its precomputed derived forms."""
+    path: str
+    content: str
+    sha256: str
+    mtime: float
+    size: int
+    grounding_block: str
+
+    @property
+    def tokens(self) -> int:
+        """Approximate tokens of the grounding block (chars / 4)."""
+        return len(self.grounding_block) // 4
+
+    @property
+    def version(self) -> str:
+        return self.sha256[:12]
+
+
+class GuidelineCache:
+    """mtime-invalidated cache of guideline documents, keyed by absolute path."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._docs: Dict[str, Tuple[Optional[Tuple[float, int]], Optional[GuidelineDocument]]] = {}
+        self.hits = 0
+        self.loads = 0
+
+    @staticmethod
+    def _stamp(path: str) -> Optional[Tuple[float, int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime, st.st_size)
+
+    def get(self, path: str) -> Optional[GuidelineDocument]:
+        """Return the document for *path*, re-reading it only if it changed."""
+        key = os.path.abspath(path)
+        stamp = self._stamp(key)
+        entry = self._docs.get(key)
+        if entry is not None and entry[0] == stamp:
+            self.hits += 1
+            return entry[1]
+
+        with self._lock:
+            entry = self._docs.get(key)
+            if entry is not None and entry[0] == stamp:
+                self.hits += 1
+                return entry[1]
+            doc = self._read(path, stamp, reloaded=entry is not None)
+            self._docs[key] = (stamp, doc)
+            return doc
+
+    def _read(self, path: str, stamp, reloaded: bool) -> Optional[GuidelineDocument]:
+        if stamp is None:
+            print(f"⚠️ Brand guidelines not found: {path}")
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                content = f.read()
+        except Exception as e:
+            print(f"❌ Failed to read brand guidelines: {e}")
+            return None
+
+        self.loads += 1
+        doc = GuidelineDocument(
+            path=path,
+            content=content,
+            sha256=hashlib.sha256(content.encode("utf-8")).hexdigest(),
+            mtime=stamp[0],
+            size=stamp[1],
+            grounding_block=build_grounding_block(content),
+        )
+        verb = "Reloaded" if reloaded else "Loaded"
+        print(f"📄 {verb} brand guidelines ({len(content):,} chars, "
+              f"v{doc.version}) from {path}")
+        return doc
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """Drop *path* (or every entry) so the next lookup re-reads from disk."""
+        with self._lock:
+            if path is None:
+                self._docs.clear()
+            else:
+                self._docs.pop(os.path.abspath(path), None)
+
+
+_cache = GuidelineCache()
+
+
+def get_guideline_cache() -> GuidelineCache:
+    """Return the process-wide guideline cache."""
+    return _cache
+
+
+def load_guidelines(path: str) -> Optional[GuidelineDocument]:
+    """Cached load of the guidelines at *path* (``None`` if unavailable)."""
+    return _cache.get(path)
+
+
+def reload_guidelines(path: Optional[str] = None) -> Optional[GuidelineDocument]:
+    """Force a re-read of *path* (or clear the cache when no path is given)."""
+    _cache.invalidate(path)
+    return _cache.get(path) if path else None
@@ -0,0 +1,411 @@
+"""
+Brand Guidelines Retrieval Index
+
+Instead of embedding the whole ``brand-guidelines.md`` into every Creator
+call, the guidelines are split into heading-based sections and indexed with
+BM25 (pure Python, no network).  Each brief then gets:
+
+  - the always-on **core rules** (words to avoid, competitors, mandatory
+    hashtag, core voice, pricing pillar, flagship destinations) — static, so they stay part of the cacheable
+    prompt prefix, and
+  - the **top-k** sections that best match the brief, within a token budget.
+
+The index is rebuilt automatically whenever the guidelines file changes
+(the shared ``guideline_cache`` checks mtime / size on every lookup).
+
+Configuration (env vars):
+    GROUNDING_MODE           "retrieval" (default) or "full" (embed whole file)
+    GROUNDING_TOP_K          Sections retrieved per brief (default 4)
+    GROUNDING_TOKEN_BUDGET   Max tokens for core + retrieved sections (default 1200)
+    GROUNDING_CORE_SECTIONS  Comma-separated heading substrings always included
+
+Benchmark (prompt tokens and grounding latency vs full embed):
+    python -m grounding.guideline_index --benchmark
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from grounding.guideline_cache import load_guidelines
+
+DEFAULT_GUIDELINES_PATH = "grounding/brand-guidelines.md"
+
+DEFAULT_CORE_SECTIONS = (
+    "Core Voice Attributes",
+    "Tone by Platform",
+    "Words We Avoid",
+    "Pillar 1: Affordability Without Compromise",
+    "Tier 1: Flagship Destinations",
+    "Primary (Always Include One)",
+    "Competitors (DO NOT mention positively in content)",
+    "Competitive Messaging Rules",
+)
+
+_HEADING = re.compile(r"^(#{1,3})\s+(.+?)\s*$")
+_WORD = re.compile(r"[a-z0-9$#][a-z0-9$#,'\-]*[a-z0-9]|[a-z0-9]")
+
+_STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the
+this to was were will with you your our we us not no do does should must
+all any each into about over more most than then them they their there
+""".split())
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count (chars / 4), matching the telemetry estimate."""
+    return len(text or "") // 4
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens with stop words removed (hashtags kept whole)."""
+    tokens = []
+    for tok in _WORD.findall((text or "").lower()):
+        tok = tok.strip(",'-")
+        if tok and tok not in _STOPWORDS:
+            tokens.append(tok)
+            if tok.startswith("#") and len(tok) > 1:
+                tokens.append(tok[1:])
+    return tokens
+
+
+# ============================================================================
+# Sections
+# ============================================================================
+
+@dataclass(frozen=True)
+class Section:
+    """One heading-delimited chunk of the guidelines."""
+    id: int
+    title: str
+    path: str          # "5. Key Destinations > Tier 1: Flagship Destinations"
+    text: str          # markdown including its heading line
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.text)
+
+
+def split_sections(markdown: str) -> List[Section]:
+    """
+    Split markdown into sections at ``#``/``##``/``###`` headings.
+
+    A ``##`` heading followed directly by ``###`` sub-headings produces no
+    section of its own; its title is carried in each child's ``path``.
+    Horizontal rules (``---``) are dropped.
+    """
+    sections: List[Section] = []
+    parents: Dict[int, str] = {}
+    title, level, body = "", 0, []
+
+    def flush():
+        text = "\n".join(line for line in body if line.strip() != "---").strip()
+        heading_only = len(text.splitlines()) <= 1
+        if title and not heading_only:
+            trail = [parents[lvl] for lvl in sorted(parents) if 1 < lvl < level]
+            path = " > ".join([*trail, title])
+            sections.append(Section(len(sections), title, path, text))
+
+    for line in markdown.splitlines():
+        m = _HEADING.match(line)
+        if m:
+            flush()
+            level, title = len(m.group(1)), m.group(2)
+            parents = {k: v for k, v in parents.items() if k < level}
+            parents[level] = title
+            body = [line]
+        else:
+            body.append(line)
+    flush()
+    return sections
+
+
+# ============================================================================
+# BM25
+# ============================================================================
+
+class BM25:
+    """Okapi BM25 over a list of token lists (pure Python)."""
+
+    def __init__(self, docs: List[List[str]], k1: float = 1.5, b: float = 0.75):
+        self.k1, self.b = k1, b
+        self.tf = [Counter(d) for d in docs]
+        self.lengths = [len(d) for d in docs]
+        self.avgdl = (sum(self.lengths) / len(docs)) if docs else 0.0
+        df = Counter(term for d in docs for term in set(d))
+        n = len(docs)
+        self.idf = {
+            term: math.log(1 + (n - freq + 0.5) / (freq + 0.5))
+            for term, freq in df.items()
+        }
+
+    def scores(self, query: List[str]) -> List[float]:
+        out = []
+        for tf, dl in zip(self.tf, self.lengths):
+            norm = self.k1 * (1 - self.b + self.b * dl / (self.avgdl or 1))
+            s = 0.0
+            for term in query:
+                f = tf.get(term)
+                if f:
+                    s += self.idf[term] * f * (self.k1 + 1) / (f + norm)
+            out.append(s)
+        return out
+
+
+# ============================================================================
+# Index
+# ============================================================================
+
+@dataclass
+class GroundingSelection:
+    """Sections chosen for one brief."""
+    core: List[Section]
+    retrieved: List[Tuple[Section, float]] = field(default_factory=list)
+
+    @property
+    def tokens(self) -> int:
+        return sum(s.tokens for s in self.core) + sum(s.tokens for s, _ in self.retrieved)
+
+    def core_text(self) -> str:
+        return "\n\n".join(s.text for s in self.core)
+
+    def retrieved_text(self) -> str:
+        return "\n\n".join(s.text for s, _ in self.retrieved)
+
+
+class GuidelineIndex:
+    """
+    BM25 index over the heading sections of one guidelines file.
+
+    The file is read through the process-wide guideline cache; a change in
+    content hash triggers a rebuild, so edits apply without a restart.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_GUIDELINES_PATH,
+        core_sections: Optional[Tuple[str, ...]] = None,
+    ):
+        self.path = path
+        self.core_sections = core_sections or _core_sections_from_env()
+        self._lock = threading.Lock()
+        self._sha: Optional[str] = None
+        self.sections: List[Section] = []
+        self.full_text = ""
+        self._bm25: Optional[BM25] = None
+        self._core_ids: List[int] = []
+        self.builds = 0
+
+    # ── build / refresh ────────────────────────────────────────────────
+    def refresh(self) -> bool:
+        """Rebuild the index if the file changed. Returns True if rebuilt."""
+        doc = load_guidelines(self.path)
+        sha = doc.sha256 if doc else None
+        if self.builds and sha == self._sha:
+            return False
+        with self._lock:
+            if self.builds and sha == self._sha:
+                return False
+            self._build(doc.content if doc else "")
+            self._sha = sha
+            return True
+
+    def _build(self, text: str) -> None:
+        sections = split_sections(text)
+        self._bm25 = BM25([tokenize(s.path + "\n" + s.text) for s in sections])
+        wanted = [c.lower() for c in self.core_sections]
+        self._core_ids = [
+            s.id for s in sections
+            if any(w in s.title.lower() for w in wanted)
+        ]
+        self.sections = sections
+        self.full_text = text
+        self.builds += 1
+
+    # ── lookup ─────────────────────────────────────────────────────────
+    def search(self, query: str, k: int = 4) -> List[Tuple[Section, float]]:
+        """Top-*k* non-core sections for *query*, best first (score > 0)."""
+        self.refresh()
+        if not self._bm25:
+            return []
+        scores = self._bm25.scores(tokenize(query))
+        core = set(self._core_ids)
+        ranked = sorted(
+            (i for i in range(len(scores)) if i not in core and scores[i] > 0),
+            key=lambda i: scores[i],
+            reverse=True,
+        )
+        return [(self.sections[i], scores[i]) for i in ranked[:k]]
+
+    def select(
+        self,
+        query: str,
+        top_k: Optional[int] = None,
+        token_budget: Optional[int] = None,
+    ) -> GroundingSelection:
+        """
+        Core rules plus the best-matching sections that fit *token_budget*.
+
+        Core rules are always included (even if they exceed the budget);
+        retrieved sections are added best-first, and one that does not fit
+        is trimmed to the remaining budget rather than skipped.
+        """
+        top_k = top_k if top_k is not None else int(os.getenv("GROUNDING_TOP_K", "4"))
+        if token_budget is None:
+            token_budget = int(os.getenv("GROUNDING_TOKEN_BUDGET", "1200"))
+
+        self.refresh()
+        selection = GroundingSelection(core=[self.sections[i] for i in self._core_ids])
+        used = selection.tokens
+        for section, score in self.search(query, k=top_k):
+            if used + section.tokens > token_budget:
+                section = _trim(section, token_budget - used)
+                if section is None:
+                    continue
+            selection.retrieved.append((section, score))
+            used += section.tokens
+        # Keep document order for readability
+        selection.retrieved.sort(key=lambda item: item[0].id)
+        return selection
+
+
+def _trim(section: Section, budget: int) -> Optional[Section]:
+    """*section* cut to whole lines within *budget*, or None if only the heading fits."""
+    lines = section.text.splitlines()
+    kept = lines[:1]
+    for line in lines[1:]:
+        if estimate_tokens("\n".join([*kept, line])) > budget:
+            break
+        kept.append(line)
+    if len(kept) < 2:
+        return None
+    return Section(section.id, section.title, section.path, "\n".join(kept))
+
+
+def _core_sections_from_env() -> Tuple[str, ...]:
+    raw = os.getenv("GROUNDING_CORE_SECTIONS", "").strip()
+    if not raw:
+        return DEFAULT_CORE_SECTIONS
+    return tuple(part.strip() for part in raw.split(",") if part.strip())
+
+
+_indexes: Dict[str, GuidelineIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_guideline_index(path: str = DEFAULT_GUIDELINES_PATH) -> GuidelineIndex:
+    """Return the process-wide index for *path* (built lazily)."""
+    key = os.path.abspath(path)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = GuidelineIndex(path)
+    index.refresh()
+    return index
+
+
+def retrieval_enabled() -> bool:
+    """True unless ``GROUNDING_MODE=full``."""
+    return os.getenv("GROUNDING_MODE", "retrieval").lower().strip() != "full"
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+
+def benchmark(briefs: List[str], path: str = DEFAULT_GUIDELINES_PATH, repeat: int = 200) -> dict:
+    """
+    Compare grounding prompt tokens and assembly latency: full embed vs BM25.
+
+    Latency is the local cost of producing the grounding block per brief
+    (file read for full embed; warm index lookup for retrieval).
+    """
+    index = GuidelineIndex(path)
+    t0 = time.perf_counter()
+    index.refresh()
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    full_tokens = estimate_tokens(index.full_text)
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for _brief in briefs:
+            with open(path, "r", encoding="utf-8") as f:
+                f.read()
+    full_ms = (time.perf_counter() - t0) * 1000 / (repeat * len(briefs))
+
+    rows = []
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for brief in briefs:
+            index.select(brief)
+    retrieval_ms = (time.perf_counter() - t0) * 1000 / (repeat * len(briefs))
+
+    for brief in briefs:
+        sel = index.select(brief)
+        rows.append({
+            "brief": brief[:60],
+            "retrieved": [s.title for s, _ in sel.retrieved],
+            "tokens": sel.tokens,
+        })
+
+    avg = sum(r["tokens"] for r in rows) / len(rows) if rows else 0
+    return {
+        "sections": len(index.sections),
+        "index_build_ms": round(build_ms, 3),
+        "full_embed_tokens": full_tokens,
+        "retrieval_avg_tokens": round(avg, 1),
+        "token_reduction_pct": round(100 * (1 - avg / full_tokens), 1) if full_tokens else 0.0,
+        "full_embed_ms_per_brief": round(full_ms, 4),
+        "retrieval_ms_per_brief": round(retrieval_ms, 4),
+        "briefs": rows,
+    }
+
+
+def _load_briefs(dataset_path: str) -> List[str]:
+    import json
+
+    briefs = []
+    with open(dataset_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                briefs.append(json.loads(line).get("query", ""))
+    return [b for b in briefs if b]
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Brand guidelines retrieval index")
+    parser.add_argument("--benchmark", action="store_true", help="Compare with full embed")
+    parser.add_argument("--dataset", default="evaluation/eval_dataset.jsonl")
+    parser.add_argument("--query", help="Show the sections selected for a brief")
+    parser.add_argument("--path", default=DEFAULT_GUIDELINES_PATH)
+    args = parser.parse_args()
+
+    if args.query:
+        sel = get_guideline_index(args.path).select(args.query)
+        print(f"📚 Core rules: {[s.title for s in sel.core]}")
+        for s, score in sel.retrieved:
+            print(f"   🔎 {score:6.2f}  {s.path}  (~{s.tokens} tokens)")
+        print(f"   Σ ~{sel.tokens} tokens")
+    else:
+        report = benchmark(_load_briefs(args.dataset), args.path)
+        print("📊 Grounding benchmark — full embed vs BM25 retrieval")
+        print(f"   Sections indexed:      {report['sections']} (built in {report['index_build_ms']} ms)")
+        print(f"   Prompt tokens:         ~{report['full_embed_tokens']:,} → "
+              f"~{report['retrieval_avg_tokens']:,.0f} avg (-{report['token_reduction_pct']}%)")
+        print(f"   Grounding latency:     {report['full_embed_ms_per_brief']} ms → "
+              f"{report['retrieval_ms_per_brief']} ms per brief")
+        for row in report["briefs"]:
+            print(f"   • {row['brief']}… → {row['retrieved']} (~{row['tokens']} tokens)")
+        if args.benchmark:
+            print(json.dumps({k: v for k, v in report.items() if k != "briefs"}, indent=2))
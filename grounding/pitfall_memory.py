@@ -0,0 +1,355 @@
+"""
+Pitfall Memory — what the Reviewer keeps sending back, fed to the Creator
+
+The Reviewer flags the same things run after run: a generic "journey of a
+lifetime" hook, a missing brand hashtag, a "Book now" CTA.  This module
+mines the ``**Action**`` lines of REVISE verdicts from completed
+transcripts into a persistent (SQLite) store, groups them into known
+failure patterns (generic hook, transactional CTA, missing hashtags,
+unsupported claims, ...; anything else is kept as its own pattern), and
+renders the most frequent ones as a short "Known Pitfalls" section that
+is appended to the Creator's instructions — after the cached prompt
+prefix, so provider prompt caching is unaffected.
+
+Counts decay with a half-life, so a pitfall the Creator has stopped making
+drops out; patterns whose decayed weight falls below ``PRUNE_WEIGHT`` are
+deleted, and each brand keeps at most ``PITFALL_MAX_PATTERNS`` rows (the
+one-off "other" patterns would otherwise grow the store without bound).  The section is bounded (items and characters), only lists
+patterns seen at least ``PITFALL_MIN_COUNT`` times, and is re-read from the
+store at most every ``PITFALL_REFRESH_SECONDS``.  Each transcript is mined
+once (keyed by a hash of its turns), and memories are kept per brand.
+
+Configuration (env vars):
+    PITFALL_MEMORY            "on" (default) or "off"
+    PITFALL_MEMORY_PATH       SQLite file (default grounding/.pitfall_memory.sqlite)
+    PITFALL_MAX_ITEMS         Pitfalls in the Creator section (default 5)
+    PITFALL_MAX_CHARS         Max section length (default 700)
+    PITFALL_MIN_COUNT         Times a pattern must be seen first (default 2)
+    PITFALL_MAX_PATTERNS      Patterns kept per brand (default 200)
+    PITFALL_HALF_LIFE_DAYS    Count half-life (default 30)
+    PITFALL_REFRESH_SECONDS   How long a rendered section is reused (default 300)
+
+Usage:
+    creator = create_grounded_agent(..., pitfalls=pitfall_section(rules))
+    ...run the workflow...
+    record_transcript([(name, text) for ...], rules)
+
+    python -m grounding.pitfall_memory mine output/*.md    # backfill from saved transcripts
+    python -m grounding.pitfall_memory show
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from grounding.brand_rules import BrandRules, load_brand_rules
+
+DEFAULT_MEMORY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".pitfall_memory.sqlite")
+
+_AGENT_TAG = re.compile(r"\[Agent Name:\s*(\w+)\]")
+_REVISE = re.compile(r"\*\*VERDICT\*\*:?\s*REVISE", re.IGNORECASE)
+_ACTION = re.compile(r"\*\*Action\*\*:?[ \t]*(.*?)(?=\n[ \t]*\n|\n\*\*|\Z)", re.DOTALL)
+_RECOMMENDED = re.compile(r"^\s*RECOMMENDED CHANGES?:?\s*", re.IGNORECASE)
+_ITEM = re.compile(r"(?:^|\s)(?:\d+\.|\(\d+\))\s+")
+_NO_CHANGE = re.compile(r"^no\b|no (?:revisions?|changes?|improvements?) needed", re.IGNORECASE)
+_WORD = re.compile(r"[a-z][a-z'-]{2,}")
+
+# key → (what an Action line says, the pitfall told to the Creator).
+# Lines are rendered with the brand rules ({brand_hashtag}, {competitors}, ...).
+PATTERNS: Tuple[Tuple[str, re.Pattern, str], ...] = tuple(
+    (key, re.compile(pattern, re.IGNORECASE), text) for key, pattern, text in (
+        ("generic_hook",
+         r"generic|clich|journey of a lifetime|unforgettable|once[- ]in[- ]a[- ]lifetime|overused",
+         'Generic hooks ("journey of a lifetime", "unforgettable experience") — open with a concrete '
+         "destination image, a question or a bold claim"),
+        ("transactional_cta",
+         r"book now|transactional|salesy|sales pitch|pushy|soften (?:the )?CTA",
+         'Transactional CTAs like "Book now" — invite exploration instead '
+         '("Start planning your adventure at zavatravel.com")'),
+        ("missing_hashtags",
+         r"hashtag|add\s*#\w+",
+         "Missing or unapproved hashtags — always include {brand_hashtag} (approved: {approved_hashtags})"),
+        ("weak_cta",
+         r"\bCTA\b|call[- ]to[- ]action",
+         "Weak or missing call to action — end with one clear, specific next step"),
+        ("unsupported_claims",
+         r"inaccura|factual|seasonal|out of season|unsupported|not supported|verify",
+         "Claims the brief or guidelines do not support (e.g. out-of-season highlights) — "
+         "state only facts you can ground"),
+        ("vague_destinations",
+         r"vague|lacks? (?:\w+ )?specific|(?:no|missing|name the) destinations?",
+         "Vague destinations — name the brief's destinations with one vivid, concrete detail each"),
+        ("budget_message",
+         r"budget|afford|price|pricing|\$\d",
+         'Vague budget messaging ("won\'t cost a fortune") — state the starting price or the value explicitly'),
+        ("too_long",
+         r"too long|over 150|under 150|word count|shorten|trim",
+         "Drafts over 150 words — keep the draft tight"),
+        ("corporate_tone",
+         r"corporate|stuffy|too formal|flat tone",
+         "Corporate or flat tone — write adventurous, inspiring copy for Millennial / Gen-Z travelers"),
+        ("competitor",
+         r"competitor",
+         "Competitor mentions ({competitors}) — never name them"),
+    )
+)
+
+_OTHER_CHARS = 140
+
+# Decayed weight below which a pattern is deleted (one sighting, ~4 half-lives ago)
+PRUNE_WEIGHT = 0.05
+
+
+def memory_enabled() -> bool:
+    return os.getenv("PITFALL_MEMORY", "on").lower().strip() not in ("off", "0", "false", "no")
+
+
+# ============================================================================
+# Mining
+# ============================================================================
+
+def revise_actions(text: str) -> List[str]:
+    """The ``**Action**`` recommendations of a Reviewer turn, if its verdict is REVISE.
+
+    Numbered lists ("1. ..." or "(1) ...") become one action per item.
+    """
+    if not _REVISE.search(text or ""):
+        return []
+    actions = []
+    for m in _ACTION.finditer(text):
+        block = _RECOMMENDED.sub("", m.group(1)).strip()
+        for item in _ITEM.split(block):
+            item = " ".join(item.split())
+            if len(item.split()) >= 3 and not _NO_CHANGE.search(item):
+                actions.append(item)
+    return actions
+
+
+def classify(action: str) -> List[Tuple[str, str]]:
+    """``(key, pitfall)`` for every known pattern *action* asks to fix, else its own."""
+    found = [(key, text) for key, pattern, text in PATTERNS if pattern.search(action)]
+    if found:
+        return found
+    terms = sorted(set(_WORD.findall(action.lower())))[:12]
+    key = "other:" + hashlib.sha256(" ".join(terms).encode("utf-8")).hexdigest()[:12]
+    sentence = re.split(r"(?<=[.!?])\s", action, maxsplit=1)[0]
+    return [(key, sentence[:_OTHER_CHARS].rstrip())]
+
+
+def split_transcript(text: str) -> List[Tuple[str, str]]:
+    """``(agent, text)`` turns of a saved transcript, split on ``[Agent Name: X]`` tags."""
+    parts = _AGENT_TAG.split(text or "")
+    return [(parts[i], parts[i + 1]) for i in range(1, len(parts) - 1, 2)]
+
+
+def _reviews(turns: List[Tuple[str, str]]) -> List[str]:
+    # Workflow outputs can repeat a turn (streamed fragments + final
+    # conversation), sometimes with whitespace lost: keep the best-spaced copy
+    reviews: Dict[str, str] = {}
+    for name, text in turns:
+        tag = _AGENT_TAG.match((text or "").lstrip())
+        if (name or (tag.group(1) if tag else "")) == "Reviewer":
+            key = re.sub(r"^\[AgentName:\w+\]", "", re.sub(r"\s+", "", text))
+            if len(text.split()) > len(reviews.get(key, "").split()):
+                reviews[key] = text
+    return list(reviews.values())
+
+
+# ============================================================================
+# Store
+# ============================================================================
+
+class PitfallMemory:
+    """SQLite-backed, decaying counts of REVISE patterns per brand."""
+
+    def __init__(self, path: Optional[str] = None, half_life_days: Optional[float] = None,
+                 refresh_seconds: Optional[float] = None):
+        env = os.getenv
+        self.path = path or env("PITFALL_MEMORY_PATH", DEFAULT_MEMORY_PATH)
+        self.half_life = 86400 * (half_life_days if half_life_days is not None
+                                  else float(env("PITFALL_HALF_LIFE_DAYS", "30")))
+        self.refresh_seconds = (refresh_seconds if refresh_seconds is not None
+                                else float(env("PITFALL_REFRESH_SECONDS", "300")))
+        self.max_items = int(env("PITFALL_MAX_ITEMS", "5"))
+        self.max_chars = int(env("PITFALL_MAX_CHARS", "700"))
+        self.min_count = float(env("PITFALL_MIN_COUNT", "2"))
+        self.max_patterns = max(1, int(env("PITFALL_MAX_PATTERNS", "200")))
+        self._sections: Dict[str, Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.create_function("decayed", 3, self._decayed, deterministic=True)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pitfalls ("
+            " brand TEXT, key TEXT, text TEXT, count INTEGER, weight REAL, last_seen REAL,"
+            " PRIMARY KEY (brand, key))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS mined ("
+            " transcript_key TEXT PRIMARY KEY, brand TEXT, revisions INTEGER, mined_at REAL)"
+        )
+        self._conn.commit()
+
+    def _decayed(self, weight: float, last_seen: float, now: float) -> float:
+        return weight * 0.5 ** (max(0.0, now - last_seen) / self.half_life)
+
+    def mine(self, turns: Iterable[Tuple[str, str]], brand: str = "") -> int:
+        """Record the REVISE patterns in one transcript; returns how many were new."""
+        turns = list(turns)
+        reviews = _reviews(turns)
+        key = hashlib.sha256("\n\x00".join(re.sub(r"\s+", "", text or "") for _, text in turns)
+                             .encode("utf-8")).hexdigest()
+        found: Dict[str, str] = {}
+        revisions = 0
+        for review in reviews:
+            actions = revise_actions(review)
+            revisions += bool(actions)
+            for action in actions:
+                found.update(classify(action))
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute("SELECT 1 FROM mined WHERE transcript_key=?", (key,))
+            if not reviews or cur.fetchone():
+                return 0
+            for pitfall, text in found.items():
+                row = self._conn.execute(
+                    "SELECT weight, last_seen FROM pitfalls WHERE brand=? AND key=?", (brand, pitfall),
+                ).fetchone()
+                weight = (self._decayed(row[0], row[1], now) if row else 0.0) + 1
+                self._conn.execute(
+                    "INSERT INTO pitfalls (brand, key, text, count, weight, last_seen) VALUES (?, ?, ?, 1, ?, ?)"
+                    " ON CONFLICT (brand, key) DO UPDATE SET count = count + 1, weight = excluded.weight,"
+                    " last_seen = excluded.last_seen",
+                    (brand, pitfall, text, weight, now),
+                )
+            self._prune(brand, now)
+            self._conn.execute(
+                "INSERT INTO mined (transcript_key, brand, revisions, mined_at) VALUES (?, ?, ?, ?)",
+                (key, brand, revisions, now),
+            )
+            self._conn.commit()
+            self._sections.pop(brand, None)
+        return len(found)
+
+    def _prune(self, brand: str, now: float) -> None:
+        """Delete *brand*'s faded patterns and all but its ``max_patterns`` heaviest."""
+        self._conn.execute(
+            "DELETE FROM pitfalls WHERE brand=? AND (decayed(weight, last_seen, ?) < ? OR key NOT IN ("
+            " SELECT key FROM pitfalls WHERE brand=?"
+            " ORDER BY decayed(weight, last_seen, ?) DESC, count DESC, last_seen DESC LIMIT ?))",
+            (brand, now, PRUNE_WEIGHT, brand, now, self.max_patterns),
+        )
+
+    def top(self, brand: str = "", limit: Optional[int] = None) -> List[dict]:
+        """Pitfalls for *brand*, most frequent (decayed) first."""
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, text, count, decayed(weight, last_seen, ?) AS w FROM pitfalls WHERE brand=?"
+                " ORDER BY w DESC, count DESC, key LIMIT ?",
+                (now, brand, limit or -1),
+            ).fetchall()
+        return [{"key": k, "text": t, "count": c, "weight": round(w, 2)} for k, t, c, w in rows]
+
+    def stats(self, brand: str = "") -> dict:
+        with self._lock:
+            runs, revisions = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(revisions), 0) FROM mined WHERE brand=?", (brand,),
+            ).fetchone()
+            patterns, = self._conn.execute(
+                "SELECT COUNT(*) FROM pitfalls WHERE brand=?", (brand,),
+            ).fetchone()
+        return {"transcripts": runs, "revise_verdicts": revisions, "patterns": patterns}
+
+    def section(self, rules: Optional[BrandRules] = None) -> str:
+        """The bounded "Known Pitfalls" block for the Creator ("" if none qualify)."""
+        rules = rules or load_brand_rules()
+        brand = rules.brand_id
+        cached = self._sections.get(brand)
+        if cached and time.monotonic() - cached[0] < self.refresh_seconds:
+            return cached[1]
+
+        lines = []
+        header = ("\n\n## Known Pitfalls (from past Reviewer feedback)\n"
+                  "Earlier drafts were sent back for these. Avoid them in your first draft:")
+        size = len(header)
+        for p in self.top(brand, self.max_items):
+            if len(lines) >= self.max_items or p["weight"] < self.min_count:
+                break
+            text = p["text"] if p["key"].startswith("other:") else rules.render(p["text"])
+            line = f"\n- {text} (flagged {p['count']}×)"
+            if size + len(line) > self.max_chars:
+                break
+            lines.append(line)
+            size += len(line)
+        text = header + "".join(lines) if lines else ""
+        self._sections[brand] = (time.monotonic(), text)
+        return text
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+_memory: Optional[PitfallMemory] = None
+_memory_lock = threading.Lock()
+
+
+def get_pitfall_memory() -> PitfallMemory:
+    """The process-wide pitfall store."""
+    global _memory
+    with _memory_lock:
+        if _memory is None:
+            _memory = PitfallMemory()
+        return _memory
+
+
+def pitfall_section(rules: Optional[BrandRules] = None) -> str:
+    """Creator instructions suffix for *rules*' brand ("" when disabled or empty)."""
+    if not memory_enabled():
+        return ""
+    return get_pitfall_memory().section(rules)
+
+
+def record_transcript(turns: Iterable[Tuple[str, str]], rules: Optional[BrandRules] = None) -> int:
+    """Mine a finished run's ``(agent, text)`` turns (no-op when disabled)."""
+    if not memory_enabled():
+        return 0
+    return get_pitfall_memory().mine(turns, (rules or load_brand_rules()).brand_id)
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def _main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Mine / show Reviewer pitfalls for the Creator prompt")
+    sub = parser.add_subparsers(dest="command", required=True)
+    mine = sub.add_parser("mine", help="Mine saved transcripts (e.g. output/*.md)")
+    mine.add_argument("paths", nargs="+")
+    show = sub.add_parser("show", help="Print the pitfalls and the Creator section")
+    show.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    memory = get_pitfall_memory()
+    rules = load_brand_rules()
+    if args.command == "mine":
+        for path in args.paths:
+            with open(path, "r", encoding="utf-8") as f:
+                new = memory.mine(split_transcript(f.read()), rules.brand_id)
+            print(f"  🧠 {path}: {new} pattern(s)" if new else f"  ♻️  {path}: nothing new")
+        return
+
+    stats = memory.stats(rules.brand_id)
+    print(f"🧠 {rules.brand_id}: {stats['transcripts']} transcripts, "
+          f"{stats['revise_verdicts']} REVISE verdicts, {stats['patterns']} patterns\n")
+    for p in memory.top(rules.brand_id, args.limit):
+        print(f"  {p['weight']:>6.2f}  {p['count']:>4}×  {p['key']:<20} {p['text'][:90]}")
+    print(memory.section(rules) or "\n  (no pitfall qualifies for the Creator section yet)")
+
+
+if __name__ == "__main__":
+    _main()
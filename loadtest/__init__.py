@@ -0,0 +1,3 @@
+"""
+Load-testing package initialization
+"""
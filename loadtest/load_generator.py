@@ -0,0 +1,490 @@
+"""
+Load Generator — concurrent load on the content API with latency percentiles
+
+Replays a brief dataset (``eval_dataset.jsonl`` or one generated by
+``evaluation/brief_generator.py``) against ``api_server.py`` and measures
+what users would see under load:
+
+  - throughput (completed requests / s) and error rate, by status code
+  - latency p50 / p95 / p99 / max, and time to first event (TTFE — first
+    response byte for the sync endpoint, first SSE event when streaming)
+  - the saturation point as concurrency increases: the first stage where
+    throughput stops growing while latency or errors climb
+
+Load shapes:
+  closed loop   ``--concurrency 1,2,4,8`` — N workers back to back, one
+                stage per level, each ``--duration`` seconds
+  open loop     ``--rps 0.5,1,2`` — Poisson arrivals at each target rate
+                (capped at ``--max-in-flight``)
+
+Endpoints (``--endpoint``; ``auto`` uses every one the server exposes,
+read from ``/openapi.json``):
+  sync    POST /api/generate                   (response = whole result)
+  stream  POST /api/generate/stream            (Server-Sent Events)
+  job     POST /api/jobs + GET /api/jobs/{id}  (submit, then poll)
+
+Reports are written as JSON (diffable between releases — pass the old one
+with ``--compare``) and a self-contained HTML page.
+
+Usage:
+    ZAVA_LLM_MODE=fake uvicorn api_server:app --port 8000      # or against the mock upstream
+    python -m loadtest.load_generator --concurrency 1,2,4,8 --duration 30
+    python -m loadtest.load_generator --rps 0.5,1,2 --dataset briefs.jsonl --report loadtest/reports/rc2
+    python -m loadtest.load_generator --concurrency 4 --compare loadtest/reports/rc1.json
+"""
+
+import argparse
+import asyncio
+import html
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from evaluation.brief_generator import iter_briefs
+
+DEFAULT_DATASET = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "evaluation", "eval_dataset.jsonl"
+)
+
+ENDPOINTS = {
+    "sync": "/api/generate",
+    "stream": "/api/generate/stream",
+    "job": "/api/jobs",
+}
+
+_FIELDS = {
+    "brand": "brand_name",
+    "industry": "industry",
+    "target audience": "target_audience",
+    "key message": "key_message",
+    "destinations": "destinations",
+}
+
+
+# ============================================================================
+# Requests
+# ============================================================================
+
+def brief_payload(query: str) -> dict:
+    """``CampaignBriefRequest`` body from a dataset brief's ``Key: value`` lines."""
+    payload = {name: "" for name in _FIELDS.values()}
+    payload["platforms"] = ["LinkedIn", "Twitter", "Instagram"]
+    payload["content_type"] = "text"
+    for line in query.splitlines():
+        key, sep, value = line.partition(":")
+        key = key.strip().lower()
+        if not sep:
+            continue
+        if key in _FIELDS:
+            payload[_FIELDS[key]] = value.strip()
+        elif key == "platforms":
+            payload["platforms"] = [
+                "Twitter" if "twitter" in p.lower() else p.strip() for p in value.split(",") if p.strip()
+            ]
+    if not payload["brand_name"]:
+        payload["brand_name"] = "Zava Travel Inc."
+    return payload
+
+
+def cycle_payloads(dataset: str, limit: Optional[int]) -> Iterator[dict]:
+    """Payloads from the dataset, read lazily and repeated for as long as needed."""
+    while True:
+        empty = True
+        for brief in iter_briefs(dataset, limit):
+            empty = False
+            yield brief_payload(brief["query"])
+        if empty:
+            raise ValueError(f"No briefs in {dataset}")
+
+
+@dataclass
+class Sample:
+    """One request's outcome."""
+    started: float
+    latency: float
+    ttfe: Optional[float]
+    status: int
+    error: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300 and not self.error
+
+
+async def call_sync(client: httpx.AsyncClient, payload: dict) -> Sample:
+    start = time.perf_counter()
+    async with client.stream("POST", ENDPOINTS["sync"], json=payload) as response:
+        ttfe = None
+        async for _ in response.aiter_bytes():
+            if ttfe is None:
+                ttfe = time.perf_counter() - start
+        return Sample(start, time.perf_counter() - start, ttfe, response.status_code)
+
+
+async def call_stream(client: httpx.AsyncClient, payload: dict) -> Sample:
+    start = time.perf_counter()
+    ttfe, error = None, ""
+    async with client.stream("POST", ENDPOINTS["stream"], json=payload,
+                             headers={"Accept": "text/event-stream"}) as response:
+        async for line in response.aiter_lines():
+            if not line.strip():
+                continue
+            if ttfe is None and (line.startswith("data:") or line.startswith("event:")):
+                ttfe = time.perf_counter() - start
+            if line.startswith("event:") and "error" in line:
+                error = "stream error event"
+        return Sample(start, time.perf_counter() - start, ttfe, response.status_code, error)
+
+
+async def call_job(client: httpx.AsyncClient, payload: dict, poll_interval: float = 0.5) -> Sample:
+    start = time.perf_counter()
+    response = await client.post(ENDPOINTS["job"], json=payload)
+    ttfe = time.perf_counter() - start
+    if response.status_code >= 300:
+        return Sample(start, ttfe, ttfe, response.status_code)
+    job_id = response.json().get("job_id") or response.json().get("id")
+    while True:
+        await asyncio.sleep(poll_interval)
+        status = await client.get(f"{ENDPOINTS['job']}/{job_id}")
+        state = status.json().get("status", "") if status.status_code < 300 else "error"
+        if state not in ("queued", "pending", "running"):
+            error = "" if state in ("completed", "succeeded", "done") else f"job {state}"
+            return Sample(start, time.perf_counter() - start, ttfe, status.status_code, error)
+
+
+CALLS = {"sync": call_sync, "stream": call_stream, "job": call_job}
+
+
+async def timed_call(kind: str, client: httpx.AsyncClient, payload: dict) -> Sample:
+    start = time.perf_counter()
+    try:
+        return await CALLS[kind](client, payload)
+    except Exception as e:
+        return Sample(start, time.perf_counter() - start, None, 0, f"{type(e).__name__}: {e}"[:200])
+
+
+# ============================================================================
+# Load shapes
+# ============================================================================
+
+async def closed_loop(kind: str, client: httpx.AsyncClient, payloads: Iterator[dict],
+                      concurrency: int, duration: float) -> List[Sample]:
+    """``concurrency`` workers sending back to back until ``duration`` elapses."""
+    samples: List[Sample] = []
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            samples.append(await timed_call(kind, client, next(payloads)))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples
+
+
+async def open_loop(kind: str, client: httpx.AsyncClient, payloads: Iterator[dict],
+                    rps: float, duration: float, max_in_flight: int, rng: random.Random) -> List[Sample]:
+    """Poisson arrivals at ``rps``; arrivals over ``max_in_flight`` count as dropped."""
+    samples: List[Sample] = []
+    tasks = set()
+    in_flight = 0
+    start = time.perf_counter()
+
+    async def one(payload: dict):
+        nonlocal in_flight
+        in_flight += 1
+        try:
+            samples.append(await timed_call(kind, client, payload))
+        finally:
+            in_flight -= 1
+
+    while time.perf_counter() - start < duration:
+        if in_flight >= max_in_flight:
+            samples.append(Sample(time.perf_counter(), 0.0, None, 0, "dropped: max in-flight"))
+        else:
+            task = asyncio.create_task(one(next(payloads)))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.sleep(rng.expovariate(rps))
+    if tasks:
+        await asyncio.gather(*tasks)
+    return samples
+
+
+# ============================================================================
+# Statistics
+# ============================================================================
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile (``None`` for no values)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, min(len(ordered), int(round(p / 100 * len(ordered) + 0.5))))
+    return ordered[rank - 1]
+
+
+@dataclass
+class StageResult:
+    endpoint: str
+    load: str            # "c=4" or "rps=2"
+    level: float
+    duration: float
+    requests: int = 0
+    ok: int = 0
+    errors: int = 0
+    error_rate: float = 0.0
+    throughput: float = 0.0
+    latency: Dict[str, Optional[float]] = field(default_factory=dict)
+    ttfe: Dict[str, Optional[float]] = field(default_factory=dict)
+    status_codes: Dict[str, int] = field(default_factory=dict)
+    error_samples: List[str] = field(default_factory=list)
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 3)
+
+
+def summarise(endpoint: str, load: str, level: float, samples: List[Sample], wall: float) -> StageResult:
+    ok = [s for s in samples if s.ok]
+    latencies = [s.latency for s in ok]
+    ttfes = [s.ttfe for s in ok if s.ttfe is not None]
+    errors = [s for s in samples if not s.ok]
+    return StageResult(
+        endpoint=endpoint,
+        load=load,
+        level=level,
+        duration=round(wall, 2),
+        requests=len(samples),
+        ok=len(ok),
+        errors=len(errors),
+        error_rate=round(len(errors) / len(samples), 4) if samples else 0.0,
+        throughput=round(len(ok) / wall, 3) if wall else 0.0,
+        latency={f"p{p}": _round(percentile(latencies, p)) for p in (50, 95, 99)} | {
+            "max": _round(max(latencies)) if latencies else None},
+        ttfe={f"p{p}": _round(percentile(ttfes, p)) for p in (50, 95, 99)},
+        status_codes=dict(Counter(str(s.status) for s in samples)),
+        error_samples=list(dict.fromkeys(s.error or f"HTTP {s.status}" for s in errors))[:5],
+    )
+
+
+def find_saturation(stages: List[StageResult], gain: float = 0.10, error_limit: float = 0.05) -> Optional[dict]:
+    """First level where throughput grows < ``gain`` while p95 or errors climb."""
+    for prev, cur in zip(stages, stages[1:]):
+        grew = cur.throughput > prev.throughput * (1 + gain)
+        p95_prev, p95_cur = prev.latency.get("p95"), cur.latency.get("p95")
+        slower = p95_prev and p95_cur and p95_cur > p95_prev * 1.5
+        failing = cur.error_rate > max(error_limit, prev.error_rate)
+        if not grew and (slower or failing):
+            return {
+                "level": cur.level,
+                "load": cur.load,
+                "best_throughput": max(s.throughput for s in stages),
+                "reason": "errors" if failing else "latency",
+            }
+    return None
+
+
+# ============================================================================
+# Reports
+# ============================================================================
+
+def compare_reports(current: dict, previous: dict) -> List[dict]:
+    """Per (endpoint, load) deltas of throughput, p95 latency and error rate."""
+    before = {(s["endpoint"], s["load"]): s for s in previous.get("stages", [])}
+    rows = []
+    for stage in current["stages"]:
+        old = before.get((stage["endpoint"], stage["load"]))
+        if not old:
+            continue
+        rows.append({
+            "endpoint": stage["endpoint"],
+            "load": stage["load"],
+            "throughput": (old["throughput"], stage["throughput"]),
+            "p95": (old["latency"].get("p95"), stage["latency"].get("p95")),
+            "error_rate": (old["error_rate"], stage["error_rate"]),
+        })
+    return rows
+
+
+def _bars(stages: List[dict], key: str, label: str) -> str:
+    values = [(s["load"], s["latency"].get(key) or 0.0) for s in stages]
+    top = max((v for _, v in values), default=0.0) or 1.0
+    rows = "".join(
+        f'<rect x="80" y="{i * 22}" width="{v / top * 400:.1f}" height="16" fill="#0f766e"/>'
+        f'<text x="0" y="{i * 22 + 12}">{html.escape(name)}</text>'
+        f'<text x="{86 + v / top * 400:.1f}" y="{i * 22 + 12}">{v:.2f}s</text>'
+        for i, (name, v) in enumerate(values)
+    )
+    return f'<h3>{label}</h3><svg width="560" height="{len(values) * 22}" font-size="12">{rows}</svg>'
+
+
+def render_html(report: dict) -> str:
+    stages = report["stages"]
+    head = "".join(f"<th>{h}</th>" for h in (
+        "endpoint", "load", "requests", "ok", "error rate", "throughput/s",
+        "p50", "p95", "p99", "max", "TTFE p50", "TTFE p95", "status codes"))
+
+    def fmt(v):
+        return "—" if v is None else f"{v:.3f}" if isinstance(v, float) else str(v)
+
+    body = "".join(
+        "<tr>" + "".join(f"<td>{html.escape(fmt(v))}</td>" for v in (
+            s["endpoint"], s["load"], s["requests"], s["ok"], f"{s['error_rate']:.1%}", s["throughput"],
+            s["latency"].get("p50"), s["latency"].get("p95"), s["latency"].get("p99"), s["latency"].get("max"),
+            s["ttfe"].get("p50"), s["ttfe"].get("p95"),
+            ", ".join(f"{k}×{n}" for k, n in s["status_codes"].items()),
+        )) + "</tr>"
+        for s in stages
+    )
+    charts = "".join(
+        _bars([s for s in stages if s["endpoint"] == ep], "p95", f"{ep} — p95 latency")
+        for ep in dict.fromkeys(s["endpoint"] for s in stages)
+    )
+    saturation = "".join(
+        f"<li><b>{html.escape(ep)}</b>: "
+        + (f"saturates at {html.escape(sat['load'])} ({sat['reason']}), best {sat['best_throughput']} req/s"
+           if sat else "no saturation within the tested range")
+        + "</li>"
+        for ep, sat in report["saturation"].items()
+    )
+    return f"""<!doctype html>
+<html><head><meta charset="utf-8"><title>Load test — {html.escape(report['created'])}</title>
+<style>body{{font-family:system-ui,sans-serif;margin:2rem;color:#1f2937}}table{{border-collapse:collapse}}
+td,th{{border:1px solid #d1d5db;padding:4px 8px;text-align:right}}th{{background:#f3f4f6}}</style></head>
+<body><h1>Zava Travel API — load test</h1>
+<p>{html.escape(report['target'])} · dataset {html.escape(report['dataset'])} · {html.escape(report['created'])}</p>
+<h2>Saturation</h2><ul>{saturation}</ul>
+<h2>Stages</h2><table><tr>{head}</tr>{body}</table>
+<h2>Latency</h2>{charts}
+</body></html>
+"""
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def _levels(text: Optional[str]) -> List[float]:
+    return [float(v) for v in text.split(",") if v.strip()] if text else []
+
+
+async def detect_endpoints(client: httpx.AsyncClient) -> List[str]:
+    """Endpoints the server exposes, from its OpenAPI schema."""
+    try:
+        paths = (await client.get("/openapi.json")).json().get("paths", {})
+    except Exception:
+        return ["sync"]
+    found = [kind for kind, path in ENDPOINTS.items() if path in paths]
+    return found or ["sync"]
+
+
+async def run(args) -> dict:
+    concurrency, rates = _levels(args.concurrency), _levels(args.rps)
+    if not concurrency and not rates:
+        concurrency = [1, 2, 4, 8]
+    rng = random.Random(args.seed)
+    payloads = cycle_payloads(args.dataset, args.limit)
+    limits = httpx.Limits(max_connections=max([*concurrency, args.max_in_flight, 1]) * 2)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        endpoints = await detect_endpoints(client) if args.endpoint == "auto" else [args.endpoint]
+        print(f"  Endpoints: {', '.join(endpoints)}\n")
+        stages: List[StageResult] = []
+        for endpoint in endpoints:
+            shapes = [("c", c) for c in concurrency] + [("rps", r) for r in rates]
+            for shape, level in shapes:
+                load = f"c={int(level)}" if shape == "c" else f"rps={level:g}"
+                started = time.perf_counter()
+                if shape == "c":
+                    samples = await closed_loop(endpoint, client, payloads, int(level), args.duration)
+                else:
+                    samples = await open_loop(endpoint, client, payloads, level, args.duration,
+                                              args.max_in_flight, rng)
+                stage = summarise(endpoint, load, level, samples, time.perf_counter() - started)
+                stages.append(stage)
+                p = stage.latency
+                print(f"  {'✅' if not stage.errors else '⚠️ '} {endpoint:<6} {load:<9} "
+                      f"{stage.requests:>5} req · {stage.throughput:>7.2f}/s · "
+                      f"err {stage.error_rate:>5.1%} · p50 {p.get('p50') or 0:.2f}s "
+                      f"p95 {p.get('p95') or 0:.2f}s p99 {p.get('p99') or 0:.2f}s · "
+                      f"TTFE p50 {stage.ttfe.get('p50') or 0:.2f}s")
+
+    by_endpoint = {}
+    for endpoint in dict.fromkeys(s.endpoint for s in stages):
+        closed = [s for s in stages if s.endpoint == endpoint and s.load.startswith("c=")]
+        opened = [s for s in stages if s.endpoint == endpoint and s.load.startswith("rps=")]
+        by_endpoint[endpoint] = find_saturation(closed) or find_saturation(opened)
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "target": args.url,
+        "dataset": os.path.relpath(args.dataset),
+        "duration_per_stage": args.duration,
+        "stages": [asdict(s) for s in stages],
+        "saturation": by_endpoint,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the content API")
+    parser.add_argument("--url", default=os.getenv("LOADTEST_URL", "http://localhost:8000"))
+    parser.add_argument("--dataset", default=DEFAULT_DATASET)
+    parser.add_argument("--limit", type=int, default=None, help="Use only the first N briefs")
+    parser.add_argument("--endpoint", choices=("auto", *ENDPOINTS), default="auto")
+    parser.add_argument("--concurrency", help="Closed-loop levels, e.g. 1,2,4,8")
+    parser.add_argument("--rps", help="Open-loop arrival rates, e.g. 0.5,1,2")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds per stage")
+    parser.add_argument("--max-in-flight", type=int, default=64, help="Open-loop in-flight cap")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Per-request timeout (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report", default=os.path.join("loadtest", "reports", "loadtest"),
+                        help="Report path prefix (.json and .html are added)")
+    parser.add_argument("--compare", help="Previous JSON report to diff against")
+    args = parser.parse_args(argv)
+
+    print(f"\n{'='*60}")
+    print("📈 Zava Travel — API Load Test")
+    print(f"{'='*60}")
+    print(f"  Target:  {args.url}")
+    print(f"  Dataset: {args.dataset}")
+    print(f"  Stages:  {args.duration:g}s each")
+
+    report = asyncio.run(run(args))
+
+    print("\n  Saturation:")
+    for endpoint, sat in report["saturation"].items():
+        if sat:
+            print(f"    🔴 {endpoint}: saturates at {sat['load']} ({sat['reason']}) — "
+                  f"best {sat['best_throughput']} req/s")
+        else:
+            print(f"    🟢 {endpoint}: no saturation within the tested range")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        report["compared_with"] = args.compare
+        print(f"\n  Compared with {args.compare}:")
+        for row in compare_reports(report, previous):
+            (t0, t1), (p0, p1), (e0, e1) = row["throughput"], row["p95"], row["error_rate"]
+            print(f"    {row['endpoint']:<6} {row['load']:<9} throughput {t0:.2f} → {t1:.2f}/s · "
+                  f"p95 {p0 or 0:.2f} → {p1 or 0:.2f}s · errors {e0:.1%} → {e1:.1%}")
+
+    os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+    with open(f"{args.report}.json", "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    with open(f"{args.report}.html", "w", encoding="utf-8") as f:
+        f.write(render_html(report))
+    print(f"\n  📄 Report: {args.report}.json · {args.report}.html\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,417 @@
+"""
+Mock Azure OpenAI — local upstream that behaves like the service under pressure
+
+A standalone OpenAI / Azure OpenAI compatible server for load-testing
+``api_server.py`` without touching production quota:
+
+  - streaming chat completions at a configurable token rate, with a
+    log-normal time-to-first-token distribution
+  - TPM / RPM quotas over a sliding 60 s window — over-quota requests get
+    ``429`` with ``Retry-After`` (seconds until enough quota frees up),
+    like Azure OpenAI
+  - a concurrency cap (``429`` when exceeded) and a random share of
+    ``500`` / ``503`` responses
+  - per-deployment overrides, so a pool of deployments can differ
+
+Responses are the same format-correct Creator / Reviewer / Publisher
+outputs as ``orchestration/fake_chat_client.py`` (the agent is recognised
+from the system prompt).  ``gpt-image`` generations and Content Safety
+``text:analyze`` are mocked too.
+
+The knobs live in a JSON profile (``loadtest/profiles/*.json``); every
+key is optional:
+
+    {
+      "ttft_ms":          {"median": 450, "p95": 1400},
+      "tokens_per_second": 80,
+      "tpm_limit":        30000,    # 0 = unlimited
+      "rpm_limit":        180,      # 0 = unlimited
+      "max_concurrency":  0,        # 0 = unlimited
+      "error_rate":       0.01,     # share of 5xx responses
+      "error_codes":      [500, 503],
+      "image_latency_ms": 2500,
+      "seed":             7,
+      "deployments":      {"gpt-4o-mini": {"tpm_limit": 60000}}
+    }
+
+Point the existing clients at it:
+
+    python -m loadtest.mock_openai --profile loadtest/profiles/s0-quota.json --port 8900
+    AZURE_OPENAI_ENDPOINT=http://127.0.0.1:8900 AZURE_OPENAI_API_KEY=mock python api_server.py
+
+``GET /mock/stats`` returns request / 429 / 5xx / token counters and
+``POST /mock/reset`` clears them (and the quota windows).
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import math
+import os
+import random
+import sys
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field, fields, replace
+from typing import Deque, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from orchestration.fake_chat_client import synthesize
+
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles")
+
+# 1x1 PNG — the image endpoint only has to be shaped right
+_PIXEL_PNG = base64.b64encode(bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360f8cff00f0005000201a5f1d2f80000000049454e44ae426082"
+)).decode()
+
+
+# ============================================================================
+# Profile
+# ============================================================================
+
+@dataclass(frozen=True)
+class MockProfile:
+    """Upstream behaviour knobs for one deployment."""
+    ttft_median_ms: float = 450.0
+    ttft_p95_ms: float = 1400.0
+    tokens_per_second: float = 80.0
+    tpm_limit: int = 0
+    rpm_limit: int = 0
+    max_concurrency: int = 0
+    error_rate: float = 0.0
+    error_codes: Tuple[int, ...] = (500, 503)
+    image_latency_ms: float = 2500.0
+    seed: Optional[int] = None
+    deployments: Dict[str, "MockProfile"] = field(default_factory=dict)
+
+    def for_deployment(self, name: str) -> "MockProfile":
+        return self.deployments.get(name, self)
+
+    def sample_ttft(self, rng: random.Random) -> float:
+        """Seconds to first token — log-normal through the median and p95."""
+        median = max(1.0, self.ttft_median_ms)
+        sigma = math.log(max(self.ttft_p95_ms, median) / median) / 1.645
+        return rng.lognormvariate(math.log(median), sigma) / 1000
+
+
+def _profile_fields(data: dict) -> dict:
+    values = {}
+    ttft = data.get("ttft_ms")
+    if isinstance(ttft, dict):
+        values["ttft_median_ms"] = float(ttft.get("median", MockProfile.ttft_median_ms))
+        values["ttft_p95_ms"] = float(ttft.get("p95", ttft.get("median", MockProfile.ttft_p95_ms)))
+    elif ttft is not None:
+        values["ttft_median_ms"] = values["ttft_p95_ms"] = float(ttft)
+    known = {f.name for f in fields(MockProfile)} - {"deployments"}
+    for key, value in data.items():
+        if key in known:
+            values[key] = tuple(value) if key == "error_codes" else value
+    return values
+
+
+def load_profile(path: Optional[str] = None) -> MockProfile:
+    """Profile from a JSON file (``None`` → built-in defaults)."""
+    data = {}
+    if path:
+        if not os.path.exists(path):
+            for candidate in (os.path.join(PROFILE_DIR, path), os.path.join(PROFILE_DIR, path + ".json")):
+                if os.path.exists(candidate):
+                    path = candidate
+                    break
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    base = MockProfile(**_profile_fields(data))
+    deployments = {
+        name: replace(base, **_profile_fields(overrides))
+        for name, overrides in data.get("deployments", {}).items()
+    }
+    return replace(base, deployments=deployments)
+
+
+# ============================================================================
+# Quota + stats
+# ============================================================================
+
+class SlidingQuota:
+    """Tokens and requests admitted in the last 60 s, Azure-style."""
+
+    WINDOW = 60.0
+
+    def __init__(self):
+        self.events: Deque[Tuple[float, int]] = deque()
+        self.tokens = 0
+
+    def _expire(self, now: float) -> None:
+        while self.events and now - self.events[0][0] >= self.WINDOW:
+            _, tokens = self.events.popleft()
+            self.tokens -= tokens
+
+    def admit(self, profile: MockProfile, tokens: int, now: float) -> Optional[Tuple[float, str]]:
+        """Record the request, or return (seconds to wait, exceeded limit)."""
+        self._expire(now)
+        over_tpm = profile.tpm_limit and self.tokens + tokens > profile.tpm_limit
+        over_rpm = profile.rpm_limit and len(self.events) + 1 > profile.rpm_limit
+        if not (over_tpm or over_rpm):
+            self.events.append((now, tokens))
+            self.tokens += tokens
+            return None
+        # Earliest moment enough of the window has expired
+        freed, wait = self.tokens, self.WINDOW
+        for count, (stamp, used) in enumerate(self.events, start=1):
+            freed -= used
+            tpm_ok = not profile.tpm_limit or freed + tokens <= profile.tpm_limit
+            rpm_ok = not profile.rpm_limit or len(self.events) - count + 1 <= profile.rpm_limit
+            if tpm_ok and rpm_ok:
+                wait = stamp + self.WINDOW - now
+                break
+        return max(1.0, math.ceil(wait)), "token rate limit" if over_tpm else "call rate limit"
+
+
+@dataclass
+class MockStats:
+    requests: int = 0
+    completed: int = 0
+    streamed: int = 0
+    throttled: int = 0
+    server_errors: int = 0
+    concurrency_rejections: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    images: int = 0
+    safety_checks: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    started: float = field(default_factory=time.time)
+
+    def as_dict(self) -> dict:
+        data = {f.name: getattr(self, f.name) for f in fields(self)}
+        data["uptime_seconds"] = round(time.time() - data.pop("started"), 1)
+        return data
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text or "") // 4)
+
+
+def _message_text(message: dict) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):  # content parts
+        return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return str(content)
+
+
+def _error(status: int, code: str, message: str, retry_after: Optional[float] = None) -> JSONResponse:
+    headers = {}
+    if retry_after is not None:
+        headers["Retry-After"] = str(int(retry_after))
+        headers["retry-after-ms"] = str(int(retry_after * 1000))
+    return JSONResponse({"error": {"code": code, "message": message}}, status_code=status, headers=headers)
+
+
+# ============================================================================
+# App
+# ============================================================================
+
+def create_app(profile: MockProfile) -> FastAPI:
+    """The mock server for *profile*."""
+    app = FastAPI(title="Mock Azure OpenAI")
+    rng = random.Random(profile.seed)
+    quotas: Dict[str, SlidingQuota] = {}
+    stats = MockStats()
+
+    def gate(deployment: str, cost: int) -> Optional[JSONResponse]:
+        """Quota, concurrency and injected-error checks (``None`` = admitted)."""
+        p = profile.for_deployment(deployment)
+        stats.requests += 1
+        if p.max_concurrency and stats.in_flight >= p.max_concurrency:
+            stats.concurrency_rejections += 1
+            stats.throttled += 1
+            return _error(429, "TooManyRequests", "Too many concurrent requests for this deployment.", 1)
+        throttle = quotas.setdefault(deployment, SlidingQuota()).admit(p, cost, time.monotonic())
+        if throttle is not None:
+            wait, limit = throttle
+            stats.throttled += 1
+            return _error(
+                429, "429",
+                f"Requests to the ChatCompletions_Create Operation under Azure OpenAI API have exceeded "
+                f"{limit} of your current pricing tier. Please retry after {int(wait)} seconds.",
+                wait,
+            )
+        if p.error_rate and rng.random() < p.error_rate:
+            stats.server_errors += 1
+            status = rng.choice(p.error_codes)
+            return _error(status, "InternalServerError" if status == 500 else "ServiceUnavailable",
+                          "The server had an error while processing your request.")
+        return None
+
+    async def chat_completions(deployment: str, body: dict):
+        messages = body.get("messages") or []
+        system = next((_message_text(m) for m in messages if m.get("role") in ("system", "developer")), "")
+        user = "\n".join(_message_text(m) for m in messages if m.get("role") == "user")
+        rest = "\n".join(_message_text(m) for m in messages if m.get("role") not in ("system", "developer", "user"))
+        prompt_tokens = sum(_estimate_tokens(_message_text(m)) for m in messages)
+        text = synthesize(system, f"{user}\n{rest}")
+        completion_tokens = _estimate_tokens(text)
+        max_tokens = body.get("max_completion_tokens") or body.get("max_tokens")
+
+        rejected = gate(deployment, prompt_tokens + (max_tokens or completion_tokens))
+        if rejected is not None:
+            return rejected
+
+        p = profile.for_deployment(deployment)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        model = body.get("model") or deployment
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        ttft = p.sample_ttft(rng)
+        per_token = 1.0 / p.tokens_per_second if p.tokens_per_second > 0 else 0.0
+
+        def chunk(delta: dict, finish_reason=None, with_usage=False) -> str:
+            payload = {
+                "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [] if with_usage else [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            if with_usage:
+                payload["usage"] = usage
+            return f"data: {json.dumps(payload)}\n\n"
+
+        if body.get("stream"):
+            include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+
+            async def events():
+                stats.in_flight += 1
+                stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+                try:
+                    await asyncio.sleep(ttft)
+                    yield chunk({"role": "assistant", "content": ""})
+                    pieces = [text[i:i + 16] for i in range(0, len(text), 16)]  # ~4 tokens each
+                    for piece in pieces:
+                        yield chunk({"content": piece})
+                        await asyncio.sleep(per_token * 4)
+                    yield chunk({}, finish_reason="stop")
+                    if include_usage:
+                        yield chunk({}, with_usage=True)
+                    yield "data: [DONE]\n\n"
+                    stats.completed += 1
+                    stats.streamed += 1
+                    stats.prompt_tokens += prompt_tokens
+                    stats.completion_tokens += completion_tokens
+                finally:
+                    stats.in_flight -= 1
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        try:
+            await asyncio.sleep(ttft + per_token * completion_tokens)
+        finally:
+            stats.in_flight -= 1
+        stats.completed += 1
+        stats.prompt_tokens += prompt_tokens
+        stats.completion_tokens += completion_tokens
+        return {
+            "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": usage,
+        }
+
+    async def image_generations(deployment: str, body: dict):
+        rejected = gate(deployment, 0)
+        if rejected is not None:
+            return rejected
+        p = profile.for_deployment(deployment)
+        await asyncio.sleep(p.image_latency_ms / 1000 * rng.uniform(0.8, 1.2))
+        stats.images += 1
+        return {"created": int(time.time()), "data": [{"b64_json": _PIXEL_PNG} for _ in range(body.get("n", 1))]}
+
+    @app.post("/openai/deployments/{deployment}/chat/completions")
+    async def azure_chat(deployment: str, request: Request):
+        return await chat_completions(deployment, await request.json())
+
+    @app.post("/openai/v1/chat/completions")
+    @app.post("/v1/chat/completions")
+    async def openai_chat(request: Request):
+        body = await request.json()
+        return await chat_completions(body.get("model", "default"), body)
+
+    @app.post("/openai/deployments/{deployment}/images/generations")
+    async def azure_images(deployment: str, request: Request):
+        return await image_generations(deployment, await request.json())
+
+    @app.post("/openai/v1/images/generations")
+    @app.post("/v1/images/generations")
+    async def openai_images(request: Request):
+        body = await request.json()
+        return await image_generations(body.get("model", "default"), body)
+
+    @app.post("/contentsafety/text:analyze")
+    async def content_safety(request: Request):
+        body = await request.json()
+        stats.safety_checks += 1
+        await asyncio.sleep(rng.uniform(0.02, 0.08))
+        categories = body.get("categories") or ["Hate", "SelfHarm", "Sexual", "Violence"]
+        return {"blocklistsMatch": [], "categoriesAnalysis": [{"category": c, "severity": 0} for c in categories]}
+
+    @app.get("/mock/stats")
+    async def get_stats():
+        return stats.as_dict()
+
+    @app.get("/mock/profile")
+    async def get_profile():
+        return {f.name: getattr(profile, f.name) for f in fields(profile) if f.name != "deployments"} | {
+            "deployments": sorted(profile.deployments),
+        }
+
+    @app.post("/mock/reset")
+    async def reset():
+        nonlocal stats
+        quotas.clear()
+        stats = MockStats()
+        return {"reset": True}
+
+    return app
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Local mock Azure OpenAI server")
+    parser.add_argument("--profile", default=os.getenv("MOCK_OPENAI_PROFILE"),
+                        help="Profile JSON (path, or a name under loadtest/profiles/, .json optional)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv("MOCK_OPENAI_PORT", "8900")))
+    args = parser.parse_args(argv)
+
+    profile = load_profile(args.profile)
+    print(f"\n{'='*60}")
+    print("🧪 Mock Azure OpenAI")
+    print(f"{'='*60}")
+    print(f"  Profile:  {args.profile or 'built-in defaults'}")
+    print(f"  TTFT:     median {profile.ttft_median_ms:.0f} ms · p95 {profile.ttft_p95_ms:.0f} ms")
+    print(f"  Rate:     {profile.tokens_per_second:g} tokens/s")
+    print(f"  Quota:    {profile.tpm_limit or '∞'} TPM · {profile.rpm_limit or '∞'} RPM")
+    print(f"  Errors:   {profile.error_rate:.1%} ({', '.join(map(str, profile.error_codes))})")
+    if profile.deployments:
+        print(f"  Overrides: {', '.join(sorted(profile.deployments))}")
+    print(f"\n  AZURE_OPENAI_ENDPOINT=http://{args.host}:{args.port}")
+    print("  AZURE_OPENAI_API_KEY=mock")
+    print(f"{'='*60}\n")
+
+    import uvicorn
+    uvicorn.run(create_app(profile), host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,6 +9,15 @@ the workflow root span, capturing:
   - Turn duration (start → finish)
   - Input/output character counts
   - Approximate token estimate  (chars / 4)
+  - Prompt tokens before / after context-policy pruning
+  - Prompt version / content hash (from the prompt registry)
+  - Provider-reported prompt tokens and cached-prompt-token ratio
+  - Model tier chosen by the model router, escalations and savings
+  - Parallel drafts ranked by draft sampling and the picked draft's score
+  - Reviewer verdicts served from the review cache (hits / misses)
+  - Streamed turns cut by the stream guard and the tokens that saved
+  - Time to first streamed chunk (also kept per agent in a process-wide
+    history that request hedging reads its trigger percentile from)
   - Turn index within the conversation
   - Success / error status
 
@@ -18,15 +27,22 @@ Usage:
     middleware.on_agent_start(agent_name)
     middleware.on_agent_text(text_delta)
     middleware.on_agent_end(agent_name)
+    # Capture model usage (attach to the agent's middleware list):
+    Agent(..., middleware=[middleware.usage_middleware("Creator")])
     # At workflow end:
     middleware.finalise(duration_seconds, total_rounds)
 """
 
 import time
 import logging
-from typing import Optional
+import threading
+from collections import deque
+from typing import Dict, Optional
 
+from agent_framework import ChatContext, ChatMiddleware
 from opentelemetry import trace
+
+from agents.prompt_registry import cached_prompt_ratio, get_prompt_registry
 from monitoring.tracing import get_tracer
 
 logger = logging.getLogger(__name__)
@@ -40,6 +56,36 @@ _REASONING_PATTERNS = {
 }
 
 
+class TtftHistory:
+    """Recent time-to-first-token samples per agent, shared by the process."""
+
+    def __init__(self, size: int = 500):
+        self.size = size
+        self._samples: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, agent_name: str, ttft_ms: float) -> None:
+        with self._lock:
+            self._samples.setdefault(agent_name, deque(maxlen=self.size)).append(ttft_ms)
+
+    def percentile(self, agent_name: str, pct: float, min_samples: int = 1) -> Optional[float]:
+        """The *pct* percentile (nearest rank) of *agent_name*'s TTFT, in ms."""
+        with self._lock:
+            samples = sorted(self._samples.get(agent_name, ()))
+        if len(samples) < max(1, min_samples):
+            return None
+        rank = max(0, min(len(samples) - 1, int(round(pct / 100 * len(samples))) - 1))
+        return samples[rank]
+
+
+_ttft_history = TtftHistory()
+
+
+def get_ttft_history() -> TtftHistory:
+    """Return the process-wide TTFT history."""
+    return _ttft_history
+
+
 class AgentTelemetryMiddleware:
     """
     Lightweight middleware that creates OpenTelemetry child spans for each
@@ -61,6 +107,12 @@ class AgentTelemetryMiddleware:
         self._total_input_chars: int = 0
         self._total_output_chars: int = 0
         self._agent_turn_counts: dict = {}
+        self._prompt_measurements: list = []
+        self._usage_by_agent: dict = {}
+        self._routing_by_agent: dict = {}
+        self._drafts_by_agent: dict = {}
+        self._review_cache: dict = {}
+        self._stream_guard: dict = {}
 
     # ------------------------------------------------------------------
     # Event hooks
@@ -102,6 +154,12 @@ class AgentTelemetryMiddleware:
                 "agent.turn_number_for_agent": self._agent_turn_counts[agent_name],
             },
         )
+        prompt = get_prompt_registry().get(agent_name)
+        if prompt is not None:
+            self._current_span.set_attributes({
+                "agent.prompt_version": prompt.version,
+                "agent.prompt_sha256": prompt.sha256,
+            })
 
         logger.debug(
             "📊 Telemetry: agent turn started — %s (turn %d)",
@@ -114,6 +172,115 @@ class AgentTelemetryMiddleware:
         if text_delta:
             self._turn_chars += len(text_delta)
 
+    def on_prompt_measured(
+        self, agent_name: str, tokens_before: int, tokens_after: int,
+    ) -> None:
+        """Record estimated prompt tokens before / after context pruning."""
+        self._prompt_measurements.append({
+            "agent": agent_name,
+            "prompt_tokens_before": tokens_before,
+            "prompt_tokens_after": tokens_after,
+        })
+        self._total_input_chars += tokens_after * 4
+
+    def on_agent_usage(self, agent_name: str, usage) -> None:
+        """Record provider-reported token usage for one model call."""
+        if not usage:
+            return
+        get = usage.get if hasattr(usage, "get") else lambda k, d=None: getattr(usage, k, d)
+        totals = self._usage_by_agent.setdefault(
+            agent_name,
+            {"prompt_tokens": 0, "completion_tokens": 0, "cached_prompt_tokens": 0, "calls": 0},
+        )
+        prompt_tokens = get("input_token_count") or 0
+        ratio = cached_prompt_ratio(usage) or 0.0
+        totals["prompt_tokens"] += prompt_tokens
+        totals["completion_tokens"] += get("output_token_count") or 0
+        totals["cached_prompt_tokens"] += int(round(prompt_tokens * ratio))
+        totals["calls"] += 1
+
+        if self._current_span is not None and self._current_agent == agent_name:
+            self._current_span.set_attributes({
+                "gen_ai.usage.input_tokens": prompt_tokens,
+                "gen_ai.usage.output_tokens": get("output_token_count") or 0,
+                "agent.cached_prompt_ratio": round(ratio, 3),
+            })
+
+    def on_agent_ttft(self, agent_name: str, ttft_ms: float) -> None:
+        """Record the time to the first streamed chunk of one model call."""
+        get_ttft_history().observe(agent_name, ttft_ms)
+        if self._current_span is not None and self._current_agent == agent_name:
+            self._current_span.set_attribute("agent.ttft_ms", int(ttft_ms))
+
+    def on_model_routed(self, agent_name: str, record: dict) -> None:
+        """Record one model-router decision (see orchestration/model_router.py)."""
+        totals = self._routing_by_agent.setdefault(
+            agent_name,
+            {"calls": 0, "by_model": {}, "downshifted": 0, "escalations": 0,
+             "tokens_on_cheaper_tiers": 0, "cost_units_saved": 0.0, "latency_saved_ms": 0.0},
+        )
+        totals["calls"] += 1
+        totals["by_model"][record["model"]] = totals["by_model"].get(record["model"], 0) + 1
+        totals["downshifted"] += int(record["downshifted"])
+        totals["escalations"] += int(record["escalated"])
+        if record["cost_units_saved"] > 0 and not record["rejected"]:
+            totals["tokens_on_cheaper_tiers"] += record["tokens"]
+        totals["cost_units_saved"] = round(totals["cost_units_saved"] + record["cost_units_saved"], 1)
+        totals["latency_saved_ms"] = round(totals["latency_saved_ms"] + record["latency_saved_ms"], 1)
+
+        if self._current_span is not None and self._current_agent == agent_name:
+            self._current_span.set_attributes({
+                "gen_ai.request.model": record["model"],
+                "agent.model_tier": record["tier"],
+                "agent.model_escalated": record["escalated"],
+                "agent.model_cost_units_saved": record["cost_units_saved"],
+                "agent.model_latency_saved_ms": record["latency_saved_ms"],
+            })
+
+    def on_drafts_ranked(self, agent_name: str, record: dict) -> None:
+        """Record one draft-sampling turn (see orchestration/draft_sampling.py)."""
+        totals = self._drafts_by_agent.setdefault(
+            agent_name, {"turns": 0, "candidates": 0, "picked_alternative": 0, "score_gain": 0.0},
+        )
+        totals["turns"] += 1
+        totals["candidates"] += record["candidates"]
+        totals["picked_alternative"] += int(record["picked"] != 0)
+        totals["score_gain"] = round(totals["score_gain"] + record["score_gain"], 4)
+
+        if self._current_span is not None and self._current_agent == agent_name:
+            self._current_span.set_attributes({
+                "agent.drafts": record["candidates"],
+                "agent.draft_picked": record["picked"],
+                "agent.draft_score": record["score"],
+            })
+
+    def on_review_cache(self, agent_name: str, hit: bool) -> None:
+        """Record one review-cache lookup (see orchestration/review_cache.py)."""
+        totals = self._review_cache.setdefault(agent_name, {"hits": 0, "misses": 0})
+        totals["hits" if hit else "misses"] += 1
+        if self._current_span is not None and self._current_agent == agent_name:
+            self._current_span.set_attribute("agent.review_cache_hit", hit)
+
+    def on_stream_guard(self, agent_name: str, record: dict) -> None:
+        """Record one guarded streamed turn (see safety/stream_guard.py)."""
+        totals = self._stream_guard.setdefault(
+            agent_name, {"turns": 0, "cuts": 0, "tokens_before_cut": 0, "tokens_saved": 0, "blocked": 0},
+        )
+        totals["turns"] += 1
+        totals["cuts"] += record["cuts"]
+        totals["tokens_before_cut"] += record["tokens_before_cut"]
+        totals["tokens_saved"] += record["tokens_saved"]
+        totals["blocked"] += int(record["blocked"])
+        if self._current_span is not None and self._current_agent == agent_name:
+            self._current_span.set_attributes({
+                "agent.stream_guard_cuts": record["cuts"],
+                "agent.stream_guard_tokens_saved": record["tokens_saved"],
+            })
+
+    def usage_middleware(self, agent_name: str) -> "UsageCaptureMiddleware":
+        """Chat middleware that feeds model usage for *agent_name* back here."""
+        return UsageCaptureMiddleware(agent_name, self)
+
     def on_agent_end(self, agent_name: str) -> None:
         """Call when an agent turn finishes."""
         if self._current_agent and self._current_agent == agent_name:
@@ -151,6 +318,35 @@ class AgentTelemetryMiddleware:
             "agent_turn_counts": dict(self._agent_turn_counts),
             "success": success,
         }
+        if self._prompt_measurements:
+            summary["prompt_tokens_before"] = sum(
+                m["prompt_tokens_before"] for m in self._prompt_measurements
+            )
+            summary["prompt_tokens_after"] = sum(
+                m["prompt_tokens_after"] for m in self._prompt_measurements
+            )
+            summary["prompt_tokens_per_turn"] = list(self._prompt_measurements)
+        if self._usage_by_agent:
+            prompt_total = sum(u["prompt_tokens"] for u in self._usage_by_agent.values())
+            cached_total = sum(u["cached_prompt_tokens"] for u in self._usage_by_agent.values())
+            summary["usage_by_agent"] = {k: dict(v) for k, v in self._usage_by_agent.items()}
+            summary["reported_prompt_tokens"] = prompt_total
+            summary["cached_prompt_token_ratio"] = (
+                round(cached_total / prompt_total, 3) if prompt_total else 0.0
+            )
+        if self._routing_by_agent:
+            summary["model_routing"] = {
+                k: {**v, "by_model": dict(v["by_model"])} for k, v in self._routing_by_agent.items()
+            }
+        if self._drafts_by_agent:
+            summary["draft_sampling"] = {k: dict(v) for k, v in self._drafts_by_agent.items()}
+        if self._review_cache:
+            summary["review_cache"] = {k: dict(v) for k, v in self._review_cache.items()}
+        if self._stream_guard:
+            summary["stream_guard"] = {k: dict(v) for k, v in self._stream_guard.items()}
+        prompt_versions = get_prompt_registry().versions()
+        if prompt_versions:
+            summary["prompt_versions"] = prompt_versions
         if error:
             summary["error"] = error
 
@@ -188,3 +384,52 @@ class AgentTelemetryMiddleware:
 
         self._current_span = None
         self._current_agent = None
+
+
+class UsageCaptureMiddleware(ChatMiddleware):
+    """
+    Chat middleware that reports each model call's ``usage_details`` (and,
+    when streaming, its time to first chunk) to an
+    :class:`AgentTelemetryMiddleware` (works for streaming and non-streaming).
+
+    Put it last: the streaming hook is bound to the model's own stream, so
+    middleware that buffers a turn (the model router validating a cheaper
+    tier, draft sampling) cannot turn the TTFT sample into turn latency.
+    """
+
+    def __init__(self, agent_name: str, telemetry: AgentTelemetryMiddleware):
+        self.agent_name = agent_name
+        self.telemetry = telemetry
+
+    async def process(self, context: ChatContext, call_next) -> None:
+        started = time.perf_counter()
+        first_chunk = []
+
+        def _record(response):
+            self.telemetry.on_agent_usage(
+                self.agent_name, getattr(response, "usage_details", None),
+            )
+            return response
+
+        def _record_update(update):
+            if not first_chunk and getattr(update, "text", None):
+                first_chunk.append(True)
+                self.telemetry.on_agent_ttft(
+                    self.agent_name, (time.perf_counter() - started) * 1000,
+                )
+            # Streams carry usage in a trailing "usage" content; result hooks
+            # only run if the inner chat stream is finalised, which agents
+            # running inside a workflow do not do.
+            for content in getattr(update, "contents", None) or ():
+                if getattr(content, "type", None) == "usage":
+                    self.telemetry.on_agent_usage(
+                        self.agent_name, getattr(content, "usage_details", None),
+                    )
+            return update
+
+        await call_next()
+        if context.stream:
+            if context.result is not None:
+                context.result.with_transform_hook(_record_update)
+        elif context.result is not None:
+            _record(context.result)
@@ -0,0 +1,212 @@
+"""
+Context Policy for Multi-Agent Group Chat
+
+By default every GroupChat participant receives the full, growing
+conversation: the brief, every 5-step Creator chain of thought and every
+ReAct review.  By the Publisher turn the prompt carries several times the
+tokens it actually needs.
+
+The context policy rewrites the message list of each chat call so that an
+agent only sees what its role needs:
+
+  - Creator:   brief + latest **DRAFT** + latest Reviewer feedback
+  - Reviewer:  brief + latest **DRAFT**
+  - Publisher: approved **DRAFT** only
+
+Older turns can optionally be collapsed into a compact, extractive summary
+(one line per turn — no extra LLM call).  Prompt tokens (chars / 4, the same
+estimate used by the telemetry middleware) are measured before and after
+pruning for every turn.
+
+Configuration (env vars):
+    CONTEXT_POLICY            "role" (default) or "full" to disable pruning
+    CONTEXT_POLICY_SUMMARIZE  "1" (default) to keep a summary of older turns
+
+Usage:
+    middleware = build_context_middleware("Publisher", telemetry=telemetry)
+    publisher = Agent(client=..., name="Publisher", middleware=middleware)
+"""
+
+import os
+import re
+import logging
+from typing import List, Optional
+
+from agent_framework import ChatContext, ChatMiddleware, Message
+
+logger = logging.getLogger(__name__)
+
+_AGENT_TAG = re.compile(r"^\[Agent Name:\s*(\w+)\]\s*\n?")
+_DRAFT = re.compile(r"\*\*DRAFT\*\*:?\s*(.*?)(?:\n\s*-{3,}|\Z)", re.DOTALL)
+_VERDICT = re.compile(r"\*\*VERDICT\*\*:?\s*(REVISE|APPROVED)", re.IGNORECASE)
+_ACTION = re.compile(r"\*\*Action\*\*:?\s*(.+)")
+
+# Max characters of a Reviewer "Action" line kept in the turn summary
+_SUMMARY_ACTION_CHARS = 160
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count (chars / 4), matching the telemetry estimate."""
+    return len(text or "") // 4
+
+
+# ============================================================================
+# Transcript helpers
+# ============================================================================
+
+def _speaker(msg) -> str:
+    """Resolve the speaking agent, falling back to the ``[Agent Name: X]`` tag."""
+    name = getattr(msg, "author_name", None) or ""
+    if name:
+        return name
+    m = _AGENT_TAG.match(getattr(msg, "text", "") or "")
+    if m:
+        return m.group(1)
+    return "Orchestrator" if getattr(msg, "role", "") == "user" else ""
+
+
+def extract_draft(text: str) -> str:
+    """Return the ``**DRAFT**`` section of a Creator turn (or the whole text)."""
+    m = _DRAFT.search(text or "")
+    return m.group(1).strip() if m else (text or "").strip()
+
+
+def _summarise_turn(index: int, name: str, text: str) -> str:
+    """One-line extractive summary of an older agent turn."""
+    if name == "Reviewer":
+        verdict = _VERDICT.search(text)
+        action = _ACTION.search(text)
+        line = f"Round {index} — Reviewer: {verdict.group(1).upper() if verdict else 'feedback'}"
+        if action:
+            line += f"; Action: {action.group(1).strip()[:_SUMMARY_ACTION_CHARS]}"
+        return line
+    if name == "Creator":
+        words = len(extract_draft(text).split())
+        return f"Round {index} — Creator: draft ({words} words)"
+    return f"Round {index} — {name}: {len(text.split())} words"
+
+
+# ============================================================================
+# Policy
+# ============================================================================
+
+def select_context(
+    agent_name: str,
+    messages: List[Message],
+    summarize: bool = True,
+) -> List[Message]:
+    """
+    Return the pruned message list that *agent_name* needs for its turn.
+
+    The messages are left untouched when the policy does not apply (unknown
+    agent, first Creator turn, no draft yet).
+
+    Args:
+        agent_name: Agent about to speak ("Creator", "Reviewer", "Publisher").
+        messages: Full conversation about to be sent to the chat client.
+        summarize: Keep a one-line-per-turn summary of the pruned turns.
+
+    Returns:
+        list[Message] — the messages to send.
+    """
+    brief: Optional[Message] = None
+    turns = []  # (index, speaker, message)
+    for msg in messages:
+        text = getattr(msg, "text", "") or ""
+        if not text:
+            continue
+        name = _speaker(msg)
+        if name == "Orchestrator" and brief is None:
+            brief = msg
+            continue
+        turns.append((len(turns) + 1, name, msg))
+
+    creator_turns = [t for t in turns if t[1] == "Creator"]
+    if not creator_turns or agent_name not in ("Creator", "Reviewer", "Publisher"):
+        return messages
+
+    latest_draft = creator_turns[-1]
+    reviewer_turns = [t for t in turns if t[1] == "Reviewer"]
+    latest_review = reviewer_turns[-1] if reviewer_turns else None
+
+    keep = [latest_draft]
+    if agent_name == "Creator" and latest_review and latest_review[0] > latest_draft[0]:
+        keep.append(latest_review)
+
+    selected: List[Message] = []
+    if brief is not None and agent_name != "Publisher":
+        selected.append(brief)
+
+    kept_ids = {t[0] for t in keep}
+    if summarize and agent_name != "Publisher":
+        older = [
+            _summarise_turn(i, name, msg.text)
+            for i, name, msg in turns
+            if i not in kept_ids and name in ("Creator", "Reviewer")
+        ]
+        if older:
+            selected.append(Message(
+                "user",
+                ["Summary of earlier rounds:\n" + "\n".join(older)],
+            ))
+
+    for _, name, msg in keep:
+        text = msg.text
+        if name == "Creator":
+            text = f"[Agent Name: Creator]\n\n**DRAFT**:\n{extract_draft(text)}"
+        selected.append(Message(msg.role, [text], author_name=msg.author_name))
+
+    return selected
+
+
+class ContextPolicyMiddleware(ChatMiddleware):
+    """
+    Chat middleware that applies :func:`select_context` to every chat call
+    made by one agent and records prompt tokens before / after pruning.
+    """
+
+    def __init__(self, agent_name: str, summarize: bool = True, telemetry=None):
+        self.agent_name = agent_name
+        self.summarize = summarize
+        self.telemetry = telemetry
+        self.measurements: List[dict] = []
+
+    async def process(self, context: ChatContext, call_next) -> None:
+        instructions = (context.options or {}).get("instructions") or ""
+        before = estimate_tokens(instructions) + sum(
+            estimate_tokens(getattr(m, "text", "")) for m in context.messages
+        )
+
+        context.messages = select_context(
+            self.agent_name, list(context.messages), summarize=self.summarize,
+        )
+
+        after = estimate_tokens(instructions) + sum(
+            estimate_tokens(getattr(m, "text", "")) for m in context.messages
+        )
+        self.measurements.append({
+            "agent": self.agent_name,
+            "prompt_tokens_before": before,
+            "prompt_tokens_after": after,
+        })
+        if self.telemetry is not None:
+            self.telemetry.on_prompt_measured(self.agent_name, before, after)
+        if before > after:
+            saved = 100 * (before - after) / before
+            print(f"   ✂️  Context policy [{self.agent_name}]: "
+                  f"~{before:,} → ~{after:,} prompt tokens (-{saved:.0f}%)")
+
+        await call_next()
+
+
+def build_context_middleware(agent_name: str, telemetry=None) -> list:
+    """
+    Return the middleware list implementing the context policy for *agent_name*.
+
+    Returns an empty list when ``CONTEXT_POLICY=full`` so callers can pass the
+    result straight to ``Agent(middleware=...)``.
+    """
+    if os.getenv("CONTEXT_POLICY", "role").lower().strip() == "full":
+        return []
+    summarize = os.getenv("CONTEXT_POLICY_SUMMARIZE", "1").strip() not in ("0", "false", "no")
+    return [ContextPolicyMiddleware(agent_name, summarize=summarize, telemetry=telemetry)]
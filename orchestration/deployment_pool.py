@@ -0,0 +1,428 @@
+"""
+Deployment Pool — weighted least-outstanding-tokens routing with failover
+
+One Azure OpenAI deployment's quota caps the whole system, so chat calls
+can be spread over a pool of deployments (other regions, other capacity
+units).  The pool is configured with ``AZURE_OPENAI_DEPLOYMENTS``, either
+inline JSON or a path to a JSON file:
+
+    [
+      {"name": "eastus",  "endpoint": "https://zava-eastus.openai.azure.com",
+       "deployment": "gpt-4o", "weight": 2, "tpm": 60000},
+      {"name": "swedenc", "endpoint": "https://zava-swedenc.openai.azure.com",
+       "deployment": "gpt-4o", "weight": 1, "tpm": 30000,
+       "api_key_env": "AZURE_OPENAI_SWEDENC_KEY"}
+    ]
+
+Without it the pool has one member, built from ``AZURE_OPENAI_ENDPOINT`` +
+``AZURE_OPENAI_CHAT_DEPLOYMENT_NAME``.
+
+Every agent turn is routed to the member with the most headroom:
+
+  1. healthy first — circuit closed (or due a half-open trial) and not
+     paused by a recent 429
+  2. no pacing wait before one that would wait for its TPM / RPM bucket
+  3. fewest tokens in flight + sent in the last minute, per unit of weight
+
+A 429 / 5xx / connection error before the first streamed chunk fails over
+to the next-best member straight away.  When every member has failed the
+turn, the pool backs off (jittered, at least until the earliest 429 pause
+ends) and tries again, up to ``UPSTREAM_MAX_RETRIES`` rounds.  Each member
+is its own ``chat:<name>`` upstream (``orchestration/upstream.py``), so
+pacing, breakers and bulkheads are per deployment.
+
+Members may also carry a ``model`` (default: the deployment name).  When a
+request asks for a model via ``options["model_id"]``, only members serving
+that model are candidates.
+
+Usage:
+    pool = get_deployment_pool()
+    client = PooledChatClient(pool, credential=DefaultAzureCredential())
+    print(pool.snapshot())
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import (
+    Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple,
+)
+from urllib.parse import urlparse
+
+from agent_framework import BaseChatClient, ChatMiddlewareLayer, ChatResponse, FunctionInvocationLayer, Message
+from agent_framework.observability import ChatTelemetryLayer
+
+from orchestration.fake_chat_client import detect_agent
+from orchestration.hedging import get_hedge_policy
+from orchestration.upstream import (
+    Upstream,
+    UpstreamUnavailableError,
+    estimate_request_tokens,
+    get_upstreams,
+    is_retryable,
+    usage_tokens,
+)
+
+WINDOW_SECONDS = 60.0
+
+
+@dataclass
+class Deployment:
+    """One pool member as configured."""
+
+    endpoint: str
+    deployment: str
+    name: str = ""
+    model: str = ""
+    weight: float = 1.0
+    rpm: Optional[float] = None
+    tpm: Optional[float] = None
+    api_key_env: str = ""
+
+    def __post_init__(self):
+        if not self.name:
+            host = urlparse(self.endpoint).hostname or self.endpoint
+            self.name = f"{self.deployment}@{host.split('.')[0]}"
+        self.model = self.model or self.deployment
+        if self.weight <= 0:
+            raise ValueError(f"Deployment {self.name}: weight must be > 0")
+
+
+def load_deployments() -> List[Deployment]:
+    """Pool members from ``AZURE_OPENAI_DEPLOYMENTS``, else the single deployment."""
+    raw = os.getenv("AZURE_OPENAI_DEPLOYMENTS", "").strip()
+    if not raw:
+        deployment = os.getenv("AZURE_OPENAI_CHAT_DEPLOYMENT_NAME", "")
+        return [Deployment(endpoint=os.getenv("AZURE_OPENAI_ENDPOINT", ""), deployment=deployment, name=deployment)]
+    if not raw.startswith("["):
+        with open(raw, "r", encoding="utf-8") as f:
+            raw = f.read()
+    deployments = [Deployment(**entry) for entry in json.loads(raw)]
+    names = [d.name for d in deployments]
+    if not deployments or len(set(names)) != len(names):
+        raise ValueError(f"AZURE_OPENAI_DEPLOYMENTS needs at least one entry and unique names (got {names})")
+    return deployments
+
+
+# ============================================================================
+# Pool
+# ============================================================================
+
+@dataclass
+class PoolMember:
+    """A deployment, its upstream and its live routing load."""
+
+    deployment: Deployment
+    upstream: Upstream
+    outstanding_tokens: int = 0
+    routed: int = 0
+    failovers: int = 0
+    recent: Deque[Tuple[float, int]] = field(default_factory=deque)
+
+    @property
+    def name(self) -> str:
+        return self.deployment.name
+
+    def recent_tokens(self, now: float) -> int:
+        while self.recent and now - self.recent[0][0] > WINDOW_SECONDS:
+            self.recent.popleft()
+        return sum(tokens for _, tokens in self.recent)
+
+    def healthy(self, now: float) -> bool:
+        return self.upstream.breaker.available() and self.upstream.rpm.blocked_until <= now
+
+    def load(self, tokens: int, now: float) -> float:
+        return (self.outstanding_tokens + self.recent_tokens(now) + tokens) / self.deployment.weight
+
+
+class _Attempt:
+    """One streamed call to one member, pumped into a queue shared with its rivals."""
+
+    def __init__(self, pool: "DeploymentPool", member: PoolMember,
+                 open_fn: Callable[[PoolMember], AsyncIterator[Any]], tokens: int, queue: asyncio.Queue):
+        self.member = member
+        pool._begin(member, tokens)
+        self._task = asyncio.ensure_future(self._pump(pool, open_fn, tokens, queue))
+
+    async def _pump(self, pool, open_fn, tokens: int, queue: asyncio.Queue) -> None:
+        used = None
+        try:
+            async for update in self.member.upstream.stream(lambda: open_fn(self.member), tokens, max_retries=0):
+                for content in update.contents or ():
+                    if getattr(content, "type", None) == "usage":
+                        used = usage_tokens(content.usage_details)
+                await queue.put((self, "update", update))
+            used = used or tokens
+            await queue.put((self, "done", None))
+        except Exception as exc:
+            await queue.put((self, "error", exc))
+        finally:
+            pool._end(self.member, tokens, used)
+
+    def cancel(self) -> None:
+        self._task.cancel()
+
+
+class DeploymentPool:
+    """Routes chat calls over the configured deployments."""
+
+    def __init__(self, deployments: Sequence[Deployment]):
+        registry = get_upstreams()
+        self.members = [
+            PoolMember(d, registry.get(f"chat:{d.name}", rpm=d.rpm, tpm=d.tpm)) for d in deployments
+        ]
+        self._clients: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.exhausted = 0
+
+    # ---- routing ------------------------------------------------------------
+
+    def serves(self, model: str) -> bool:
+        """Whether any member is configured for *model*."""
+        return any(m.deployment.model == model for m in self.members)
+
+    def rank(self, tokens: int, model: Optional[str] = None, exclude: Sequence[str] = ()) -> List[PoolMember]:
+        """Candidates for a call, best first."""
+        now = time.monotonic()
+        members = [m for m in self.members if m.name not in exclude]
+        if model and any(m.deployment.model == model for m in self.members):
+            members = [m for m in members if m.deployment.model == model]
+        with self._lock:
+            return sorted(members, key=lambda m: (
+                not m.healthy(now),
+                round(m.upstream.wait_estimate(tokens), 1),
+                m.load(tokens, now),
+            ))
+
+    def _begin(self, member: PoolMember, tokens: int) -> None:
+        with self._lock:
+            member.outstanding_tokens += tokens
+            member.routed += 1
+
+    def _end(self, member: PoolMember, tokens: int, used: Optional[int]) -> None:
+        with self._lock:
+            member.outstanding_tokens -= tokens
+            if used is not None:
+                member.recent.append((time.monotonic(), used))
+        # Failed attempts consumed no quota: give the whole reservation back
+        member.upstream.settle(tokens, used or 0)
+
+    async def _backoff(self, round_: int) -> None:
+        """Sleep between rounds: jittered, and at least until the first 429 pause ends."""
+        now = time.monotonic()
+        pause = min(max(0.0, m.upstream.rpm.blocked_until - now) for m in self.members)
+        await asyncio.sleep(max(self.members[0].upstream.backoff(round_), pause))
+
+    def _round(self, tokens: int, model: Optional[str]) -> Iterator[PoolMember]:
+        """One failover round: every candidate once, re-ranked after each failure."""
+        tried: List[str] = []
+        while True:
+            ranked = self.rank(tokens, model, exclude=tried)
+            if not ranked:
+                return
+            tried.append(ranked[0].name)
+            yield ranked[0]
+
+    def _failed(self, member: PoolMember, exc: Exception, last_round: bool) -> None:
+        """Record a failover, or re-raise when another member would not help."""
+        if not (isinstance(exc, UpstreamUnavailableError) or is_retryable(exc)):
+            raise exc
+        with self._lock:
+            member.failovers += 1
+            if last_round:
+                self.exhausted += 1
+
+    async def call(self, fn: Callable[[PoolMember], Awaitable[ChatResponse]], tokens: int,
+                   model: Optional[str] = None) -> ChatResponse:
+        """``await fn(member)`` on the best member, failing over on retryable errors."""
+        max_rounds = self.members[0].upstream.max_retries
+        for round_ in range(max_rounds + 1):
+            for member in self._round(tokens, model):
+                self._begin(member, tokens)
+                used = None
+                try:
+                    response = await member.upstream.call(lambda: fn(member), tokens, max_retries=0)
+                    used = usage_tokens(response.usage_details) or tokens
+                    return response
+                except Exception as exc:
+                    last = exc
+                    self._failed(member, exc, round_ == max_rounds)
+                finally:
+                    self._end(member, tokens, used)
+            if round_ < max_rounds:
+                await self._backoff(round_)
+        raise last
+
+    async def stream(self, open_fn: Callable[[PoolMember], AsyncIterator[Any]], tokens: int,
+                     model: Optional[str] = None, hedge_after: Optional[float] = None) -> AsyncIterator[Any]:
+        """Stream from the best member; fails over only before the first update.
+
+        With *hedge_after* (seconds), a call with no first update by then is
+        duplicated to the next-best member (budget permitting); the first
+        attempt to stream wins and the other is cancelled.
+        """
+        hedging = get_hedge_policy()
+        queue: asyncio.Queue = asyncio.Queue()
+        live: List[_Attempt] = []
+        tried: List[str] = []
+        max_rounds = self.members[0].upstream.max_retries
+        round_, last, winner, hedge = 0, None, None, None
+        deadline = None if hedge_after is None else time.monotonic() + hedge_after
+
+        def launch(allow_repeat: bool = False) -> Optional[_Attempt]:
+            ranked = self.rank(tokens, model, exclude=tried) or (self.rank(tokens, model) if allow_repeat else [])
+            if not ranked:
+                return None
+            tried.append(ranked[0].name)
+            attempt = _Attempt(self, ranked[0], open_fn, tokens, queue)
+            live.append(attempt)
+            return attempt
+
+        launch()
+        try:
+            while True:
+                timeout = None
+                if winner is None and deadline is not None:
+                    timeout = max(0.0, deadline - time.monotonic())
+                try:
+                    attempt, kind, payload = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    deadline = None
+                    if hedging.try_fire():
+                        hedge = launch(allow_repeat=True)
+                        print(f"   🪝 Hedging: no first chunk after {hedge_after:.1f}s "
+                              f"→ duplicate to {hedge.member.name}")
+                    continue
+                if winner is not None and attempt is not winner:
+                    continue
+                if kind == "update":
+                    if winner is None:
+                        winner = attempt
+                        for other in live:
+                            if other is not attempt:
+                                other.cancel()
+                        if attempt is hedge:
+                            hedging.record_win()
+                    yield payload
+                elif kind == "done":
+                    return
+                else:
+                    live.remove(attempt)
+                    if winner is not None:
+                        raise payload
+                    last = payload
+                    self._failed(attempt.member, payload, round_ == max_rounds and not live)
+                    if live or launch():
+                        continue
+                    if round_ == max_rounds:
+                        raise last
+                    await self._backoff(round_)
+                    round_ += 1
+                    tried.clear()
+                    launch()
+        finally:
+            for attempt in live:
+                attempt.cancel()
+
+    # ---- member clients -------------------------------------------------------
+
+    def client_for(self, member: PoolMember, credential=None):
+        """The raw Azure OpenAI client for *member* (created once, SDK retries off)."""
+        with self._lock:
+            client = self._clients.get(member.name)
+            if client is None:
+                from agent_framework.azure import AzureOpenAIChatClient
+
+                d = member.deployment
+                settings = dict(endpoint=d.endpoint, deployment_name=d.deployment)
+                api_key = os.getenv(d.api_key_env or "AZURE_OPENAI_API_KEY")
+                if api_key:
+                    settings["api_key"] = api_key
+                else:
+                    if credential is None:
+                        from azure.identity import DefaultAzureCredential
+                        credential = DefaultAzureCredential()
+                    settings["credential"] = credential
+                client = AzureOpenAIChatClient(**settings)
+                # Retries happen in the pool (failover) and upstream layer, not in the SDK
+                client.client = client.client.with_options(max_retries=0)
+                self._clients[member.name] = client
+            return client
+
+    # ---- reporting --------------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            members = {
+                m.name: {
+                    "endpoint": urlparse(m.deployment.endpoint).hostname or m.deployment.endpoint,
+                    "deployment": m.deployment.deployment,
+                    "model": m.deployment.model,
+                    "weight": m.deployment.weight,
+                    "healthy": m.healthy(now),
+                    "breaker": m.upstream.breaker.state,
+                    "outstanding_tokens": m.outstanding_tokens,
+                    "tokens_last_minute": m.recent_tokens(now),
+                    "routed": m.routed,
+                    "failovers": m.failovers,
+                }
+                for m in self.members
+            }
+        return {"members": members, "exhausted": self.exhausted, "hedging": get_hedge_policy().snapshot()}
+
+
+_pool: Optional[DeploymentPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_deployment_pool() -> DeploymentPool:
+    """The process-wide deployment pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = DeploymentPool(load_deployments())
+        return _pool
+
+
+# ============================================================================
+# Chat client
+# ============================================================================
+
+class PooledChatClient(ChatMiddlewareLayer, FunctionInvocationLayer, ChatTelemetryLayer, BaseChatClient):
+    """Chat client that sends each call to the pool's best deployment."""
+
+    OTEL_PROVIDER_NAME = "azure.ai.openai"
+
+    def __init__(self, pool: Optional[DeploymentPool] = None, credential=None, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.pool = pool if pool is not None else get_deployment_pool()
+        self.credential = credential
+        self.model_id = self.pool.members[0].deployment.model
+
+    def _member_options(self, member: PoolMember, options: Mapping[str, Any]) -> Mapping[str, Any]:
+        if options.get("model_id"):
+            return {**options, "model_id": member.deployment.deployment}
+        return options
+
+    def _inner_get_response(self, *, messages: Sequence[Message], options: Mapping[str, Any],
+                            stream: bool = False, **kwargs: Any):
+        tokens = estimate_request_tokens(messages, options)
+        model = options.get("model_id")
+
+        def forward(member: PoolMember, stream_: bool):
+            return self.pool.client_for(member, self.credential)._inner_get_response(
+                messages=messages, options=self._member_options(member, options), stream=stream_, **kwargs,
+            )
+
+        if stream:
+            agent = detect_agent(options.get("instructions") or "")
+            return self._build_response_stream(
+                self.pool.stream(lambda m: forward(m, True), tokens, model, get_hedge_policy().delay_for(agent)),
+                response_format=options.get("response_format"),
+            )
+        return self.pool.call(lambda m: forward(m, False), tokens, model)
@@ -0,0 +1,343 @@
+"""
+Draft Sampling — parallel Creator drafts ranked locally before review
+
+A REVISE verdict costs a full Creator + Reviewer round trip, the slowest
+path of a run.  With ``CREATOR_DRAFTS=N`` (N ≥ 2) every Creator turn asks
+the model for N drafts at once — the first with the agent's own options,
+the others with a different ``temperature`` and ``seed`` — and only the
+best-scoring draft goes on to the Reviewer.  Scoring is local, no extra
+LLM call:
+
+  - brand:        brand filters (competitors, banned words, unsafe
+                  activities, PII) and claims not backed by the brief or
+                  guidelines
+  - length:       the **DRAFT** stays under the 150-word limit (and is not
+                  a stub)
+  - hashtags:     approved hashtags only, brand hashtag present
+  - destinations: share of the brief's destinations the draft names
+  - similarity:   word overlap with the brief
+
+A draft the brand filters block scores 0.  Drafts are generated
+concurrently, so a turn takes about as long as its slowest draft;
+streamed turns are buffered until every draft has finished.  The
+middleware that should run for every draft (context policy, stream guard,
+usage capture) is passed to the builder as ``downstream``: each draft is
+its own chat-client call through that chain, with its own messages,
+options and result.  Put the sampler after the model router, which then
+validates the winner.
+
+Per-turn picks and score gains go to ``AgentTelemetryMiddleware``; the
+process-wide ``get_draft_sampler().summary()`` also keeps the first-pass
+approval rate and average Creator rounds per run recorded by the API
+server and the benchmark.
+
+Configuration (env vars):
+    CREATOR_DRAFTS               Drafts per Creator turn (default 1 = off)
+    CREATOR_DRAFT_TEMPERATURES   Temperatures for the extra drafts, cycled
+                                 (default "0.7,1.1,0.4")
+
+Usage:
+    creator = create_grounded_agent(..., middleware=[
+        *build_model_routing_middleware("Creator", telemetry),
+        *build_draft_sampling_middleware("Creator", telemetry, downstream=[
+            *build_context_middleware("Creator", telemetry),
+            telemetry.usage_middleware("Creator"),
+        ]),
+    ])
+    score = score_draft(creator_text, brief)      # DraftScore(score=0.87, ...)
+"""
+
+import asyncio
+import math
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from agent_framework import ChatContext, ChatMiddleware
+
+from grounding.brand_rules import load_brand_rules
+from grounding.fact_index import FactIndex, get_fact_index
+from grounding.guideline_index import tokenize
+from orchestration.context_policy import extract_draft
+from safety.brand_filters import check_claims, run_output_filters
+
+_HASHTAG = re.compile(r"#\w+")
+_VERDICT = re.compile(r"\*\*VERDICT\*\*:?\s*(REVISE|APPROVED)", re.IGNORECASE)
+
+# Share of the total score per check
+WEIGHTS = {
+    "brand": 0.30,
+    "length": 0.15,
+    "hashtags": 0.10,
+    "destinations": 0.30,
+    "similarity": 0.15,
+}
+
+MAX_DRAFT_WORDS = 150
+MIN_DRAFT_WORDS = 40
+
+
+# ============================================================================
+# Scoring
+# ============================================================================
+
+@dataclass(frozen=True)
+class DraftScore:
+    score: float
+    parts: Dict[str, float] = field(default_factory=dict)
+    problems: Tuple[str, ...] = ()
+
+
+def score_draft(text: str, brief: str, rules=None, facts: Optional[FactIndex] = None) -> DraftScore:
+    """Score one Creator response (0..1) against the brief and brand rules."""
+    draft = extract_draft(text or "")
+    if not draft:
+        return DraftScore(0.0, {}, ("no **DRAFT** section",))
+    rules = rules or load_brand_rules()
+    problems: List[str] = []
+    parts: Dict[str, float] = {}
+
+    shield = run_output_filters(draft, rules)
+    claims = check_claims(draft, facts or get_fact_index(brief, rules=rules))
+    warnings = [f for f in shield.flags if f.severity != "blocked"] + claims
+    parts["brand"] = 0.0 if not shield.allowed else max(0.0, 1 - 0.25 * len(warnings))
+    problems += [f.detail for f in shield.flags + claims]
+
+    words = len(draft.split())
+    if words > MAX_DRAFT_WORDS:
+        parts["length"] = max(0.0, 1 - (words - MAX_DRAFT_WORDS) / (MAX_DRAFT_WORDS / 2))
+        problems.append(f"draft is {words} words (limit {MAX_DRAFT_WORDS})")
+    else:
+        parts["length"] = min(1.0, words / MIN_DRAFT_WORDS)
+
+    tags = [t.lower() for t in _HASHTAG.findall(draft)]
+    approved = {t.lower() for t in rules.approved_hashtags}
+    unapproved = [t for t in tags if t not in approved]
+    parts["hashtags"] = 0.5 * (1 - len(unapproved) / len(tags) if tags else 1.0) + (
+        0.5 if rules.has_brand_hashtag(draft) or any(t in approved for t in tags) else 0.0
+    )
+    if unapproved:
+        problems.append(f"unapproved hashtags: {', '.join(unapproved)}")
+
+    wanted = FactIndex.from_text(brief).destinations
+    named = FactIndex.from_text(draft).destinations
+    parts["destinations"] = len(wanted & named) / len(wanted) if wanted else 1.0
+    if wanted - named:
+        problems.append(f"missing destinations: {', '.join(sorted(wanted - named))}")
+
+    brief_terms, draft_terms = set(tokenize(brief)), set(tokenize(draft))
+    parts["similarity"] = (
+        len(brief_terms & draft_terms) / math.sqrt(len(brief_terms) * len(draft_terms))
+        if brief_terms and draft_terms else 0.0
+    )
+
+    total = 0.0 if not shield.allowed else sum(WEIGHTS[k] * v for k, v in parts.items())
+    return DraftScore(round(total, 4), {k: round(v, 3) for k, v in parts.items()}, tuple(problems))
+
+
+def review_outcome(turns: Iterable[Tuple[str, str]]) -> Tuple[bool, int]:
+    """``(first review approved, Creator rounds)`` from ``(agent, text)`` turns."""
+    rounds, first_verdict = 0, None
+    for name, text in turns:
+        if name == "Creator":
+            rounds += 1
+        elif name == "Reviewer" and first_verdict is None:
+            match = _VERDICT.search(text or "")
+            if match:
+                first_verdict = match.group(1).upper()
+    return first_verdict == "APPROVED", rounds
+
+
+# ============================================================================
+# Sampler
+# ============================================================================
+
+@dataclass
+class SamplingStats:
+    """Running totals for the process."""
+
+    turns: int = 0
+    candidates: int = 0
+    failed_candidates: int = 0
+    picked_alternative: int = 0
+    score_gain: float = 0.0
+    runs: int = 0
+    first_pass_approved: int = 0
+    creator_rounds: int = 0
+
+
+class DraftSampler:
+    """How many drafts to ask for, how they vary, and how they are ranked."""
+
+    def __init__(self, drafts: Optional[int] = None, temperatures: Optional[List[float]] = None):
+        self.drafts = drafts if drafts is not None else int(os.getenv("CREATOR_DRAFTS", "1"))
+        if temperatures is None:
+            raw = os.getenv("CREATOR_DRAFT_TEMPERATURES", "0.7,1.1,0.4")
+            temperatures = [float(t) for t in raw.split(",") if t.strip()]
+        self.temperatures = temperatures or [0.7]
+        self._stats = SamplingStats()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.drafts > 1
+
+    def variant(self, options, index: int) -> dict:
+        """Options for draft *index*; draft 0 keeps the agent's own."""
+        options = dict(options or {})
+        if index:
+            options["temperature"] = self.temperatures[(index - 1) % len(self.temperatures)]
+            options["seed"] = index
+        return options
+
+    def rank(self, texts: List[Optional[str]], brief: str, rules=None) -> List[Tuple[int, DraftScore]]:
+        """``(index, score)`` of every finished draft, best first (ties: lower index)."""
+        rules = rules or load_brand_rules()
+        facts = get_fact_index(brief, rules=rules)
+        scored = [(i, score_draft(t, brief, rules, facts)) for i, t in enumerate(texts) if t is not None]
+        return sorted(scored, key=lambda item: (-item[1].score, item[0]))
+
+    def record_turn(self, ranked: List[Tuple[int, DraftScore]], candidates: int) -> dict:
+        best_index, best = ranked[0]
+        baseline = next((s.score for i, s in ranked if i == 0), 0.0)
+        with self._lock:
+            s = self._stats
+            s.turns += 1
+            s.candidates += candidates
+            s.failed_candidates += candidates - len(ranked)
+            s.picked_alternative += int(best_index != 0)
+            s.score_gain += best.score - baseline
+        return {
+            "candidates": candidates, "completed": len(ranked), "picked": best_index,
+            "score": best.score, "score_gain": round(best.score - baseline, 4),
+            "scores": [s.score for _, s in sorted(ranked)],
+        }
+
+    def record_run(self, first_pass_approved: bool, creator_rounds: int) -> None:
+        with self._lock:
+            self._stats.runs += 1
+            self._stats.first_pass_approved += int(first_pass_approved)
+            self._stats.creator_rounds += creator_rounds
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            s = self._stats
+            return {
+                "drafts": self.drafts,
+                **vars(s),
+                "score_gain": round(s.score_gain, 3),
+                "mean_score_gain": round(s.score_gain / s.turns, 4) if s.turns else 0.0,
+                "first_pass_approval_rate": round(s.first_pass_approved / s.runs, 3) if s.runs else None,
+                "avg_creator_rounds": round(s.creator_rounds / s.runs, 2) if s.runs else None,
+            }
+
+
+_sampler: Optional[DraftSampler] = None
+_sampler_lock = threading.Lock()
+
+
+def get_draft_sampler() -> DraftSampler:
+    """The process-wide draft sampler."""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = DraftSampler()
+        return _sampler
+
+
+# ============================================================================
+# Middleware
+# ============================================================================
+
+def _brief(messages) -> str:
+    for msg in messages:
+        if str(getattr(msg, "role", "")) == "user" and getattr(msg, "text", None):
+            return msg.text
+    return ""
+
+
+class DraftSamplingMiddleware(ChatMiddleware):
+    """
+    Chat middleware that runs one agent turn N times concurrently, each
+    through the *downstream* middleware, and keeps the draft that scores
+    best locally.  It ends the agent's chain: ``call_next`` is not used.
+    """
+
+    def __init__(self, agent_name: str, downstream: Sequence = (), sampler: Optional[DraftSampler] = None,
+                 telemetry=None, rules=None):
+        self.agent_name = agent_name
+        self.downstream = list(downstream)
+        self.sampler = sampler if sampler is not None else get_draft_sampler()
+        self.telemetry = telemetry
+        self.rules = rules
+
+    async def _draft(self, context: ChatContext, messages, options):
+        """One draft: a chat-client call through the downstream middleware."""
+        kwargs = dict(context.kwargs)
+        middleware = [*self.downstream, *(kwargs.pop("function_middleware", None) or ())]
+        response = context.client.get_response(
+            list(messages), stream=context.stream, options=options, middleware=middleware, **kwargs,
+        )
+        if context.stream:
+            return [update async for update in response]
+        return await response
+
+    async def process(self, context: ChatContext, call_next) -> None:
+        messages, options = list(context.messages), context.options
+        started = time.perf_counter()
+
+        tasks = [
+            asyncio.ensure_future(self._draft(context, messages, self.sampler.variant(options, i)))
+            for i in range(max(1, self.sampler.drafts))
+        ]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if len(errors) == len(results):
+            raise errors[0]
+
+        def text_of(result) -> Optional[str]:
+            if isinstance(result, BaseException):
+                return None
+            if context.stream:
+                return "".join(update.text or "" for update in result)
+            return result.text or ""
+
+        brief = _brief(messages)
+        ranked = self.sampler.rank([text_of(r) for r in results], brief, self.rules)
+        record = self.sampler.record_turn(ranked, len(results))
+        record["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        best_index, best = ranked[0]
+        print(f"   🎲 Draft sampling [{self.agent_name}]: {len(ranked)}/{len(results)} drafts, "
+              f"picked #{best_index + 1} (score {best.score:.2f}, "
+              f"{'+' if record['score_gain'] >= 0 else ''}{record['score_gain']:.2f} vs first)")
+        if self.telemetry is not None:
+            self.telemetry.on_drafts_ranked(self.agent_name, record)
+
+        winner = results[best_index]
+        if not context.stream:
+            context.result = winner
+            return
+
+        async def _replay():
+            for update in winner:
+                yield update
+
+        context.result = context.client._build_response_stream(
+            _replay(), response_format=(options or {}).get("response_format"),
+        )
+
+
+def build_draft_sampling_middleware(agent_name: str, telemetry=None, rules=None, downstream: Sequence = ()) -> list:
+    """
+    Return the draft-sampling middleware list for *agent_name*.
+
+    *downstream* is the middleware every draft runs through.  Unless
+    ``CREATOR_DRAFTS`` is 2 or more it is returned unchanged, so callers can
+    always splat the result into ``Agent(middleware=[...])``.
+    """
+    if not get_draft_sampler().enabled:
+        return list(downstream)
+    return [DraftSamplingMiddleware(agent_name, downstream, telemetry=telemetry, rules=rules)]
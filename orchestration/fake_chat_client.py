@@ -0,0 +1,237 @@
+"""
+Fake Chat Client — deterministic, offline stand-in for Azure OpenAI
+
+A drop-in chat client for the Creator → Reviewer → Publisher workflow
+that never touches the network.  It recognises the calling agent from its
+instructions and answers in that agent's output format:
+
+  - Creator:   Chain-of-Thought notes + a **DRAFT** built from the brief
+  - Reviewer:  ReAct review ending in **VERDICT**: APPROVED
+  - Publisher: LinkedIn / X/Twitter / Instagram posts with reflection checks
+
+Destinations, prices and hashtags are taken from the brief and the brand
+rules, so the output passes the platform validators.  Usage details are
+reported like the real service (prompt / completion tokens, chars / 4) and
+chat middleware (context policy, usage capture) runs as usual, which makes
+the client suitable for benchmarks and CI.
+
+An optional fixed latency per call (``latency_ms``) and time to first
+token (``ttft_ms``) make timing measurements meaningful.
+
+Usage:
+    client = FakeChatClient()
+    creator = Agent(client=client, name="Creator", instructions=CREATOR_INSTRUCTIONS)
+"""
+
+import asyncio
+import re
+from typing import Any, List, Mapping, Sequence
+
+from agent_framework import (
+    BaseChatClient,
+    ChatMiddlewareLayer,
+    ChatResponse,
+    ChatResponseUpdate,
+    Content,
+    FunctionInvocationLayer,
+    Message,
+    UsageDetails,
+)
+
+from grounding.brand_rules import load_brand_rules
+from grounding.fact_index import KNOWN_DESTINATIONS
+
+_PRICE = re.compile(r"\$\d[\d,]*")
+_DESTINATION = re.compile(
+    r"\b(" + "|".join(re.escape(d) for d in sorted(KNOWN_DESTINATIONS, key=len, reverse=True)) + r")\b"
+)
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text or "") // 4)
+
+
+def detect_agent(instructions: str) -> str:
+    """Which workflow agent a set of instructions belongs to."""
+    head = (instructions or "")[:300].lower()
+    if "publisher" in head:
+        return "Publisher"
+    if "reviewer" in head:
+        return "Reviewer"
+    return "Creator"
+
+
+# ============================================================================
+# Canned agent outputs
+# ============================================================================
+
+def _brief_facts(brief: str) -> dict:
+    rules = load_brand_rules()
+    destinations = list(dict.fromkeys(_DESTINATION.findall(brief))) or list(rules.destinations[:3])
+    prices = _PRICE.findall(brief)
+    return {
+        "rules": rules,
+        "destinations": destinations,
+        "price": prices[0] if prices else "",
+        "places": ", ".join(destinations[:-1]) + (f" and {destinations[-1]}" if len(destinations) > 1 else destinations[0]),
+    }
+
+
+def creator_output(brief: str) -> str:
+    f = _brief_facts(brief)
+    rules = f["rules"]
+    price = f" starting at {f['price']}" if f["price"] else ""
+    return (
+        "[Agent Name: Creator]\n\n"
+        "**Step 1 — Brief analysis**: Adventure-seeking audience; lead with the destinations.\n"
+        f"**Step 2 — Key message**: {rules.tagline}.\n"
+        "**Step 3 — Tone**: Adventurous, inspiring, budget-friendly.\n"
+        f"**Step 4 — Hashtags**: {', '.join(rules.approved_hashtags)}.\n"
+        "**Step 5 — CTA**: Explore curated itineraries.\n\n"
+        "**DRAFT**:\n"
+        f"Your next adventure is closer than you think. Discover {f['places']} with "
+        f"{rules.short_name}'s curated itineraries{price} — real experiences, local guides "
+        f"and no hidden fees. {rules.tagline}.\n\n---"
+    )
+
+
+def reviewer_output(brief: str) -> str:
+    return (
+        "[Agent Name: Reviewer]\n\n"
+        "**Thought**: The draft names the brief's destinations and keeps the brand voice.\n"
+        "**Action**: Checked banned words, competitors, tagline and hashtags.\n"
+        "**Observation**: No violations; tone is adventurous and budget-friendly.\n\n"
+        "**Score**: 9/10\n"
+        "**VERDICT**: APPROVED"
+    )
+
+
+def publisher_output(brief: str) -> str:
+    f = _brief_facts(brief)
+    rules = f["rules"]
+    tags = list(rules.approved_hashtags)
+    price = f" from {f['price']}" if f["price"] else ""
+    linkedin_body = (
+        f"Adventure doesn't have to cost a fortune. {rules.short_name} curates itineraries to "
+        f"{f['places']}{price}, built with local guides who know every hidden trail, market and "
+        "viewpoint worth the journey.\n\n"
+        "Every trip balances authentic culture, outdoor adventure and budget-friendly pricing, so "
+        "travelers can spend less on logistics and more on the moments they came for. From sunrise "
+        "hikes to street-food evenings, each day is planned so you can simply show up and explore "
+        "with confidence.\n\n"
+        "Explore our curated itineraries and start planning your next journey today at zavatravel.com."
+    )
+    twitter_body = f"🌍 {f['places']}{price}. {rules.tagline}. Book now → zavatravel.com"
+    instagram_words = (
+        f"✈️🌅 Picture this: waking up to a new horizon in {f['destinations'][0]}, coffee in hand, "
+        "a whole day of adventure ahead. No stress, no hidden fees — just a curated itinerary built "
+        "by people who love these places as much as you will. Wander the markets, chase waterfalls, "
+        "swap stories with locals and find the viewpoints the guidebooks miss. Our trips are made "
+        "for travelers who want the real thing without the premium price tag, and every day is "
+        "planned so you can simply say yes to the next experience. Ready for yours? Tag the travel "
+        "buddy who needs this trip and share your dream destination in the comments below 👇"
+    )
+    return (
+        "[Agent Name: Publisher]\n\n"
+        "**Platform-Specific Formatting Complete**\n\n"
+        "---\n\n"
+        f"**LINKEDIN POST**\n\n{linkedin_body}\n\n{' '.join(tags)}\n\n"
+        "**Reflection Checks**:\n✓ Length — PASS\n✓ Hashtags — PASS\n✓ CTA present: YES — PASS\n\n"
+        "---\n\n"
+        f"**X/TWITTER POST**\n\n{twitter_body} {' '.join(tags[:2])}\n\n"
+        "**Reflection Checks**:\n✓ Character count — PASS\n✓ Hashtags — PASS\n\n"
+        "---\n\n"
+        f"**INSTAGRAM POST**\n\n{instagram_words}\n\n{' '.join(tags + ['#TravelGoals'])}\n\n"
+        f"[Image: Traveler overlooking {f['destinations'][0]} at golden hour, teal and sunset-orange tones]\n\n"
+        "**Reflection Checks**:\n✓ Word count — PASS\n✓ Emojis — PASS\n✓ Visual suggestion: Present — PASS\n"
+    )
+
+
+_OUTPUTS = {
+    "Creator": creator_output,
+    "Reviewer": reviewer_output,
+    "Publisher": publisher_output,
+}
+
+
+def synthesize(instructions: str, brief: str) -> str:
+    """The canned output of whichever agent *instructions* belong to."""
+    return _OUTPUTS[detect_agent(instructions)](brief)
+
+
+# ============================================================================
+# Client
+# ============================================================================
+
+class FakeChatClient(ChatMiddlewareLayer, FunctionInvocationLayer, BaseChatClient):
+    """Offline chat client that answers each workflow agent deterministically."""
+
+    OTEL_PROVIDER_NAME = "zava-fake"
+
+    def __init__(self, latency_ms: float = 0.0, ttft_ms: float = 0.0, model_id: str = "fake-model", **kwargs: Any):
+        super().__init__(**kwargs)
+        self.latency_ms = latency_ms
+        self.ttft_ms = ttft_ms
+        self.model_id = model_id
+        self.calls = 0
+
+    @staticmethod
+    def _brief(messages: Sequence[Message]) -> str:
+        # The brief, or whatever the context policy kept of it (the Publisher
+        # may only see the approved draft) — user turns first
+        texts = [m.text for m in messages if str(getattr(m, "role", "")) == "user" and m.text]
+        texts += [m.text for m in messages if str(getattr(m, "role", "")) != "user" and m.text]
+        return "\n".join(texts)
+
+    def _reply(self, messages: Sequence[Message], options: Mapping[str, Any]) -> tuple:
+        instructions = options.get("instructions") or ""
+        if not instructions:
+            system = [m.text for m in messages if str(getattr(m, "role", "")) == "system" and m.text]
+            instructions = system[0] if system else ""
+        text = synthesize(instructions, self._brief(messages))
+        prompt_chars = len(instructions) + sum(len(m.text or "") for m in messages)
+        usage = UsageDetails(
+            input_token_count=max(1, prompt_chars // 4),
+            output_token_count=_estimate_tokens(text),
+            total_token_count=max(1, prompt_chars // 4) + _estimate_tokens(text),
+        )
+        self.calls += 1
+        return text, usage
+
+    def _inner_get_response(self, *, messages: Sequence[Message], stream: bool = False,
+                            options: Mapping[str, Any], **kwargs: Any):
+        text, usage = self._reply(messages, options)
+        model_id = options.get("model_id") or self.model_id
+
+        if stream:
+            async def _stream():
+                await asyncio.sleep(self.ttft_ms / 1000)
+                words: List[str] = re.findall(r"\S+\s*", text)
+                step = max(1, len(words) // 20)
+                rest = max(0.0, self.latency_ms - self.ttft_ms) / 1000
+                for i in range(0, len(words), step):
+                    yield ChatResponseUpdate(
+                        role="assistant",
+                        contents=[Content.from_text("".join(words[i:i + step]))],
+                        model_id=model_id,
+                    )
+                    await asyncio.sleep(rest * step / max(1, len(words)))
+                yield ChatResponseUpdate(
+                    role="assistant",
+                    contents=[Content.from_usage(usage_details=usage)],
+                    model_id=model_id,
+                    finish_reason="stop",
+                )
+
+            return self._build_response_stream(_stream(), response_format=options.get("response_format"))
+
+        async def _get() -> ChatResponse:
+            await asyncio.sleep(self.latency_ms / 1000)
+            return ChatResponse(
+                messages=[Message(role="assistant", text=text)],
+                usage_details=usage,
+                model_id=model_id,
+                finish_reason="stop",
+            )
+
+        return _get()
@@ -0,0 +1,123 @@
+"""
+Request Hedging — duplicate slow agent turns to cut tail latency
+
+An occasional agent turn sits for minutes without a first token while the
+same request to another deployment would answer in seconds.  With hedging
+on, a streamed chat call that has produced no first chunk after the
+``HEDGE_PERCENTILE`` of that agent's historical time to first token
+(recorded by ``UsageCaptureMiddleware`` in ``monitoring/agent_middleware.py``)
+is sent again — to the next-best deployment-pool member when there is one.
+Whichever request streams first wins; the other is cancelled.
+
+Extra load is capped with a budget: every primary call earns
+``HEDGE_MAX_EXTRA_LOAD`` of a hedge (0.1 → at most ~10 % extra requests),
+a hedge spends one, and unspent budget is capped at ``HEDGE_BURST``.
+
+Configuration (env vars):
+    HEDGE_ENABLED          "1" to hedge (default off)
+    HEDGE_PERCENTILE       TTFT percentile that triggers a hedge (default 95)
+    HEDGE_MIN_SAMPLES      TTFT samples needed before hedging an agent (default 20)
+    HEDGE_MIN_DELAY_MS     Never hedge sooner than this (default 500)
+    HEDGE_MAX_EXTRA_LOAD   Max hedges per primary call (default 0.1)
+    HEDGE_BURST            Max hedges banked for a burst (default 5)
+
+Usage:
+    policy = get_hedge_policy()
+    delay = policy.delay_for("Creator")          # seconds, or None = don't hedge
+    if policy.try_fire(): ...start the duplicate...
+    print(policy.snapshot())                     # fired / won / skipped
+"""
+
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from monitoring.agent_middleware import get_ttft_history
+
+
+class HedgePolicy:
+    """When to hedge, and the budget that caps hedging's extra load."""
+
+    def __init__(self, enabled: Optional[bool] = None, percentile: Optional[float] = None,
+                 min_samples: Optional[int] = None, min_delay_ms: Optional[float] = None,
+                 max_extra_load: Optional[float] = None, burst: Optional[float] = None):
+        env = os.getenv
+        self.enabled = enabled if enabled is not None else env("HEDGE_ENABLED", "0").lower() in ("1", "true", "yes", "on")
+        self.percentile = percentile if percentile is not None else float(env("HEDGE_PERCENTILE", "95"))
+        self.min_samples = min_samples if min_samples is not None else int(env("HEDGE_MIN_SAMPLES", "20"))
+        self.min_delay_ms = min_delay_ms if min_delay_ms is not None else float(env("HEDGE_MIN_DELAY_MS", "500"))
+        self.max_extra_load = max_extra_load if max_extra_load is not None else float(env("HEDGE_MAX_EXTRA_LOAD", "0.1"))
+        self.burst = burst if burst is not None else float(env("HEDGE_BURST", "5"))
+        self._budget = self.burst
+        self._lock = threading.Lock()
+        self.primary_calls = 0
+        self.fired = 0
+        self.won = 0
+        self.skipped_budget = 0
+        self.skipped_no_history = 0
+        self._register_metrics()
+
+    def _register_metrics(self) -> None:
+        try:
+            from opentelemetry import metrics
+            from opentelemetry.metrics import Observation
+        except ImportError:
+            return
+        meter = metrics.get_meter("zava.hedging")
+        meter.create_observable_counter("zava.hedge.fired", [lambda _o: [Observation(self.fired)]])
+        meter.create_observable_counter("zava.hedge.won", [lambda _o: [Observation(self.won)]])
+        meter.create_observable_counter("zava.hedge.skipped_budget", [lambda _o: [Observation(self.skipped_budget)]])
+
+    def delay_for(self, agent: str) -> Optional[float]:
+        """Seconds to wait for a first chunk before hedging *agent*'s call."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            self.primary_calls += 1
+            self._budget = min(self.burst, self._budget + self.max_extra_load)
+        ttft_ms = get_ttft_history().percentile(agent, self.percentile, self.min_samples)
+        if ttft_ms is None:
+            with self._lock:
+                self.skipped_no_history += 1
+            return None
+        return max(ttft_ms, self.min_delay_ms) / 1000
+
+    def try_fire(self) -> bool:
+        """Spend one hedge from the budget, if there is one."""
+        with self._lock:
+            if self._budget < 1:
+                self.skipped_budget += 1
+                return False
+            self._budget -= 1
+            self.fired += 1
+            return True
+
+    def record_win(self) -> None:
+        with self._lock:
+            self.won += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "percentile": self.percentile,
+                "primary_calls": self.primary_calls,
+                "fired": self.fired,
+                "won": self.won,
+                "skipped_budget": self.skipped_budget,
+                "skipped_no_history": self.skipped_no_history,
+                "extra_load_pct": round(100 * self.fired / self.primary_calls, 1) if self.primary_calls else 0.0,
+            }
+
+
+_policy: Optional[HedgePolicy] = None
+_policy_lock = threading.Lock()
+
+
+def get_hedge_policy() -> HedgePolicy:
+    """The process-wide hedge policy."""
+    global _policy
+    with _policy_lock:
+        if _policy is None:
+            _policy = HedgePolicy()
+        return _policy
@@ -0,0 +1,293 @@
+"""
+LLM Client Factory — live, record, replay or fake chat clients
+
+Every entry point gets its chat client from ``create_chat_client()``, and
+``ZAVA_LLM_MODE`` decides what stands behind it:
+
+  live    (default) Azure OpenAI
+  record  Azure OpenAI, and every request / streamed response is saved as
+          a cassette (JSON) in ``ZAVA_CASSETTE_DIR``
+  replay  no network — responses are played back from the cassettes with
+          their original chunk timing, scaled by ``ZAVA_REPLAY_SPEED``
+          (1 = original, 2 = twice as fast, 0 = instant)
+  fake    no network, no cassettes — ``FakeChatClient`` synthesizes
+          format-correct Creator / Reviewer / Publisher outputs
+
+Live and record clients call Azure through the deployment pool
+(``orchestration/deployment_pool.py``): each turn goes to the deployment
+with the most headroom and fails over on 429 / 5xx, and every deployment
+is an upstream (``orchestration/upstream.py``) with TPM/RPM pacing,
+jittered retries, a circuit breaker and a concurrency bulkhead.
+
+All clients expose the same interface as ``AzureOpenAIChatClient`` (chat
+middleware and function invocation layers included), so everything above
+the LLM layer — agents, GroupChat, context policy, telemetry, safety —
+runs unchanged and can be benchmarked deterministically offline.
+
+Cassettes are keyed by a hash of the request (instructions + messages),
+so a replayed workflow finds each agent's turn exactly.  When a prompt
+has changed and no exact cassette exists, replay falls back to the
+recordings for the same agent in order (``ZAVA_REPLAY_STRICT=1`` turns
+that into an error instead).
+
+Usage:
+    ZAVA_LLM_MODE=record python workflow_social_media.py     # capture once
+    ZAVA_LLM_MODE=replay python workflow_social_media.py     # replay offline
+    ZAVA_LLM_MODE=fake   python evaluation/agent_runner.py
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+from agent_framework import (
+    BaseChatClient,
+    ChatMiddlewareLayer,
+    ChatResponse,
+    ChatResponseUpdate,
+    Content,
+    FunctionInvocationLayer,
+    Message,
+)
+
+from orchestration.fake_chat_client import FakeChatClient, detect_agent
+from orchestration.deployment_pool import PooledChatClient, get_deployment_pool
+
+LLM_MODES = ("live", "record", "replay", "fake")
+OFFLINE_MODES = ("replay", "fake")
+
+DEFAULT_CASSETTE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cassettes"
+)
+
+
+def llm_mode() -> str:
+    """The configured ``ZAVA_LLM_MODE`` (``live`` when unset)."""
+    mode = os.getenv("ZAVA_LLM_MODE", "live").strip().lower() or "live"
+    if mode not in LLM_MODES:
+        raise ValueError(f"ZAVA_LLM_MODE must be one of {', '.join(LLM_MODES)} (got '{mode}')")
+    return mode
+
+
+def _instructions(messages: Sequence[Message], options: Mapping[str, Any]) -> str:
+    instructions = options.get("instructions") or ""
+    if not instructions:
+        system = [m.text for m in messages if str(getattr(m, "role", "")) == "system" and m.text]
+        instructions = system[0] if system else ""
+    return instructions
+
+
+def request_key(messages: Sequence[Message], options: Mapping[str, Any]) -> str:
+    """Stable hash of what the model is asked: instructions + role/text of each message."""
+    h = hashlib.sha256(_instructions(messages, options).encode("utf-8"))
+    for m in messages:
+        h.update(b"\x00" + str(getattr(m, "role", "")).encode("utf-8"))
+        h.update(b"\x01" + (m.text or "").encode("utf-8"))
+    return h.hexdigest()
+
+
+# ============================================================================
+# Cassette store
+# ============================================================================
+
+class CassetteStore:
+    """One JSON file per recorded request: ``<agent>-<key>.json``."""
+
+    def __init__(self, directory: str = DEFAULT_CASSETTE_DIR):
+        self.directory = directory
+        self._by_key: Optional[Dict[str, dict]] = None
+        self._by_agent: Dict[str, List[dict]] = defaultdict(list)
+        self._next: Dict[str, int] = defaultdict(int)
+
+    def save(self, cassette: dict) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{cassette['agent'].lower()}-{cassette['key'][:16]}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(cassette, f, indent=1, ensure_ascii=False)
+        return path
+
+    def _load(self) -> None:
+        self._by_key = {}
+        if not os.path.isdir(self.directory):
+            return
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(".json"):
+                continue
+            with open(os.path.join(self.directory, name), "r", encoding="utf-8") as f:
+                cassette = json.load(f)
+            self._by_key[cassette["key"]] = cassette
+        for cassette in sorted(self._by_key.values(), key=lambda c: c.get("recorded_at", "")):
+            self._by_agent[cassette["agent"]].append(cassette)
+
+    def __len__(self) -> int:
+        if self._by_key is None:
+            self._load()
+        return len(self._by_key)
+
+    def find(self, key: str, agent: str, strict: bool = False) -> dict:
+        """Exact match by request key, else (unless strict) the agent's next recording."""
+        if self._by_key is None:
+            self._load()
+        if key in self._by_key:
+            return self._by_key[key]
+        recordings = self._by_agent.get(agent)
+        if strict or not recordings:
+            raise LookupError(
+                f"No cassette for {agent} request {key[:16]} in {self.directory} "
+                "(record one with ZAVA_LLM_MODE=record)"
+            )
+        cassette = recordings[self._next[agent] % len(recordings)]
+        self._next[agent] += 1
+        return cassette
+
+
+def _new_cassette(key: str, messages: Sequence[Message], options: Mapping[str, Any], model_id: str) -> dict:
+    return {
+        "key": key,
+        "agent": detect_agent(_instructions(messages, options)),
+        "model_id": model_id,
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "request": [{"role": str(getattr(m, "role", "")), "text": m.text or ""} for m in messages],
+    }
+
+
+# ============================================================================
+# Record
+# ============================================================================
+
+class RecordingLayer:
+    """Mixin for a chat client: saves every request / response as a cassette.
+
+    Sits in front of the client's own ``_inner_get_response`` and passes
+    updates through unchanged, recording each with its offset from the
+    start of the request.
+    """
+
+    def __init__(self, *args: Any, cassettes: Optional[CassetteStore] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.cassettes = cassettes if cassettes is not None else CassetteStore()
+
+    def _inner_get_response(self, *, messages: Sequence[Message], options: Mapping[str, Any],
+                            stream: bool = False, **kwargs: Any):
+        inner = super()._inner_get_response(messages=messages, options=options, stream=stream, **kwargs)
+        cassette = _new_cassette(request_key(messages, options), messages, options,
+                                 getattr(self, "model_id", "") or "")
+
+        if stream:
+            async def _record():
+                start = time.perf_counter()
+                events = []
+                async for update in inner:
+                    events.append({"t": round(time.perf_counter() - start, 4), "update": update.to_dict()})
+                    yield update
+                cassette["stream"] = events
+                self.cassettes.save(cassette)
+
+            return self._build_response_stream(_record(), response_format=options.get("response_format"))
+
+        async def _get() -> ChatResponse:
+            start = time.perf_counter()
+            response = await inner
+            cassette["elapsed"] = round(time.perf_counter() - start, 4)
+            cassette["response"] = response.to_dict()
+            self.cassettes.save(cassette)
+            return response
+
+        return _get()
+
+
+class RecordingChatClient(RecordingLayer, PooledChatClient):
+    """Azure OpenAI (deployment pool) client that saves every response as a cassette."""
+
+
+# ============================================================================
+# Replay
+# ============================================================================
+
+class ReplayChatClient(ChatMiddlewareLayer, FunctionInvocationLayer, BaseChatClient):
+    """Plays recorded responses back, with their original (scaled) timing."""
+
+    OTEL_PROVIDER_NAME = "zava-replay"
+
+    def __init__(self, cassettes: Optional[CassetteStore] = None, speed: float = 1.0,
+                 strict: bool = False, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.cassettes = cassettes if cassettes is not None else CassetteStore()
+        self.speed = speed
+        self.strict = strict
+        self.calls = 0
+
+    def _delay(self, seconds: float) -> float:
+        return seconds / self.speed if self.speed > 0 else 0.0
+
+    def _inner_get_response(self, *, messages: Sequence[Message], stream: bool = False,
+                            options: Mapping[str, Any], **kwargs: Any):
+        key = request_key(messages, options)
+        cassette = self.cassettes.find(key, detect_agent(_instructions(messages, options)), self.strict)
+        self.calls += 1
+
+        if stream:
+            async def _stream():
+                events = cassette.get("stream")
+                if events is None:  # recorded without streaming: replay as one update
+                    response = ChatResponse.from_dict(cassette["response"])
+                    await asyncio.sleep(self._delay(cassette.get("elapsed", 0.0)))
+                    contents = [c for m in response.messages for c in m.contents]
+                    if response.usage_details:
+                        contents.append(Content.from_usage(usage_details=response.usage_details))
+                    yield ChatResponseUpdate(role="assistant", contents=contents, model_id=response.model_id,
+                                             finish_reason=response.finish_reason)
+                    return
+                previous = 0.0
+                for event in events:
+                    await asyncio.sleep(self._delay(event["t"] - previous))
+                    previous = event["t"]
+                    yield ChatResponseUpdate.from_dict(event["update"])
+
+            return self._build_response_stream(_stream(), response_format=options.get("response_format"))
+
+        async def _get() -> ChatResponse:
+            if "response" in cassette:
+                await asyncio.sleep(self._delay(cassette.get("elapsed", 0.0)))
+                return ChatResponse.from_dict(cassette["response"])
+            events = cassette.get("stream", [])
+            await asyncio.sleep(self._delay(events[-1]["t"] if events else 0.0))
+            return ChatResponse.from_updates([ChatResponseUpdate.from_dict(e["update"]) for e in events])
+
+        return _get()
+
+
+# ============================================================================
+# Factory
+# ============================================================================
+
+def create_chat_client(credential=None, mode: Optional[str] = None):
+    """Chat client for the configured ``ZAVA_LLM_MODE`` (or an explicit *mode*)."""
+    mode = mode or llm_mode()
+    if mode == "fake":
+        client = FakeChatClient(
+            latency_ms=float(os.getenv("ZAVA_FAKE_LATENCY_MS", "0")),
+            ttft_ms=float(os.getenv("ZAVA_FAKE_TTFT_MS", "0")),
+        )
+        print("🧪 LLM mode: fake (offline, synthesized outputs)")
+        return client
+
+    cassette_dir = os.getenv("ZAVA_CASSETTE_DIR", DEFAULT_CASSETTE_DIR)
+    if mode == "replay":
+        store = CassetteStore(cassette_dir)
+        speed = float(os.getenv("ZAVA_REPLAY_SPEED", "1"))
+        strict = os.getenv("ZAVA_REPLAY_STRICT", "0").lower() in ("1", "true", "yes")
+        print(f"📼 LLM mode: replay ({len(store)} cassettes from {cassette_dir}, speed {speed:g}x)")
+        return ReplayChatClient(cassettes=store, speed=speed, strict=strict)
+
+    pool = get_deployment_pool()
+    if len(pool.members) > 1:
+        print(f"🔀 Deployment pool: {', '.join(m.name for m in pool.members)}")
+    if mode == "record":
+        print(f"⏺️  LLM mode: record (cassettes → {cassette_dir})")
+        return RecordingChatClient(cassettes=CassetteStore(cassette_dir), pool=pool, credential=credential)
+    return PooledChatClient(pool, credential=credential)
@@ -0,0 +1,480 @@
+"""
+Model Router — per-agent model tiers, downshifting and escalation
+
+Creator, Reviewer and Publisher do not need the same model: the Reviewer's
+~120-word ReAct verdict and the Publisher's formatting run fine on a small
+deployment.  ``config/model_routing.json`` declares
+
+  - tiers, cheapest first, each with a ``model`` (matched against the
+    deployment pool's member models; ``null`` = the default chat
+    deployment) and a ``relative_cost`` per token
+  - profiles — which tier each agent uses (``quality``, ``balanced``,
+    ``economy``, ...)
+  - which agents may be *downshifted* one tier for a low-complexity turn
+    (small prompt, no revision requested yet)
+
+Every turn of a routed agent goes through ``ModelRoutingMiddleware``:
+
+  1. pick the tier (profile → downshift → nearest tier that is actually
+     deployed) and set ``options["model_id"]`` for the deployment pool
+  2. run the turn; if it ran below the top tier, check the output with the
+     agent's local validator (Creator: a ``**DRAFT**``; Reviewer: a
+     ``**VERDICT**``; Publisher: all three posts, within the Twitter limit,
+     with the brand hashtag)
+  3. on failure, re-run the turn one tier up (``escalate``) until it
+     passes or the top tier answered
+
+Streamed turns below the top tier are buffered so a failed answer never
+reaches the workflow — except the Publisher's, which are released post by
+post (``PostStreamParser``): each post leaves as soon as it has passed its
+own checks (Twitter limit; brand hashtag seen so far), the rest of the
+Publisher validator runs at the end of the turn, and an escalation after
+posts have left asks the next tier to continue from them.  Per-agent model, escalations, tokens served by
+cheaper tiers, cost units and latency saved (against the top tier's
+running average for that agent) go to ``AgentTelemetryMiddleware`` and
+the process-wide ``get_model_router().summary()``.
+
+Configuration (env vars):
+    MODEL_ROUTING          "on" (default) or "off"
+    MODEL_ROUTING_CONFIG   Config path (default config/model_routing.json)
+    MODEL_PROFILE          Profile name (default: the config's default_profile)
+    MODEL_<AGENT>          Tier override for one agent, e.g. MODEL_REVIEWER=large
+    MODEL_TIER_<TIER>      Model override for one tier, e.g. MODEL_TIER_SMALL=gpt-4.1-mini
+
+Usage:
+    publisher = Agent(client=..., name="Publisher", middleware=[
+        *build_model_routing_middleware("Publisher", telemetry),
+        *build_context_middleware("Publisher", telemetry),
+    ])
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from agent_framework import ChatContext, ChatMiddleware, Message
+
+from grounding.brand_rules import load_brand_rules
+from orchestration.context_policy import estimate_tokens, extract_draft
+from orchestration.post_stream import PlatformPost, PostStreamParser
+from orchestration.upstream import usage_tokens
+
+DEFAULT_CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "model_routing.json"
+)
+
+_VERDICT = re.compile(r"\*\*VERDICT\*\*:?\s*(REVISE|APPROVED)", re.IGNORECASE)
+_REVISE = re.compile(r"\*\*VERDICT\*\*:?\s*REVISE", re.IGNORECASE)
+_POST_HEADERS = (r"\*\*LINKEDIN POST\*\*", r"\*\*X/?TWITTER POST\*\*", r"\*\*INSTAGRAM POST\*\*")
+
+# Hooks the inner middleware (usage capture) registers per call; bound to
+# each attempt's stream, as in safety/stream_guard.py, so an escalated
+# retry does not run them twice on the final stream
+_STREAM_HOOKS = (
+    ("stream_transform_hooks", "with_transform_hook"),
+    ("stream_result_hooks", "with_result_hook"),
+    ("stream_cleanup_hooks", "with_cleanup_hook"),
+)
+
+# Weight of the newest observation in the per-(agent, model) latency average
+_LATENCY_EWMA = 0.3
+
+
+# ============================================================================
+# Local validators
+# ============================================================================
+
+def validate_creator(text: str, rules=None) -> List[str]:
+    if "**DRAFT**" not in text or not extract_draft(text):
+        return ["no **DRAFT** section"]
+    return []
+
+
+def validate_reviewer(text: str, rules=None) -> List[str]:
+    return [] if _VERDICT.search(text) else ["no **VERDICT**: REVISE / APPROVED"]
+
+
+def validate_publisher(text: str, rules=None) -> List[str]:
+    missing = [h.replace("\\", "").replace("/?", "/") for h in _POST_HEADERS
+               if not re.search(h, text, re.IGNORECASE)]
+    if missing:
+        return [f"missing {', '.join(missing)}"]
+    from utils.batch_compliance import audit_responses
+
+    row = audit_responses([text], rules, workers=1).row(0, ("twitter_char_limit", "contains_brand_hashtag", "issues"))
+    if row["twitter_char_limit"] and row["contains_brand_hashtag"]:
+        return []
+    return [i for i in row["issues"] if "Twitter" in i or "hashtag" in i]
+
+
+def validate_publisher_post(post: PlatformPost, rules=None) -> List[str]:
+    """The per-post part of ``validate_publisher``: one finished post's Twitter limit."""
+    if post.platform != "twitter":
+        return []
+    from utils.batch_compliance import audit_responses
+
+    row = audit_responses([f"**X/TWITTER POST**\n{post.text}"], rules, workers=1).row(0, ("twitter_char_limit", "issues"))
+    return [] if row["twitter_char_limit"] else [i for i in row["issues"] if "Twitter" in i]
+
+
+VALIDATORS: Dict[str, Callable[[str, Any], List[str]]] = {
+    "Creator": validate_creator,
+    "Reviewer": validate_reviewer,
+    "Publisher": validate_publisher,
+}
+
+
+# ============================================================================
+# Config
+# ============================================================================
+
+@dataclass(frozen=True)
+class ModelTier:
+    name: str
+    model: Optional[str]
+    relative_cost: float = 1.0
+    rank: int = 0
+
+    @property
+    def label(self) -> str:
+        return self.model or "default"
+
+
+@dataclass(frozen=True)
+class RouteDecision:
+    agent: str
+    tier: ModelTier
+    profile_tier: ModelTier
+    reason: str
+
+
+@dataclass
+class AgentRouting:
+    """Running per-agent routing totals."""
+
+    calls: int = 0
+    by_model: Dict[str, int] = field(default_factory=dict)
+    downshifted: int = 0
+    escalations: int = 0
+    tokens_on_cheaper_tiers: int = 0
+    cost_units_saved: float = 0.0
+    latency_saved_ms: float = 0.0
+
+
+class ModelRouter:
+    """Chooses a model tier per agent turn and keeps routing statistics."""
+
+    def __init__(self, config: dict, profile: Optional[str] = None,
+                 is_deployed: Optional[Callable[[Optional[str]], bool]] = None):
+        self.tiers = [
+            ModelTier(t["name"], os.getenv(f"MODEL_TIER_{t['name'].upper()}") or t.get("model"),
+                      float(t.get("relative_cost", 1.0)), rank)
+            for rank, t in enumerate(config["tiers"])
+        ]
+        self._by_name = {t.name: t for t in self.tiers}
+        self.profile = profile or os.getenv("MODEL_PROFILE") or config.get("default_profile", "balanced")
+        if self.profile not in config["profiles"]:
+            raise ValueError(f"Unknown MODEL_PROFILE '{self.profile}' (have {', '.join(config['profiles'])})")
+        self.assignments = dict(config["profiles"][self.profile])
+        downshift = config.get("downshift", {})
+        self.downshift_agents = set(downshift.get("agents", ()))
+        self.downshift_max_tokens = int(downshift.get("max_prompt_tokens", 1500))
+        self.escalate = bool(config.get("escalate_on_validation_failure", True))
+        self.is_deployed = is_deployed or (lambda model: True)
+        self._latency: Dict[tuple, float] = {}
+        self._stats: Dict[str, AgentRouting] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def top(self) -> ModelTier:
+        return self.tiers[-1]
+
+    def tier_for(self, agent: str) -> ModelTier:
+        name = os.getenv(f"MODEL_{agent.upper()}") or self.assignments.get(agent) or self.top.name
+        if name not in self._by_name:
+            raise ValueError(f"Unknown model tier '{name}' for {agent} (have {', '.join(self._by_name)})")
+        return self._by_name[name]
+
+    def _deployed(self, tier: ModelTier) -> ModelTier:
+        """*tier*, or the next tier up that is actually deployed."""
+        for candidate in self.tiers[tier.rank:]:
+            if candidate.model is None or self.is_deployed(candidate.model):
+                return candidate
+        return self.top
+
+    def decide(self, agent: str, messages, instructions: str = "") -> RouteDecision:
+        profile_tier = self.tier_for(agent)
+        tier, reason = profile_tier, f"profile {self.profile}"
+        if agent in self.downshift_agents and tier.rank > 0:
+            prompt_tokens = estimate_tokens(instructions) + sum(estimate_tokens(getattr(m, "text", "")) for m in messages)
+            revising = any(_REVISE.search(getattr(m, "text", "") or "") for m in messages)
+            if prompt_tokens <= self.downshift_max_tokens and not revising:
+                tier, reason = self.tiers[tier.rank - 1], f"low complexity (~{prompt_tokens} prompt tokens)"
+        deployed = self._deployed(tier)
+        if deployed is not tier:
+            reason += f"; {tier.label} not deployed"
+        return RouteDecision(agent, deployed, profile_tier, reason)
+
+    def next_tier(self, tier: ModelTier) -> Optional[ModelTier]:
+        if not self.escalate or tier.rank >= self.top.rank:
+            return None
+        return self._deployed(self.tiers[tier.rank + 1])
+
+    def validate(self, agent: str, text: str, rules=None) -> List[str]:
+        validator = VALIDATORS.get(agent)
+        return validator(text, rules) if validator else []
+
+    def record(self, agent: str, tier: ModelTier, tokens: int, latency_ms: float,
+               downshifted: bool = False, escalated: bool = False, rejected: bool = False) -> dict:
+        """Account one model call; returns the per-call routing record.
+
+        A *rejected* call (failed validation, re-run one tier up) saved
+        nothing: its whole cost and latency count against the savings.
+        """
+        key = (agent, tier.label)
+        with self._lock:
+            top_latency = self._latency.get((agent, self.top.label))
+            previous = self._latency.get(key)
+            self._latency[key] = latency_ms if previous is None else (
+                _LATENCY_EWMA * latency_ms + (1 - _LATENCY_EWMA) * previous
+            )
+            stats = self._stats.setdefault(agent, AgentRouting())
+            stats.calls += 1
+            stats.by_model[tier.label] = stats.by_model.get(tier.label, 0) + 1
+            stats.downshifted += int(downshifted)
+            stats.escalations += int(escalated)
+            if rejected:
+                saved_cost, saved_ms = -tokens * tier.relative_cost, -latency_ms
+            else:
+                saved_cost = tokens * (self.top.relative_cost - tier.relative_cost)
+                saved_ms = (top_latency - latency_ms) if top_latency is not None and tier is not self.top else 0.0
+                if tier is not self.top:
+                    stats.tokens_on_cheaper_tiers += tokens
+            stats.cost_units_saved += saved_cost
+            stats.latency_saved_ms += saved_ms
+        return {
+            "model": tier.label, "tier": tier.name, "tokens": tokens, "latency_ms": round(latency_ms, 1),
+            "downshifted": downshifted, "escalated": escalated, "rejected": rejected,
+            "cost_units_saved": round(saved_cost, 1), "latency_saved_ms": round(saved_ms, 1),
+        }
+
+    def summary(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                agent: {**vars(s), "by_model": dict(s.by_model), "cost_units_saved": round(s.cost_units_saved, 1),
+                        "latency_saved_ms": round(s.latency_saved_ms, 1)}
+                for agent, s in self._stats.items()
+            }
+
+
+def load_routing_config(path: Optional[str] = None) -> dict:
+    with open(path or os.getenv("MODEL_ROUTING_CONFIG", DEFAULT_CONFIG_PATH), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _is_deployed(model: Optional[str]) -> bool:
+    # Offline modes answer for any model; live / record need a pool member serving it
+    from orchestration.llm_client import OFFLINE_MODES, llm_mode
+
+    if llm_mode() in OFFLINE_MODES:
+        return True
+    from orchestration.deployment_pool import get_deployment_pool
+
+    return get_deployment_pool().serves(model)
+
+
+_router: Optional[ModelRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_model_router() -> ModelRouter:
+    """The process-wide model router."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = ModelRouter(load_routing_config(), is_deployed=_is_deployed)
+        return _router
+
+
+# ============================================================================
+# Middleware
+# ============================================================================
+
+def _with_model(options, tier: ModelTier) -> dict:
+    options = dict(options or {})
+    if tier.model:
+        options["model_id"] = tier.model
+    else:
+        options.pop("model_id", None)
+    return options
+
+
+def _response_tokens(updates_or_response) -> int:
+    usage = getattr(updates_or_response, "usage_details", None)
+    if usage is None and isinstance(updates_or_response, list):
+        for update in updates_or_response:
+            for content in update.contents or ():
+                if getattr(content, "type", None) == "usage":
+                    usage = content.usage_details
+    return usage_tokens(usage) or 0
+
+
+def _continuation(released: str, problems: List[str]) -> Optional[List[Message]]:
+    """Messages asking the next tier to carry on after text already released."""
+    if not released:
+        return None
+    return [
+        Message(role="assistant", text=released),
+        Message(role="user", text=(
+            f"Your response was stopped after the text above: {'; '.join(problems)}. "
+            "Continue it from exactly where that text ends, without repeating any of it."
+        )),
+    ]
+
+
+class ModelRoutingMiddleware(ChatMiddleware):
+    """
+    Chat middleware that routes one agent's calls to a model tier and
+    escalates when the agent's local validator rejects the answer.
+
+    Put it first in the agent's middleware list so an escalated retry runs
+    the rest of the chain (context policy, usage capture) again.
+    """
+
+    def __init__(self, agent_name: str, router: Optional[ModelRouter] = None, telemetry=None, rules=None):
+        self.agent_name = agent_name
+        self.router = router if router is not None else get_model_router()
+        self.telemetry = telemetry
+        self.rules = rules
+
+    def _record(self, decision: RouteDecision, tier: ModelTier, tokens: int, started: float,
+                escalated: bool, rejected: bool = False) -> None:
+        record = self.router.record(
+            self.agent_name, tier, tokens, (time.perf_counter() - started) * 1000,
+            downshifted=tier.rank < decision.profile_tier.rank, escalated=escalated, rejected=rejected,
+        )
+        if self.telemetry is not None:
+            self.telemetry.on_model_routed(self.agent_name, record)
+
+    def _escalate(self, tier: ModelTier, problems: List[str]) -> Optional[ModelTier]:
+        upper = self.router.next_tier(tier)
+        if upper is not None:
+            print(f"   ⬆️  Model router [{self.agent_name}]: {tier.label} failed validation "
+                  f"({'; '.join(problems)}) → {upper.label}")
+        return upper
+
+    async def process(self, context: ChatContext, call_next) -> None:
+        instructions = (context.options or {}).get("instructions") or ""
+        decision = self.router.decide(self.agent_name, context.messages, instructions)
+        messages, options = list(context.messages), context.options
+        tier = decision.tier
+        if tier is not self.router.top:
+            print(f"   🎚️  Model router [{self.agent_name}]: {tier.label} ({decision.reason})")
+
+        async def attempt(t: ModelTier, follow: Optional[List[Message]] = None) -> None:
+            context.messages, context.options = list(messages) + (follow or []), _with_model(options, t)
+            marks = {attr: len(getattr(context, attr)) for attr, _ in _STREAM_HOOKS}
+            await call_next()
+            if context.stream:
+                for attr, method in _STREAM_HOOKS:
+                    hooks = getattr(context, attr)
+                    for hook in hooks[marks[attr]:]:
+                        getattr(context.result, method)(hook)
+                    del hooks[marks[attr]:]
+
+        started = time.perf_counter()
+        await attempt(tier)
+
+        if not context.stream:
+            escalated = False
+            while True:
+                response = context.result
+                upper = None
+                if self.router.next_tier(tier) is not None:
+                    problems = self.router.validate(self.agent_name, response.text or "", self.rules)
+                    upper = self._escalate(tier, problems) if problems else None
+                self._record(decision, tier, _response_tokens(response), started, escalated, upper is not None)
+                if upper is None:
+                    return
+                tier, escalated, started = upper, True, time.perf_counter()
+                await attempt(tier)
+
+        first = context.result
+        if self.router.next_tier(tier) is None:
+            def _on_update(update):
+                tokens = _response_tokens([update])
+                if tokens:
+                    self._record(decision, tier, tokens, started, False)
+                return update
+
+            context.stream_transform_hooks.append(_on_update)
+            return
+
+        async def _validated():
+            nonlocal tier, started
+            stream, escalated, released = first, False, ""
+            while True:
+                if self.router.next_tier(tier) is None:
+                    updates = []
+                    async for update in stream:
+                        updates.append(update)
+                        yield update
+                    self._record(decision, tier, _response_tokens(updates), started, escalated)
+                    return
+                if self.agent_name == "Publisher":
+                    # Release each post as soon as it passes its own checks
+                    rules = self.rules or load_brand_rules()
+                    parser = PostStreamParser()
+                    parser.feed(released)  # posts already out are not checked again
+                    text, updates, held, problems = released, [], [], []
+                    async for update in stream:
+                        updates.append(update)
+                        if problems:
+                            continue  # drained for the usage record only
+                        text += update.text or ""
+                        held.append(update)
+                        done = parser.feed(update.text or "")
+                        for post in done:
+                            problems += validate_publisher_post(post, rules)
+                        if done and not problems and rules.has_brand_hashtag(text):
+                            for update in held:
+                                released += update.text or ""
+                                yield update
+                            held = []
+                    if not problems:
+                        for post in parser.close():
+                            problems += validate_publisher_post(post, rules)
+                        problems = problems or self.router.validate(self.agent_name, text, rules)
+                else:
+                    updates = held = [update async for update in stream]
+                    text = "".join(update.text or "" for update in updates)
+                    problems = self.router.validate(self.agent_name, text, self.rules)
+                upper = self._escalate(tier, problems) if problems else None
+                self._record(decision, tier, _response_tokens(updates), started, escalated, upper is not None)
+                if upper is None:
+                    for update in held:
+                        yield update
+                    return
+                tier, escalated, started = upper, True, time.perf_counter()
+                await attempt(tier, _continuation(released, problems))
+                stream = context.result
+
+        context.result = context.client._build_response_stream(
+            _validated(), response_format=(options or {}).get("response_format"),
+        )
+
+
+def build_model_routing_middleware(agent_name: str, telemetry=None, rules=None) -> list:
+    """
+    Return the model-routing middleware list for *agent_name*.
+
+    Returns an empty list when ``MODEL_ROUTING=off`` so callers can splat
+    the result into ``Agent(middleware=[...])``.
+    """
+    if os.getenv("MODEL_ROUTING", "on").lower().strip() in ("off", "0", "false", "no"):
+        return []
+    return [ModelRoutingMiddleware(agent_name, telemetry=telemetry, rules=rules)]
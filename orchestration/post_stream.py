@@ -0,0 +1,175 @@
+"""
+Post Stream Parser — platform posts out of the Publisher's text as it streams
+
+The Publisher writes its posts one after another:
+
+    **LINKEDIN POST**          ← header starts a post
+    …post text…
+    **Reflection Checks**:     ← reflection (or a --- rule) ends it
+    ---
+    **X/TWITTER POST**
+    …
+    **Character count**: …     ← also ends the X/Twitter post
+
+``PostStreamParser`` is fed the text deltas and returns each post the
+moment its closing marker arrives, so callers can stream it to the client,
+screen it and start its image while the Publisher is still writing.  Only
+complete lines are examined, each once: the work per delta is linear in
+the delta, never a re-scan of the text so far.  Buffering is bounded —
+the partial line and the open post are capped at ``POST_STREAM_MAX_CHARS``
+(text beyond the cap is dropped and the post marked truncated), and text
+outside posts (preamble, reflections) is not kept at all.
+
+The Instagram ``[Image: …]`` visual suggestion is split off the post into
+``PlatformPost.visual``.  Only the first post per platform is returned,
+like ``parse_platform_posts`` in ``api_server.py`` (which uses this parser).
+
+Configuration (env vars):
+    POST_STREAM_MAX_CHARS   Cap on the open post and the partial line (default 16000)
+
+Usage:
+    parser = PostStreamParser()
+    for delta in publisher_deltas:
+        for post in parser.feed(delta):
+            print(post.platform, post.text)
+    for post in parser.close():          # a post the stream ended inside
+        ...
+"""
+
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+HEADERS = (
+    ("linkedin", re.compile(r"\*\*LINKEDIN POST\*\*\s*")),
+    ("twitter", re.compile(r"\*\*X/?TWITTER POST\*\*\s*")),
+    ("instagram", re.compile(r"\*\*INSTAGRAM POST\*\*\s*")),
+)
+_REFLECTION = re.compile(r"\s*\*\*Reflection")
+_CHARACTER_COUNT = re.compile(r"\s*\*\*Character count")
+_RULE = re.compile(r"-{3,}\s*$")
+_IMAGE = "[Image:"
+
+# Kept from an over-long partial line outside a post, so a header split
+# across the cut is still recognised
+_HEADER_TAIL = 64
+
+
+@dataclass
+class PlatformPost:
+    """One finished platform post."""
+    platform: str            # "linkedin" | "twitter" | "instagram"
+    text: str
+    visual: str = ""         # Instagram [Image: …] suggestion, if any
+    truncated: bool = False  # body exceeded POST_STREAM_MAX_CHARS
+
+
+class PostStreamParser:
+    """Incremental parser for the Publisher's platform posts."""
+
+    def __init__(self, max_chars: Optional[int] = None):
+        self.max_chars = max_chars if max_chars is not None else int(os.getenv("POST_STREAM_MAX_CHARS", "16000"))
+        self.posts: Dict[str, PlatformPost] = {}
+        self._partial = ""
+        self._platform: Optional[str] = None
+        self._lines: List[str] = []
+        self._size = 0
+        self._truncated = False
+        self._visual: List[str] = []
+        self._in_visual = False
+        self._continuing = False  # part of the partial line is already in the post
+
+    # ---- feeding --------------------------------------------------------------
+
+    def feed(self, delta: str) -> List[PlatformPost]:
+        """Add a text delta; the posts it completed."""
+        done: List[PlatformPost] = []
+        if not delta:
+            return done
+        newline = delta.rfind("\n")
+        if newline < 0:
+            self._partial += delta
+            self._bound_partial()
+            return done
+        lines = (self._partial + delta[:newline]).split("\n")
+        self._partial = delta[newline + 1:]
+        for line in lines:
+            self._line(line, done)
+        self._bound_partial()
+        return done
+
+    def close(self) -> List[PlatformPost]:
+        """End of stream: the post still open, if any."""
+        done: List[PlatformPost] = []
+        if self._partial:
+            self._line(self._partial, done)
+            self._partial = ""
+        self._finish(done)
+        return done
+
+    # ---- internals ------------------------------------------------------------
+
+    def _bound_partial(self) -> None:
+        if len(self._partial) <= self.max_chars:
+            return
+        if self._platform is None:
+            self._partial = self._partial[-_HEADER_TAIL:]
+        else:
+            self._append(self._partial[:-_HEADER_TAIL], newline=not self._continuing)
+            self._partial = self._partial[-_HEADER_TAIL:]
+            self._continuing = True
+
+    def _line(self, line: str, done: List[PlatformPost]) -> None:
+        if self._continuing:
+            self._continuing = False
+            self._append(line, newline=False)
+            return
+        for platform, header in HEADERS:
+            match = header.search(line)
+            if match:
+                self._finish(done)
+                self._platform = platform
+                rest = line[match.end():]
+                if rest.strip():
+                    self._append(rest)
+                return
+        if self._platform is None:
+            return
+        if _RULE.match(line) or _REFLECTION.match(line) or (
+            self._platform == "twitter" and _CHARACTER_COUNT.match(line)
+        ):
+            self._finish(done)
+            return
+        if self._platform == "instagram" and (self._in_visual or line.lstrip().startswith(_IMAGE)):
+            self._visual.append(line.strip())
+            self._in_visual = "]" not in line
+            return
+        self._append(line)
+
+    def _append(self, text: str, newline: bool = True) -> None:
+        if self._truncated:
+            return
+        room = self.max_chars - self._size
+        if len(text) > room:
+            text, self._truncated = text[:max(0, room)], True
+        if newline or not self._lines:
+            self._lines.append(text)
+        else:
+            self._lines[-1] += text
+        self._size += len(text) + 1
+
+    def _finish(self, done: List[PlatformPost]) -> None:
+        platform = self._platform
+        text = "\n".join(self._lines).strip()
+        visual = " ".join(self._visual)
+        truncated = self._truncated
+        self._platform, self._lines, self._size, self._truncated = None, [], 0, False
+        self._visual, self._in_visual = [], False
+        if platform is None or not text or platform in self.posts:
+            return
+        if visual.startswith(_IMAGE):
+            visual = visual[len(_IMAGE):].split("]", 1)[0].strip()
+        post = PlatformPost(platform, text, visual, truncated)
+        self.posts[platform] = post
+        done.append(post)
@@ -0,0 +1,293 @@
+"""
+Review Cache — reuse the Reviewer's verdict for a byte-identical draft
+
+Retries, coalesced runs and batch jobs often send the same Creator draft
+to the Reviewer again.  ``ReviewCacheMiddleware`` keys each Reviewer call
+on
+
+    sha256(latest **DRAFT**, Reviewer prompt version, model)
+
+— the prompt version is the SHA-256 of the Reviewer's instructions, the
+same hash the prompt registry versions prompts with, so editing the prompt
+or switching brands never serves a stale verdict — and answers a repeat
+from a SQLite store instead of calling the model.  Only responses that
+pass the Reviewer's validator (a ``**VERDICT**``) are stored, and entries
+expire after ``REVIEW_CACHE_TTL`` seconds.
+
+The store is one SQLite file (WAL mode), so every worker process on the
+host shares it; lookups and hits are counted in the store as well, which
+makes the reported hit rate cover all workers, not just this process.
+Lookups only read: the counters are kept in memory and written in one
+transaction every ``REVIEW_CACHE_FLUSH_EVERY`` lookups or
+``REVIEW_CACHE_FLUSH_SECONDS`` (and on ``stats()``, a store and exit), so
+workers do not queue on the write lock for every Reviewer call.
+Put the middleware after the model router (the model is part of the key)
+and before the context policy.  Disabled in ``record`` mode so cassettes
+capture real Reviewer calls.
+
+Configuration (env vars):
+    REVIEW_CACHE        "on" (default) or "off"
+    REVIEW_CACHE_PATH   SQLite file (default orchestration/.review_cache.sqlite)
+    REVIEW_CACHE_TTL    Seconds a verdict is reused (default 86400)
+    REVIEW_CACHE_FLUSH_EVERY    Lookups between counter writes (default 50)
+    REVIEW_CACHE_FLUSH_SECONDS  Max seconds counters stay unwritten (default 10)
+
+Usage:
+    reviewer = Agent(client=..., name="Reviewer", middleware=[
+        *build_model_routing_middleware("Reviewer", telemetry),
+        *build_review_cache_middleware("Reviewer", telemetry),
+        *build_context_middleware("Reviewer", telemetry),
+    ])
+    print(get_review_cache().stats())     # hits, misses, hit rate (process + store)
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from agent_framework import ChatContext, ChatMiddleware, ChatResponse, ChatResponseUpdate, Content, Message
+
+from orchestration.context_policy import extract_draft
+from orchestration.model_router import validate_reviewer
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".review_cache.sqlite")
+
+
+def cache_enabled() -> bool:
+    return os.getenv("REVIEW_CACHE", "on").lower().strip() not in ("off", "0", "false", "no")
+
+
+def review_key(draft: str, instructions: str, model: str) -> str:
+    """Cache key of one Reviewer call."""
+    prompt_version = hashlib.sha256((instructions or "").encode("utf-8")).hexdigest()
+    payload = json.dumps([draft, prompt_version, model or ""], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def latest_draft(messages) -> str:
+    """The most recent Creator **DRAFT** in a conversation ("" if none)."""
+    for msg in reversed(list(messages)):
+        text = getattr(msg, "text", "") or ""
+        if getattr(msg, "author_name", None) == "Creator" or "**DRAFT**" in text:
+            draft = extract_draft(text)
+            if draft:
+                return draft
+    return ""
+
+
+class ReviewCache:
+    """SQLite-backed Reviewer responses with a TTL, shared by worker processes."""
+
+    def __init__(self, path: Optional[str] = None, ttl_seconds: Optional[float] = None):
+        self.path = path or os.getenv("REVIEW_CACHE_PATH", DEFAULT_CACHE_PATH)
+        self.ttl = ttl_seconds if ttl_seconds is not None else float(os.getenv("REVIEW_CACHE_TTL", "86400"))
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.flush_every = max(1, int(os.getenv("REVIEW_CACHE_FLUSH_EVERY", "50")))
+        self.flush_seconds = float(os.getenv("REVIEW_CACHE_FLUSH_SECONDS", "10"))
+        self._pending: Dict[str, int] = {}        # counter name → unwritten increments
+        self._pending_hits: Dict[str, int] = {}   # review key → unwritten hits
+        self._pending_lookups = 0
+        self._flushed_at = time.monotonic()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS reviews ("
+            " key TEXT PRIMARY KEY, text TEXT, model TEXT, created_at REAL, hits INTEGER DEFAULT 0)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER)")
+        self._conn.commit()
+
+    def _flush(self) -> None:
+        """Write the pending counters in one transaction (caller holds the lock)."""
+        if self._pending:
+            self._conn.executemany(
+                "INSERT INTO counters (name, value) VALUES (?, ?)"
+                " ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+                list(self._pending.items()),
+            )
+        if self._pending_hits:
+            self._conn.executemany(
+                "UPDATE reviews SET hits = hits + ? WHERE key=?",
+                [(n, key) for key, n in self._pending_hits.items()],
+            )
+        self._conn.commit()
+        self._pending, self._pending_hits = {}, {}
+        self._pending_lookups = 0
+        self._flushed_at = time.monotonic()
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._closed:
+                self._flush()
+
+    def get(self, key: str) -> Optional[str]:
+        """The cached response for *key*, unless missing or expired (expired rows go on ``purge``)."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT text, created_at FROM reviews WHERE key=?", (key,)).fetchone()
+            if row and now - row[1] > self.ttl:
+                row = None
+            if row:
+                self.hits += 1
+                self._pending_hits[key] = self._pending_hits.get(key, 0) + 1
+            else:
+                self.misses += 1
+            name = "hits" if row else "misses"
+            self._pending[name] = self._pending.get(name, 0) + 1
+            self._pending_lookups += 1
+            if (self._pending_lookups >= self.flush_every
+                    or time.monotonic() - self._flushed_at >= self.flush_seconds):
+                self._flush()
+        return row[0] if row else None
+
+    def put(self, key: str, text: str, model: str = "") -> None:
+        with self._lock:
+            self.stores += 1
+            self._conn.execute(
+                "INSERT OR REPLACE INTO reviews (key, text, model, created_at) VALUES (?, ?, ?, ?)",
+                (key, text, model, time.time()),
+            )
+            self._pending_hits.pop(key, None)  # a replaced entry starts at 0 hits
+            self._flush()
+
+    def purge(self) -> int:
+        """Delete expired entries; returns how many."""
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM reviews WHERE created_at < ?", (time.time() - self.ttl,))
+            self._conn.commit()
+            return cur.rowcount
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            self._flush()
+            counters = dict(self._conn.execute("SELECT name, value FROM counters").fetchall())
+            entries = self._conn.execute(
+                "SELECT COUNT(*) FROM reviews WHERE created_at >= ?", (time.time() - self.ttl,),
+            ).fetchone()[0]
+        lookups = self.hits + self.misses
+        store_hits, store_misses = counters.get("hits", 0), counters.get("misses", 0)
+        return {
+            "ttl_seconds": self.ttl,
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "all_workers": {
+                "hits": store_hits,
+                "misses": store_misses,
+                "hit_rate": round(store_hits / (store_hits + store_misses), 3) if store_hits + store_misses else 0.0,
+            },
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush()
+            self._conn.close()
+            self._closed = True
+
+
+_cache: Optional[ReviewCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_review_cache() -> ReviewCache:
+    """The process-wide review cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ReviewCache()
+            atexit.register(_cache.flush)
+        return _cache
+
+
+class ReviewCacheMiddleware(ChatMiddleware):
+    """
+    Chat middleware that answers a Reviewer call from the cache when the
+    same draft was already reviewed with the same prompt and model.
+    """
+
+    def __init__(self, agent_name: str, cache: Optional[ReviewCache] = None, telemetry=None):
+        self.agent_name = agent_name
+        self.cache = cache if cache is not None else get_review_cache()
+        self.telemetry = telemetry
+
+    def _report(self, hit: bool) -> None:
+        if self.telemetry is not None:
+            self.telemetry.on_review_cache(self.agent_name, hit)
+
+    async def process(self, context: ChatContext, call_next) -> None:
+        options = context.options or {}
+        draft = latest_draft(context.messages)
+        if not draft:
+            await call_next()
+            return
+        model = options.get("model_id") or getattr(context.client, "model_id", None) or "default"
+        key = review_key(draft, options.get("instructions") or "", model)
+
+        cached = self.cache.get(key)
+        self._report(cached is not None)
+        if cached is not None:
+            print(f"   ♻️  Review cache [{self.agent_name}]: identical draft already reviewed — reusing verdict")
+            if not context.stream:
+                context.result = ChatResponse(
+                    messages=[Message(role="assistant", text=cached)], model_id=model, finish_reason="stop",
+                )
+                return
+
+            async def _cached():
+                yield ChatResponseUpdate(
+                    role="assistant", contents=[Content.from_text(cached)], model_id=model, finish_reason="stop",
+                )
+
+            context.result = context.client._build_response_stream(
+                _cached(), response_format=options.get("response_format"),
+            )
+            return
+
+        await call_next()
+
+        def _store(text: str) -> None:
+            if not validate_reviewer(text):
+                self.cache.put(key, text, model)
+
+        if not context.stream:
+            if context.result is not None:
+                _store(context.result.text or "")
+            return
+
+        inner = context.result
+
+        async def _recorded():
+            parts = []
+            async for update in inner:
+                parts.append(update.text or "")
+                yield update
+            _store("".join(parts))
+
+        context.result = context.client._build_response_stream(
+            _recorded(), response_format=options.get("response_format"),
+        )
+
+
+def build_review_cache_middleware(agent_name: str, telemetry=None) -> list:
+    """
+    Return the review-cache middleware list for *agent_name*.
+
+    Returns an empty list when ``REVIEW_CACHE=off`` or in ``record`` mode, so
+    callers can splat the result into ``Agent(middleware=[...])``.
+    """
+    from orchestration.llm_client import llm_mode
+
+    if not cache_enabled() or llm_mode() == "record":
+        return []
+    return [ReviewCacheMiddleware(agent_name, telemetry=telemetry)]
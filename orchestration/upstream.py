@@ -0,0 +1,580 @@
+"""
+Upstream Call Layer — pacing, retries, circuit breakers and bulkheads
+
+Every call to an external service goes through an ``Upstream``:
+
+  chat:<member>        Azure OpenAI chat completions, one per deployment-pool member
+  image:<deployment>   gpt-image generations
+  content_safety       Azure AI Content Safety ``analyze_text``
+
+Each upstream has
+
+  - token buckets for RPM and TPM — calls reserve their estimated tokens
+    and wait client-side instead of being throttled by the service; a 429
+    pauses the whole upstream for its ``Retry-After``
+  - jittered exponential backoff (full jitter, never shorter than
+    ``Retry-After``) for 429 / 408 / 5xx / connection errors
+  - a circuit breaker — after N consecutive failures calls fail fast with
+    ``UpstreamUnavailableError`` until a half-open trial call succeeds
+  - its own concurrency pool (bulkhead), so slow image generation cannot
+    use up the slots that text generation needs
+
+Throttle and breaker state is exported as OpenTelemetry metrics
+(``zava.upstream.*``) and as a snapshot dict (``GET /api/upstreams``).
+
+Limits come from env vars, most specific first:
+``UPSTREAM_<NAME>_<SETTING>`` (e.g. ``UPSTREAM_CHAT_GPT_4O_TPM``), then
+``UPSTREAM_<KIND>_<SETTING>`` (e.g. ``UPSTREAM_CHAT_TPM``), then the
+defaults below.  0 means unlimited.
+
+Usage:
+    upstream = get_upstreams().get("image:gpt-image-1.5")
+    result = await upstream.call(lambda: client.images.generate(...))
+    verdict = get_upstreams().get("content_safety").call_sync(lambda: cs.analyze_text(...))
+"""
+
+import asyncio
+import os
+import random
+import re
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+# kind → setting → default
+DEFAULTS = {
+    "chat": {"rpm": 0, "tpm": 0, "concurrency": 16},
+    "image": {"rpm": 0, "tpm": 0, "concurrency": 2},
+    "content_safety": {"rpm": 0, "tpm": 0, "concurrency": 4},
+}
+RETRY_DEFAULTS = {
+    "max_retries": 4,
+    "backoff_base": 0.5,       # seconds
+    "backoff_max": 30.0,       # seconds
+    "breaker_failures": 5,     # consecutive failures that open the breaker
+    "breaker_reset": 30.0,     # seconds open before a half-open trial
+}
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class UpstreamUnavailableError(RuntimeError):
+    """Raised without calling the service while its circuit breaker is open."""
+
+
+# ============================================================================
+# Error classification
+# ============================================================================
+
+def _chain(exc: BaseException):
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        yield exc
+        exc = getattr(exc, "inner_exception", None) or exc.__cause__ or exc.__context__
+
+
+def status_of(exc: BaseException) -> Optional[int]:
+    """HTTP status behind an SDK / framework exception, if any."""
+    for e in _chain(exc):
+        for attr in ("status_code", "status"):
+            value = getattr(e, attr, None)
+            if isinstance(value, int):
+                return value
+        response = getattr(e, "response", None)
+        value = getattr(response, "status_code", None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def retry_after_of(exc: BaseException) -> Optional[float]:
+    """Seconds from a ``Retry-After`` / ``retry-after-ms`` header, or the message."""
+    for e in _chain(exc):
+        headers = getattr(getattr(e, "response", None), "headers", None)
+        if headers:
+            if headers.get("retry-after-ms"):
+                try:
+                    return float(headers["retry-after-ms"]) / 1000
+                except ValueError:
+                    pass
+            if headers.get("retry-after"):
+                try:
+                    return float(headers["retry-after"])
+                except ValueError:
+                    pass
+        m = re.search(r"retry after (\d+(?:\.\d+)?) seconds?", str(e), re.IGNORECASE)
+        if m:
+            return float(m.group(1))
+    return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    status = status_of(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    names = {type(e).__name__ for e in _chain(exc)}
+    return bool(names & {
+        "APIConnectionError", "APITimeoutError", "ConnectError", "ReadTimeout", "ConnectTimeout",
+        "RemoteProtocolError", "ServiceRequestError", "ServiceResponseTimeoutError",
+        "TimeoutError", "ConnectionError", "ConnectionResetError",
+    })
+
+
+# ============================================================================
+# Building blocks
+# ============================================================================
+
+class TokenBucket:
+    """Per-minute rate limiter; reservations can go negative and are waited out."""
+
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self.rate = per_minute / 60.0
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.per_minute > 0
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.per_minute, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take *amount* now; return the seconds the caller must wait first."""
+        now = time.monotonic()
+        with self._lock:
+            wait = max(0.0, self.blocked_until - now)
+            if not self.enabled:
+                return wait
+            self._refill(now)
+            self.level -= amount
+            if self.level < 0:
+                wait = max(wait, -self.level / self.rate)
+            return wait
+
+    def wait_for(self, amount: float) -> float:
+        """Seconds a reservation of *amount* would wait now (without taking it)."""
+        now = time.monotonic()
+        with self._lock:
+            wait = max(0.0, self.blocked_until - now)
+            if self.enabled:
+                level = min(self.per_minute, self.level + (now - self.updated) * self.rate)
+                if level < amount:
+                    wait = max(wait, (amount - level) / self.rate)
+            return wait
+
+    def refund(self, amount: float) -> None:
+        """Give back (or, negative, charge more for) a reservation."""
+        if self.enabled:
+            with self._lock:
+                self.level = min(self.per_minute, self.level + amount)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class CircuitBreaker:
+    """closed → open after N consecutive failures → half-open trial → closed."""
+
+    def __init__(self, failures: int, reset_after: float):
+        self.threshold = failures
+        self.reset_after = reset_after
+        self.state = "closed"
+        self.consecutive = 0
+        self.opened_at = 0.0
+        self.opens = 0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        """Whether ``allow()`` would let a call through (without claiming the trial)."""
+        with self._lock:
+            if self.state == "open":
+                return time.monotonic() - self.opened_at >= self.reset_after
+            return self.state == "closed" or not self._trial
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_after:
+                self.state, self._trial = "half_open", False
+            if self.state == "closed":
+                return True
+            if self.state == "half_open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def abandon(self) -> None:
+        """A call let through was cancelled: free the half-open trial slot."""
+        with self._lock:
+            if self.state == "half_open":
+                self._trial = False
+
+    def throttled(self) -> None:
+        """A 429: pacing handles it, but it still fails a half-open trial."""
+        with self._lock:
+            trial = self.state == "half_open"
+        if trial:
+            self.failure()
+
+    def success(self) -> None:
+        with self._lock:
+            self.state, self.consecutive, self._trial = "closed", 0, False
+
+    def failure(self) -> None:
+        with self._lock:
+            self.consecutive += 1
+            if self.state == "half_open" or (self.threshold and self.consecutive >= self.threshold):
+                if self.state != "open":
+                    self.opens += 1
+                self.state, self.opened_at, self._trial = "open", time.monotonic(), False
+
+
+@dataclass
+class UpstreamStats:
+    calls: int = 0
+    successes: int = 0
+    failures: int = 0
+    retries: int = 0
+    throttled: int = 0              # 429s from the service
+    rejected_open: int = 0          # fast-failed by the open breaker
+    paced: int = 0                  # calls delayed by the token buckets
+    pacing_wait_seconds: float = 0.0
+    backoff_wait_seconds: float = 0.0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    tokens_reserved: int = 0
+    tokens_used: int = 0
+    last_error: str = ""
+
+
+# ============================================================================
+# Upstream
+# ============================================================================
+
+def _setting(name: str, kind: str, key: str, default: float) -> float:
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_").upper()
+    for var in (f"UPSTREAM_{slug}_{key.upper()}", f"UPSTREAM_{kind.upper()}_{key.upper()}", f"UPSTREAM_{key.upper()}"):
+        value = os.getenv(var)
+        if value not in (None, ""):
+            return float(value)
+    return default
+
+
+class Upstream:
+    """One external dependency: rate limits, retry policy, breaker and bulkhead."""
+
+    def __init__(self, name: str, kind: Optional[str] = None, rpm: Optional[float] = None,
+                 tpm: Optional[float] = None, concurrency: Optional[int] = None,
+                 rng: Optional[random.Random] = None):
+        self.name = name
+        self.kind = kind or name.split(":", 1)[0]
+        base = DEFAULTS.get(self.kind, DEFAULTS["chat"])
+        cfg = {k: _setting(name, self.kind, k, v) for k, v in {**base, **RETRY_DEFAULTS}.items()}
+        self.rpm = TokenBucket(rpm if rpm is not None else cfg["rpm"])
+        self.tpm = TokenBucket(tpm if tpm is not None else cfg["tpm"])
+        self.concurrency = int(concurrency if concurrency is not None else cfg["concurrency"]) or 1_000_000
+        self.max_retries = int(cfg["max_retries"])
+        self.backoff_base = cfg["backoff_base"]
+        self.backoff_max = cfg["backoff_max"]
+        self.breaker = CircuitBreaker(int(cfg["breaker_failures"]), cfg["breaker_reset"])
+        self.stats = UpstreamStats()
+        self._rng = rng or random.Random()
+        self._async_slots: Optional[asyncio.Semaphore] = None
+        self._sync_slots = threading.BoundedSemaphore(self.concurrency)
+        self._lock = threading.Lock()
+
+    # ---- bookkeeping ------------------------------------------------------
+
+    def _reserve(self, tokens: int) -> float:
+        wait = max(self.rpm.reserve(1), self.tpm.reserve(tokens) if tokens else 0.0)
+        with self._lock:
+            self.stats.calls += 1
+            self.stats.tokens_reserved += tokens
+            if wait > 0:
+                self.stats.paced += 1
+                self.stats.pacing_wait_seconds += wait
+        return wait
+
+    def settle(self, reserved: int, used: int) -> None:
+        """Correct the TPM bucket once the real token usage is known."""
+        self.tpm.refund(reserved - used)
+        with self._lock:
+            self.stats.tokens_used += used
+
+    def _check_breaker(self) -> None:
+        if not self.breaker.allow():
+            with self._lock:
+                self.stats.rejected_open += 1
+            raise UpstreamUnavailableError(
+                f"{self.name} circuit open after {self.breaker.consecutive} consecutive failures"
+            )
+
+    def _enter(self) -> None:
+        with self._lock:
+            self.stats.in_flight += 1
+            self.stats.peak_in_flight = max(self.stats.peak_in_flight, self.stats.in_flight)
+
+    def _exit(self) -> None:
+        with self._lock:
+            self.stats.in_flight -= 1
+
+    def _success(self) -> None:
+        self.breaker.success()
+        with self._lock:
+            self.stats.successes += 1
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for retry number *attempt* (0-based)."""
+        return self._rng.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def wait_estimate(self, tokens: int = 0) -> float:
+        """Seconds a call of *tokens* would be paced right now."""
+        return max(self.rpm.wait_for(1), self.tpm.wait_for(tokens) if tokens else 0.0)
+
+    def _failure(self, exc: BaseException, attempt: int, max_retries: int) -> float:
+        """Record a failed attempt; return the backoff delay, or re-raise."""
+        status = status_of(exc)
+        retry_after = retry_after_of(exc)
+        with self._lock:
+            self.stats.last_error = f"{status or type(exc).__name__}: {str(exc)[:160]}"
+        retryable = is_retryable(exc)
+        if status == 429:
+            with self._lock:
+                self.stats.throttled += 1
+            pause = retry_after if retry_after is not None else self.backoff_base * 2 ** attempt
+            self.rpm.pause(pause)
+            self.tpm.pause(pause)
+            self.breaker.throttled()
+        elif retryable:
+            self.breaker.failure()
+        else:
+            self.breaker.abandon()  # the service answered; the call itself was bad
+        if not retryable or attempt >= max_retries:
+            with self._lock:
+                self.stats.failures += 1
+            raise exc
+        delay = self.backoff(attempt)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        with self._lock:
+            self.stats.retries += 1
+            self.stats.backoff_wait_seconds += delay
+        return delay
+
+    # ---- async --------------------------------------------------------------
+
+    @asynccontextmanager
+    async def _slot(self):
+        if self._async_slots is None:
+            self._async_slots = asyncio.Semaphore(self.concurrency)
+        async with self._async_slots:
+            self._enter()
+            try:
+                yield
+            finally:
+                self._exit()
+
+    async def call(self, fn: Callable[[], Awaitable[T]], tokens: int = 0,
+                   max_retries: Optional[int] = None) -> T:
+        """Await ``fn()`` with pacing, bulkhead, retries and the breaker."""
+        retries = self.max_retries if max_retries is None else max_retries
+        attempt = 0
+        while True:
+            self._check_breaker()
+            wait = self._reserve(tokens)
+            if wait:
+                await asyncio.sleep(wait)
+            async with self._slot():
+                try:
+                    result = await fn()
+                except asyncio.CancelledError:
+                    self.breaker.abandon()
+                    raise
+                except Exception as exc:
+                    delay = self._failure(exc, attempt, retries)
+                else:
+                    self._success()
+                    return result
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def stream(self, open_fn: Callable[[], AsyncIterator[T]], tokens: int = 0,
+                     max_retries: Optional[int] = None) -> AsyncIterator[T]:
+        """Iterate ``open_fn()``; failures before the first item are retried."""
+        retries = self.max_retries if max_retries is None else max_retries
+        attempt = 0
+        while True:
+            self._check_breaker()
+            wait = self._reserve(tokens)
+            if wait:
+                await asyncio.sleep(wait)
+            started = False
+            async with self._slot():
+                try:
+                    async for item in open_fn():
+                        started = True
+                        yield item
+                except (asyncio.CancelledError, GeneratorExit):
+                    # Cancelled, or the caller closed the stream before its end
+                    self.breaker.abandon()
+                    raise
+                except Exception as exc:
+                    if started:
+                        if is_retryable(exc):
+                            self.breaker.failure()
+                        else:
+                            self.breaker.abandon()
+                        with self._lock:
+                            self.stats.failures += 1
+                        raise
+                    delay = self._failure(exc, attempt, retries)
+                else:
+                    self._success()
+                    return
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    # ---- sync ---------------------------------------------------------------
+
+    @contextmanager
+    def _sync_slot(self):
+        with self._sync_slots:
+            self._enter()
+            try:
+                yield
+            finally:
+                self._exit()
+
+    def call_sync(self, fn: Callable[[], T], tokens: int = 0, max_retries: Optional[int] = None) -> T:
+        """Blocking variant of ``call`` for synchronous SDK clients."""
+        retries = self.max_retries if max_retries is None else max_retries
+        attempt = 0
+        while True:
+            self._check_breaker()
+            wait = self._reserve(tokens)
+            if wait:
+                time.sleep(wait)
+            with self._sync_slot():
+                try:
+                    result = fn()
+                except Exception as exc:
+                    delay = self._failure(exc, attempt, retries)
+                else:
+                    self._success()
+                    return result
+            attempt += 1
+            time.sleep(delay)
+
+    # ---- reporting ------------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(vars(self.stats))
+        stats.update({
+            "breaker": self.breaker.state,
+            "breaker_opens": self.breaker.opens,
+            "consecutive_failures": self.breaker.consecutive,
+            "throttle_paused_seconds": round(max(0.0, self.rpm.blocked_until - time.monotonic()), 2),
+            "limits": {"rpm": self.rpm.per_minute, "tpm": self.tpm.per_minute, "concurrency": self.concurrency},
+        })
+        for key in ("pacing_wait_seconds", "backoff_wait_seconds"):
+            stats[key] = round(stats[key], 3)
+        return stats
+
+
+# ============================================================================
+# Registry + metrics
+# ============================================================================
+
+_BREAKER_VALUE = {"closed": 0, "half_open": 1, "open": 2}
+
+
+class UpstreamRegistry:
+    """Process-wide upstreams by name, created on first use."""
+
+    def __init__(self):
+        self._upstreams: Dict[str, Upstream] = {}
+        self._lock = threading.Lock()
+        self._register_metrics()
+
+    def get(self, name: str, **overrides: Any) -> Upstream:
+        with self._lock:
+            upstream = self._upstreams.get(name)
+            if upstream is None:
+                upstream = self._upstreams[name] = Upstream(name, **overrides)
+            return upstream
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            upstreams = dict(self._upstreams)
+        return {name: u.snapshot() for name, u in upstreams.items()}
+
+    def _register_metrics(self) -> None:
+        try:
+            from opentelemetry import metrics
+            from opentelemetry.metrics import Observation
+        except ImportError:
+            return
+        meter = metrics.get_meter("zava.upstream")
+
+        def observe(value_of: Callable[[Upstream], float]):
+            def callback(_options):
+                with self._lock:
+                    upstreams = list(self._upstreams.values())
+                return [Observation(value_of(u), {"upstream": u.name, "kind": u.kind}) for u in upstreams]
+            return callback
+
+        meter.create_observable_gauge("zava.upstream.breaker_state", [observe(lambda u: _BREAKER_VALUE[u.breaker.state])],
+                                      description="0 closed, 1 half-open, 2 open")
+        meter.create_observable_gauge("zava.upstream.in_flight", [observe(lambda u: u.stats.in_flight)])
+        meter.create_observable_counter("zava.upstream.calls", [observe(lambda u: u.stats.calls)])
+        meter.create_observable_counter("zava.upstream.retries", [observe(lambda u: u.stats.retries)])
+        meter.create_observable_counter("zava.upstream.throttled", [observe(lambda u: u.stats.throttled)])
+        meter.create_observable_counter("zava.upstream.breaker_opens", [observe(lambda u: u.breaker.opens)])
+        meter.create_observable_counter("zava.upstream.pacing_wait", [observe(lambda u: u.stats.pacing_wait_seconds)],
+                                        unit="s")
+
+
+_registry: Optional[UpstreamRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_upstreams() -> UpstreamRegistry:
+    """The process-wide upstream registry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = UpstreamRegistry()
+        return _registry
+
+
+# ============================================================================
+# Token accounting helpers
+# ============================================================================
+
+def estimate_request_tokens(messages, options) -> int:
+    """Prompt (chars / 4) plus the completion budget, for TPM reservations."""
+    prompt = len(options.get("instructions") or "") + sum(len(getattr(m, "text", "") or "") for m in messages)
+    completion = options.get("max_tokens") or int(os.getenv("UPSTREAM_COMPLETION_ESTIMATE", "800"))
+    return prompt // 4 + int(completion)
+
+
+def usage_tokens(usage_details) -> Optional[int]:
+    """Total tokens from a response's / usage content's ``usage_details``."""
+    if not usage_details:
+        return None
+    total = usage_details.get("total_token_count")
+    if total is None:
+        total = (usage_details.get("input_token_count") or 0) + (usage_details.get("output_token_count") or 0)
+    return int(total)
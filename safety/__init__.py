@@ -4,14 +4,15 @@ Content Safety — Zava Travel Inc.
 Two-layer content safety shield:
   Layer 1: Azure AI Content Safety (Hate, Violence, Sexual, Self-Harm)
   Layer 2: Brand-specific local filters (competitors, banned words,
-           unsafe activities, PII, jailbreak detection)
+           unsafe activities, PII, jailbreak detection, unsupported claims)
 """
 
 from safety.content_shield import ContentSafetyShield
-from safety.brand_filters import SafetyFlag, ShieldResult
+from safety.brand_filters import SafetyFlag, ShieldResult, check_claims
 
 __all__ = [
     "ContentSafetyShield",
+    "check_claims",
     "SafetyFlag",
     "ShieldResult",
 ]
@@ -12,11 +12,17 @@ guidelines and catch common content issues:
     - Banned words          ("cheap", "tourist", "package deal", …)
     - Unsafe activity       (dangerous without safety gear, binge drinking, …)
     - PII in content        (email, phone, SSN)
+
+Competitors and banned words come from the compiled brand rules
+(``grounding/brand_rules.py``); both are found in one regex pass.
 """
 
 import re
 from dataclasses import dataclass, field
-from typing import List
+from typing import List, Optional
+
+from grounding.brand_rules import BrandRules, load_brand_rules
+from grounding.fact_index import FactIndex, verify_claims
 
 
 # ============================================================================
@@ -55,18 +61,14 @@ class ShieldResult:
 
 
 # ============================================================================
-# Brand constants (from grounding/brand-guidelines.md)
+# Brand constants (compiled from grounding/brand-rules.json)
 # ============================================================================
 
-COMPETITORS = ["voyagenow", "cooktravel", "wanderpath"]
+# Snapshot at import time, kept for callers that read the constants
+# directly.  The check functions below always use the current rules.
+COMPETITORS = list(load_brand_rules().competitor_keys)
 
-BANNED_WORDS = {
-    "cheap":        "budget-friendly",   # also catches cheaper, cheapest
-    "tourist":      "traveler",          # also catches tourists
-    "package deal": "curated itinerary",
-    "discount":     "special offer",     # also catches discounted, discounts
-    "basic":        "essential",         # also catches basics
-}
+BANNED_WORDS = dict(load_brand_rules().banned_words)
 
 UNSAFE_PATTERNS = [
     (re.compile(r"without\s+(any\s+)?safety\s+(gear|equipment|precaution)", re.I),
@@ -108,37 +110,43 @@ JAILBREAK_PATTERNS = [
 # Individual filter functions
 # ============================================================================
 
-def check_competitors(text: str) -> List[SafetyFlag]:
+def _competitor_flags(rules: BrandRules, found) -> List[SafetyFlag]:
+    return [
+        SafetyFlag(
+            category="competitor_mention",
+            severity="blocked",
+            detail=f"Competitor mention detected: '{comp}'",
+            matched_text=comp,
+            suggestion=f"Remove competitor name and focus on {rules.short_name}'s strengths.",
+        )
+        for comp in found
+    ]
+
+
+def _banned_word_flags(rules: BrandRules, found) -> List[SafetyFlag]:
+    return [
+        SafetyFlag(
+            category="banned_word",
+            severity="warning",
+            detail=f"Brand-banned word detected: '{word}'",
+            matched_text=word,
+            suggestion=f"Replace '{word}' with '{rules.banned_words[word]}'.",
+        )
+        for word in found
+    ]
+
+
+def check_competitors(text: str, rules: Optional[BrandRules] = None) -> List[SafetyFlag]:
     """Check for competitor mentions (brand policy violation)."""
-    flags = []
-    lower = text.lower()
-    for comp in COMPETITORS:
-        if comp in lower:
-            flags.append(SafetyFlag(
-                category="competitor_mention",
-                severity="blocked",
-                detail=f"Competitor mention detected: '{comp}'",
-                matched_text=comp,
-                suggestion="Remove competitor name and focus on Zava Travel's strengths.",
-            ))
-    return flags
+    rules = rules or load_brand_rules()
+    return _competitor_flags(rules, rules.scan(text).competitors)
 
 
-def check_banned_words(text: str) -> List[SafetyFlag]:
+def check_banned_words(text: str, rules: Optional[BrandRules] = None) -> List[SafetyFlag]:
     """Check for brand-banned words and suggest replacements."""
-    flags = []
-    lower = text.lower()
-    for word, replacement in BANNED_WORDS.items():
-        # Match word stem — e.g. "cheap" also catches "cheaper", "cheapest"
-        if re.search(rf"\b{re.escape(word)}", lower):
-            flags.append(SafetyFlag(
-                category="banned_word",
-                severity="warning",
-                detail=f"Brand-banned word detected: '{word}'",
-                matched_text=word,
-                suggestion=f"Replace '{word}' with '{replacement}'.",
-            ))
-    return flags
+    # Word-stem match — e.g. "cheap" also catches "cheaper", "cheapest"
+    rules = rules or load_brand_rules()
+    return _banned_word_flags(rules, rules.scan(text).banned_words)
 
 
 def check_unsafe_activity(text: str) -> List[SafetyFlag]:
@@ -189,6 +197,21 @@ def check_jailbreak(text: str) -> List[SafetyFlag]:
     return flags
 
 
+def check_claims(text: str, facts: FactIndex, label: str = "") -> List[SafetyFlag]:
+    """Flag prices, offers, destinations, etc. not backed by the fact index."""
+    prefix = f"{label}: " if label else ""
+    return [
+        SafetyFlag(
+            category="unsupported_claim",
+            severity="warning",
+            detail=f"{prefix}Unsupported {claim.kind} claim '{claim.text}' — {claim.reason}",
+            matched_text=claim.text,
+            suggestion="Use only facts from the campaign brief or brand guidelines.",
+        )
+        for claim in verify_claims(text, facts).unsupported
+    ]
+
+
 # ============================================================================
 # Composite filters
 # ============================================================================
@@ -205,13 +228,29 @@ def run_input_filters(text: str) -> ShieldResult:
     return ShieldResult(allowed=allowed, flags=flags)
 
 
-def run_output_filters(text: str) -> ShieldResult:
+def run_output_filters(text: str, rules: Optional[BrandRules] = None) -> ShieldResult:
     """Run all brand-specific filters appropriate for **output** text."""
+    rules = rules or load_brand_rules()
+    matches = rules.scan(text)  # competitors + banned words in one pass
+
     flags: List[SafetyFlag] = []
-    flags.extend(check_competitors(text))
-    flags.extend(check_banned_words(text))
+    flags.extend(_competitor_flags(rules, matches.competitors))
+    flags.extend(_banned_word_flags(rules, matches.banned_words))
     flags.extend(check_unsafe_activity(text))
     flags.extend(check_pii_in_content(text))
 
     allowed = not any(f.severity == "blocked" for f in flags)
     return ShieldResult(allowed=allowed, flags=flags)
+
+
+def run_blocking_filters(text: str, rules: Optional[BrandRules] = None) -> List[SafetyFlag]:
+    """Only the output filters that block (competitors, unsafe activity, PII).
+
+    Cheap enough to run on every streamed delta — used by the streaming
+    guard (``safety/stream_guard.py``) to stop a turn early.
+    """
+    rules = rules or load_brand_rules()
+    flags = _competitor_flags(rules, rules.scan(text).competitors)
+    flags.extend(check_unsafe_activity(text))
+    flags.extend(check_pii_in_content(text))
+    return flags
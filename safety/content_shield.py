@@ -29,6 +29,7 @@ import os
 import logging
 from typing import List, Optional
 
+from orchestration.upstream import get_upstreams
 from safety.brand_filters import (
     SafetyFlag,
     ShieldResult,
@@ -101,9 +102,11 @@ class ContentSafetyShield:
                 credential = DefaultAzureCredential()
                 auth_method = "DefaultAzureCredential"
 
+            # Retries are handled by the content_safety upstream, not the SDK
             self._azure_client = ContentSafetyClient(
                 endpoint=endpoint,
                 credential=credential,
+                retry_total=0,
             )
 
             self._azure_enabled = True
@@ -133,9 +136,10 @@ class ContentSafetyShield:
         try:
             from azure.ai.contentsafety.models import AnalyzeTextOptions
 
-            # Azure CS API has a 10 000-character limit per request
-            response = self._azure_client.analyze_text(
-                AnalyzeTextOptions(text=text[:10_000])
+            # Azure CS API has a 10 000-character limit per request;
+            # the upstream paces, retries and bulkheads the call
+            response = get_upstreams().get("content_safety").call_sync(
+                lambda: self._azure_client.analyze_text(AnalyzeTextOptions(text=text[:10_000]))
             )
 
             flags: List[SafetyFlag] = []
@@ -190,7 +194,7 @@ class ContentSafetyShield:
         allowed = not any(f.severity == "blocked" for f in all_flags)
         return ShieldResult(allowed=allowed, flags=all_flags)
 
-    def screen_output(self, text: str, agent_name: str = "") -> ShieldResult:
+    def screen_output(self, text: str, agent_name: str = "", rules=None) -> ShieldResult:
         """Screen agent-generated content before it is returned to the user.
 
         Checks:
@@ -199,6 +203,8 @@ class ContentSafetyShield:
           3. Banned words           ("cheap", "tourist", …)
           4. Unsafe activities      (dangerous without safety gear, …)
           5. PII in content         (email, phone, SSN)
+
+        ``rules`` selects a brand's compiled rules (default brand if omitted).
         """
         all_flags: List[SafetyFlag] = []
 
@@ -206,7 +212,7 @@ class ContentSafetyShield:
         all_flags.extend(self._analyze_with_azure(text))
 
         # Layer 2 — Brand-specific output filters
-        brand_result = run_output_filters(text)
+        brand_result = run_output_filters(text, rules=rules)
         all_flags.extend(brand_result.flags)
 
         allowed = not any(f.severity == "blocked" for f in all_flags)
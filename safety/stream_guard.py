@@ -0,0 +1,297 @@
+"""
+Streaming Safety Guard — stop a turn as soon as it says something blocked
+
+``screen_output`` only sees the Publisher's finished posts, so a Creator
+draft that names a competitor in its first sentence still pays for the
+whole Creator → Reviewer → Publisher chain before it is blocked.  The
+guard scans each agent turn *while it streams*: every text delta is
+checked, together with the last ``STREAM_GUARD_WINDOW`` characters before
+it, against the blocking output filters (competitor mentions, unsafe
+activity, PII — see ``run_blocking_filters``).  On a match the upstream
+stream is closed at once and the turn is regenerated with a note naming
+what was blocked, up to ``STREAM_GUARD_RETRIES`` times; the last attempt
+runs to completion so the workflow's usual review and output screening
+still apply.
+
+The turn still streams: text is passed on as soon as it has been scanned
+clean and is more than ``STREAM_GUARD_WINDOW`` characters old, and only
+that trailing window is held back, so the cut text never reaches the
+conversation.  When a cut comes after text was already passed on, the
+regeneration continues from it (the released text is sent back as the
+assistant's partial turn) instead of starting over.
+
+The Creator is scanned from its ``**DRAFT**`` onwards (its reasoning may
+name what to avoid); the Reviewer is not guarded because it quotes the
+draft it rejects.  Tokens saved per cut are the tokens of the completed
+turn that replaced it minus the tokens generated before the cut (chars /
+4, like the telemetry estimate).  Non-streaming calls are passed through.
+
+Configuration (env vars):
+    STREAM_GUARD          "on" (default) or "off"
+    STREAM_GUARD_WINDOW   Characters of earlier text rescanned with each delta (default 200)
+    STREAM_GUARD_RETRIES  Regenerations per turn after a cut (default 2)
+
+Usage:
+    creator = Agent(client=..., name="Creator", middleware=[
+        *build_context_middleware("Creator", telemetry),
+        *build_stream_guard_middleware("Creator", telemetry, brand.rules),
+        telemetry.usage_middleware("Creator"),
+    ])
+    print(get_stream_guard().snapshot())     # cuts, regenerations, tokens saved
+"""
+
+import os
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from agent_framework import ChatContext, ChatMiddleware, Message
+
+from orchestration.context_policy import estimate_tokens
+from safety.brand_filters import SafetyFlag, run_blocking_filters
+
+# Where scanning starts in an agent's output (None = from the first token)
+START_MARKERS = {"Creator": "**DRAFT**"}
+
+# Hooks the inner middleware (usage capture) registers per call; bound to
+# each attempt's stream, as in orchestration/draft_sampling.py
+_STREAM_HOOKS = (
+    ("stream_transform_hooks", "with_transform_hook"),
+    ("stream_result_hooks", "with_result_hook"),
+    ("stream_cleanup_hooks", "with_cleanup_hook"),
+)
+
+
+def guard_enabled() -> bool:
+    return os.getenv("STREAM_GUARD", "on").lower().strip() not in ("off", "0", "false", "no")
+
+
+class StreamScanner:
+    """Runs the blocking filters over a streamed response, delta by delta."""
+
+    def __init__(self, rules=None, window: int = 200, start_marker: Optional[str] = None):
+        self.rules = rules
+        self.window = window
+        self.start_marker = start_marker
+        self.text = ""
+        self._start: Optional[int] = None if start_marker else 0
+        self._scanned = 0
+
+    def feed(self, delta: str) -> List[SafetyFlag]:
+        """Add *delta*; the blocking flags in the window that ends with it."""
+        if not delta:
+            return []
+        before = len(self.text)
+        self.text += delta
+        if self._start is None:
+            found = self.text.find(self.start_marker, max(0, before - len(self.start_marker)))
+            if found < 0:
+                return []
+            self._start = self._scanned = found + len(self.start_marker)
+        begin = max(self._start, self._scanned - self.window)
+        self._scanned = len(self.text)
+        return run_blocking_filters(self.text[begin:], self.rules)
+
+
+class StreamGuard:
+    """Guard settings plus process-wide counters of cuts and tokens saved."""
+
+    def __init__(self, window: Optional[int] = None, retries: Optional[int] = None):
+        self.window = window if window is not None else int(os.getenv("STREAM_GUARD_WINDOW", "200"))
+        self.retries = retries if retries is not None else int(os.getenv("STREAM_GUARD_RETRIES", "2"))
+        self._lock = threading.Lock()
+        self.turns = 0
+        self.cut_turns = 0
+        self.cuts = 0
+        self.regenerated_clean = 0
+        self.exhausted = 0
+        self.tokens_before_cut = 0
+        self.tokens_saved = 0
+        self.by_category: Dict[str, int] = {}
+
+    def scanner(self, agent_name: str, rules=None) -> StreamScanner:
+        return StreamScanner(rules, self.window, START_MARKERS.get(agent_name))
+
+    def record_turn(self, cut_flags: List[List[SafetyFlag]], cut_tokens: List[int],
+                    turn_tokens: int, blocked: bool) -> Dict[str, Any]:
+        """Record one guarded turn; returns its record for telemetry."""
+        saved = sum(max(0, turn_tokens - generated) for generated in cut_tokens)
+        with self._lock:
+            self.turns += 1
+            if cut_tokens:
+                self.cut_turns += 1
+                self.cuts += len(cut_tokens)
+                self.tokens_before_cut += sum(cut_tokens)
+                self.tokens_saved += saved
+                self.regenerated_clean += int(not blocked)
+                for flags in cut_flags:
+                    for flag in flags:
+                        self.by_category[flag.category] = self.by_category.get(flag.category, 0) + 1
+            self.exhausted += int(blocked)
+        return {
+            "cuts": len(cut_tokens),
+            "tokens_before_cut": sum(cut_tokens),
+            "tokens_saved": saved,
+            "blocked": blocked,
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": guard_enabled(),
+                "window_chars": self.window,
+                "retries": self.retries,
+                "turns": self.turns,
+                "cut_turns": self.cut_turns,
+                "cuts": self.cuts,
+                "regenerated_clean": self.regenerated_clean,
+                "exhausted": self.exhausted,
+                "by_category": dict(self.by_category),
+                "tokens_before_cut": self.tokens_before_cut,
+                "tokens_saved": self.tokens_saved,
+            }
+
+
+_guard: Optional[StreamGuard] = None
+_guard_lock = threading.Lock()
+
+
+def get_stream_guard() -> StreamGuard:
+    """The process-wide stream guard."""
+    global _guard
+    with _guard_lock:
+        if _guard is None:
+            _guard = StreamGuard()
+        return _guard
+
+
+async def _close(stream) -> None:
+    """Close a cut stream so the upstream request stops instead of draining."""
+    node = stream
+    while getattr(node, "_iterator", None) is not None:
+        node = node._iterator
+    if node is not stream and hasattr(node, "aclose"):
+        await node.aclose()
+    await stream._run_cleanup_hooks()
+
+
+def _correction(flags: List[SafetyFlag], continuing: bool = False) -> Message:
+    details = "; ".join(dict.fromkeys(f.detail for f in flags))
+    fixes = " ".join(dict.fromkeys(f.suggestion for f in flags if f.suggestion))
+    if continuing:
+        ask = ("Continue your response from exactly where the text above ends, "
+               "without repeating any of it.")
+    else:
+        ask = "Write your complete response again."
+    return Message(
+        role="user",
+        text=(f"Your previous response was stopped by the content safety guard: {details}. "
+              f"{fixes} {ask}").replace("  ", " "),
+    )
+
+
+class StreamGuardMiddleware(ChatMiddleware):
+    """
+    Chat middleware that scans a streamed turn as it arrives and cuts it off
+    (and regenerates it) the moment a blocking filter matches.
+    """
+
+    def __init__(self, agent_name: str, guard: Optional[StreamGuard] = None, telemetry=None, rules=None):
+        self.agent_name = agent_name
+        self.guard = guard if guard is not None else get_stream_guard()
+        self.telemetry = telemetry
+        self.rules = rules
+
+    async def _open(self, context: ChatContext, call_next):
+        marks = {attr: len(getattr(context, attr)) for attr, _ in _STREAM_HOOKS}
+        await call_next()
+        stream = context.result
+        for attr, method in _STREAM_HOOKS:
+            hooks = getattr(context, attr)
+            for hook in hooks[marks[attr]:]:
+                getattr(stream, method)(hook)
+            del hooks[marks[attr]:]
+        return stream
+
+    async def process(self, context: ChatContext, call_next) -> None:
+        if not context.stream:
+            await call_next()
+            return
+        messages, options = list(context.messages), context.options
+        first = await self._open(context, call_next)
+
+        async def _guarded():
+            stream, released = first, ""
+            notes: List[Message] = []      # corrections for turns started over
+            follow: List[Message] = []     # partial turn + correction for a continuation
+            cut_flags: List[List[SafetyFlag]] = []
+            cut_tokens: List[int] = []
+            blocked: List[SafetyFlag] = []
+
+            for attempt in range(self.guard.retries + 1):
+                final = attempt == self.guard.retries
+                if attempt:
+                    context.messages, context.options = messages + notes + follow, options
+                    stream = await self._open(context, call_next)
+                    context.messages = messages
+                scanner = self.guard.scanner(self.agent_name, self.rules)
+                scanner.feed(released)  # marker state and window context for a continuation
+                prefix = len(scanner.text)
+                held, blocked = deque(), []
+                try:
+                    async for update in stream:
+                        flags = scanner.feed(update.text or "")
+                        if flags and not blocked:
+                            blocked = flags
+                            if not final:
+                                break
+                        # Release what is clean and older than the window
+                        held.append((len(scanner.text), update))
+                        safe = len(scanner.text) - (0 if final else self.guard.window)
+                        while held and held[0][0] <= safe:
+                            update = held.popleft()[1]
+                            released += update.text or ""
+                            yield update
+                except GeneratorExit:
+                    await _close(stream)
+                    raise
+                if not blocked or final:
+                    for _, update in held:
+                        released += update.text or ""
+                        yield update
+                    break
+                await _close(stream)
+                generated = estimate_tokens(scanner.text[prefix:])
+                cut_flags.append(blocked)
+                cut_tokens.append(generated)
+                if released:
+                    follow = [Message(role="assistant", text=released), _correction(blocked, continuing=True)]
+                else:
+                    notes.append(_correction(blocked))
+                print(f"   🛑 Stream guard [{self.agent_name}]: cut after ~{generated} tokens — "
+                      f"{blocked[0].detail} → {'continuing' if released else 'regenerating'}")
+
+            record = self.guard.record_turn(cut_flags, cut_tokens, estimate_tokens(released), bool(blocked))
+            if cut_tokens:
+                outcome = "still blocked, passed on for review" if blocked else "clean"
+                print(f"   🛡️  Stream guard [{self.agent_name}]: {len(cut_tokens)} cut(s), "
+                      f"~{record['tokens_saved']} tokens saved, regenerated turn {outcome}")
+            if self.telemetry is not None:
+                self.telemetry.on_stream_guard(self.agent_name, record)
+
+        context.messages, context.options = messages, options
+        context.result = context.client._build_response_stream(
+            _guarded(), response_format=(options or {}).get("response_format"),
+        )
+
+
+def build_stream_guard_middleware(agent_name: str, telemetry=None, rules=None) -> list:
+    """
+    Return the stream-guard middleware list for *agent_name*.
+
+    Returns an empty list when ``STREAM_GUARD=off``, so callers can splat
+    the result into ``Agent(middleware=[...])``.
+    """
+    if not guard_enabled():
+        return []
+    return [StreamGuardMiddleware(agent_name, telemetry=telemetry, rules=rules)]
@@ -90,6 +90,8 @@ def get_filesystem_tools(
     Transport is chosen via the ``MCP_TRANSPORT`` env var:
       - ``stdio``  (default) — direct stdio, no bridge needed
       - ``streamable-http``  — uses supergateway as HTTP bridge
+      - ``none``             — no MCP tool (default with ``ZAVA_LLM_MODE=fake``,
+                               whose synthesized outputs never call tools)
 
     Args:
         output_dir: Directory the MCP filesystem server can access.
@@ -109,7 +111,11 @@ def get_filesystem_tools(
     if port is None:
         port = int(os.getenv("MCP_SERVER_PORT", "8000"))
 
-    transport = os.getenv("MCP_TRANSPORT", "stdio").lower().strip()
+    default_transport = "none" if os.getenv("ZAVA_LLM_MODE", "").lower().strip() == "fake" else "stdio"
+    transport = os.getenv("MCP_TRANSPORT", default_transport).lower().strip()
+    if transport == "none":
+        print("ℹ️  MCP filesystem tool disabled (MCP_TRANSPORT=none)")
+        return []
 
     # Ensure the output directory exists
     os.makedirs(output_dir, exist_ok=True)
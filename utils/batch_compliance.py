@@ -0,0 +1,437 @@
+"""
+Batch Compliance Engine — vectorized platform checks over whole datasets
+
+Takes columns of posts and computes hashtag, word, character and emoji
+counts plus rule violations for all of them at once.  The posts are
+concatenated into one NumPy array of Unicode code points; every count is
+a boolean mask over that array counted per post with ``np.bincount``, so
+the cost is a handful of array passes regardless of how many posts there
+are.  Results come back as a columnar ``ComplianceTable``.
+
+The per-post APIs are thin wrappers over this module:
+  - ``utils.formatting.validate_{linkedin,twitter,instagram}_post``
+        → ``validate_posts([post], platform).row(0)``
+  - ``evaluation.evaluate.PlatformComplianceEvaluator``
+        → ``audit_responses([response]).row(0)``
+
+Large inputs can be split across a process pool (``workers`` argument or
+``BATCH_COMPLIANCE_WORKERS``); chunks are validated independently and the
+tables concatenated.
+
+Configuration (env vars):
+    BATCH_COMPLIANCE_WORKERS  Processes for large batches (default 1 = in-process)
+    BATCH_COMPLIANCE_CHUNK    Posts per worker chunk (default 5000)
+
+Usage:
+    table = validate_posts(df["twitter_post"], "twitter")
+    print(table.summary())
+    df = table.to_pandas()
+
+    python -m utils.batch_compliance evaluation/eval_results.jsonl
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from grounding.brand_rules import BrandRules, load_brand_rules
+
+# Code points for which str.isspace() is true — str.split() boundaries.
+_WHITESPACE = np.array(
+    [0x09, 0x0A, 0x0B, 0x0C, 0x0D, 0x1C, 0x1D, 0x1E, 0x1F, 0x20, 0x85, 0xA0,
+     0x1680, *range(0x2000, 0x200B), 0x2028, 0x2029, 0x202F, 0x205F, 0x3000],
+    dtype=np.uint32,
+)
+
+# Ranges matched by PlatformComplianceEvaluator's emoji pattern.
+_EMOJI_RANGES = (
+    (0x1F300, 0x1F9FF), (0x2702, 0x27B0), (0x1F680, 0x1F6FF),
+    (0x2600, 0x26FF), (0x2700, 0x27BF),
+)
+
+_IMAGE_MARKER = "[image:"
+
+_PLATFORM_TITLES = {"linkedin": "LinkedIn", "twitter": "Twitter", "instagram": "Instagram"}
+
+_SECTION_HEADERS = {
+    "twitter": r"\*\*X/?TWITTER POST\*\*",
+    "instagram": r"\*\*INSTAGRAM POST\*\*",
+}
+_NEXT_HEADER = re.compile(r"\*\*(?:LINKEDIN|X/?TWITTER|INSTAGRAM) POST\*\*", re.IGNORECASE)
+
+AUDIT_CHECKS = (
+    "twitter_char_limit",
+    "instagram_has_hashtags",
+    "instagram_has_emojis",
+    "contains_brand_hashtag",
+    "no_competitor_mentions",
+    "no_banned_words",
+)
+
+
+# ============================================================================
+# Columnar result
+# ============================================================================
+
+@dataclass
+class ComplianceTable:
+    """Column name → NumPy array, one entry per input post."""
+    columns: Dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def row(self, i: int, fields: Optional[Sequence[str]] = None) -> dict:
+        """One post's results as plain Python values."""
+        names = fields or list(self.columns)
+        return {
+            name: (v.item() if isinstance(v, np.generic) else v)
+            for name in names
+            for v in (self.columns[name][i],)
+        }
+
+    def summary(self) -> dict:
+        """Row count, pass rate and per-column violation counts."""
+        out = {"rows": len(self)}
+        if "valid" in self.columns and len(self):
+            out["valid_rate"] = round(float(self.columns["valid"].mean()), 4)
+        for name, col in self.columns.items():
+            if col.dtype == bool and name != "valid":
+                out[name] = int(col.sum())
+        return out
+
+    def to_pandas(self):
+        """Return a ``pandas.DataFrame`` (pandas is optional)."""
+        try:
+            import pandas as pd
+        except ImportError as e:
+            raise ImportError("to_pandas() requires pandas: pip install pandas") from e
+        return pd.DataFrame(self.columns)
+
+    @classmethod
+    def concat(cls, tables: Sequence["ComplianceTable"]) -> "ComplianceTable":
+        if not tables:
+            return cls({})
+        return cls({name: np.concatenate([t.columns[name] for t in tables])
+                    for name in tables[0].columns})
+
+
+def _object_column(values: List) -> np.ndarray:
+    col = np.empty(len(values), dtype=object)
+    col[:] = values
+    return col
+
+
+# ============================================================================
+# Vectorized text features
+# ============================================================================
+
+def _counts(mask: np.ndarray, post_of: np.ndarray, size: int) -> np.ndarray:
+    """Number of True positions per post."""
+    return np.bincount(post_of[mask], minlength=size)
+
+
+def _whitespace(cp: np.ndarray) -> np.ndarray:
+    ws = (cp <= 0x20) & ((cp >= 0x1C) | ((cp >= 0x09) & (cp <= 0x0D)))
+    high = np.flatnonzero(cp >= 0x85)
+    if high.size:
+        ws[high] = np.isin(cp[high], _WHITESPACE)
+    return ws
+
+
+def text_features(posts: Sequence[str]) -> Dict[str, np.ndarray]:
+    """
+    Per-post counts computed over one concatenated code-point array.
+
+    Returns arrays for: ``chars`` (len), ``twitter_chars`` (emojis count
+    double), ``words`` (``str.split()`` tokens), ``hashtags`` (tokens
+    starting with '#'), ``emojis`` (code points > U+1F300), ``has_hash``,
+    ``has_emoji_range`` (evaluator emoji ranges), ``has_paragraphs``
+    ('\\n\\n') and ``has_image_suggestion`` ('[image:', case-insensitive).
+    """
+    texts = ["" if p is None else str(p) for p in posts]
+    size = len(texts)
+    lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=size)
+    starts = np.cumsum(lengths) - lengths
+    cp = np.frombuffer("".join(texts).encode("utf-32-le"), dtype="<u4")
+    n = cp.size
+    post_of = np.repeat(np.arange(size, dtype=np.int32), lengths)
+
+    is_start = np.zeros(n, dtype=bool)
+    is_start[starts[lengths > 0]] = True
+
+    ws = _whitespace(cp)
+    word_start = ~ws
+    word_start[1:] &= ws[:-1] | is_start[1:]
+
+    newline = cp == 0x0A
+    pair = np.zeros(n, dtype=bool)
+    if n > 1:
+        pair[:-1] = newline[:-1] & newline[1:] & ~is_start[1:]
+
+    symbols = np.flatnonzero(cp >= 0x2600)
+    in_range = np.zeros(symbols.size, dtype=bool)
+    for low, high in _EMOJI_RANGES:
+        in_range |= (cp[symbols] >= low) & (cp[symbols] <= high)
+    has_emoji_range = np.zeros(size, dtype=bool)
+    has_emoji_range[post_of[symbols[in_range]]] = True
+
+    # '[image:' search: compare the (ASCII-folded) marker at every offset
+    # where a '[' occurs, keeping matches that lie entirely inside one post.
+    width = len(_IMAGE_MARKER)
+    candidates = np.flatnonzero(cp[:max(n - width + 1, 0)] == 0x5B)
+    for k, ch in enumerate(_IMAGE_MARKER[1:], start=1):
+        code = cp[candidates + k]
+        candidates = candidates[(code == ord(ch)) | (code == ord(ch.upper()))]
+    candidates = candidates[post_of[candidates] == post_of[candidates + width - 1]]
+    has_image = np.zeros(size, dtype=bool)
+    has_image[post_of[candidates]] = True
+
+    emojis = _counts(cp > 0x1F300, post_of, size)
+    return {
+        "chars": lengths,
+        "twitter_chars": lengths + emojis,
+        "words": _counts(word_start, post_of, size),
+        "hashtags": _counts(word_start & (cp == 0x23), post_of, size),
+        "emojis": emojis,
+        "has_hash": _counts(cp == 0x23, post_of, size) > 0,
+        "has_emoji_range": has_emoji_range,
+        "has_paragraphs": _counts(pair, post_of, size) > 0,
+        "has_image_suggestion": has_image,
+    }
+
+
+# ============================================================================
+# Process pool
+# ============================================================================
+
+def _workers(workers: Optional[int]) -> int:
+    return max(1, workers if workers is not None else int(os.getenv("BATCH_COMPLIANCE_WORKERS", "1")))
+
+
+def _chunked(fn, items: List[str], workers: Optional[int], *args) -> ComplianceTable:
+    workers = _workers(workers)
+    chunk = max(1, int(os.getenv("BATCH_COMPLIANCE_CHUNK", "5000")))
+    rules = args[-1]
+    if workers == 1 or len(items) <= chunk or not rules.source:
+        return fn(items, *args)
+    # Compiled rules hold mapping proxies and regexes; workers reload them
+    # from their source file instead.
+    args = args[:-1] + (rules.source,)
+    parts = [items[i:i + chunk] for i in range(0, len(items), chunk)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        tables = list(pool.map(fn, parts, *[[a] * len(parts) for a in args]))
+    return ComplianceTable.concat(tables)
+
+
+# ============================================================================
+# Platform validation (utils.formatting)
+# ============================================================================
+
+def _rules(rules) -> BrandRules:
+    return load_brand_rules(rules) if isinstance(rules, str) else rules
+
+
+def _validate_chunk(posts: List[str], platform: str, rules) -> ComplianceTable:
+    limits = _rules(rules).platform(platform)
+    f = text_features(posts)
+    title = _PLATFORM_TITLES.get(limits.name, limits.name.title())
+    size = len(posts)
+    none = np.zeros(size, dtype=bool)
+    issues: List[List[str]] = [[] for _ in range(size)]
+
+    def flag(mask: np.ndarray, message) -> np.ndarray:
+        for i in np.flatnonzero(mask):
+            issues[i].append(message(i))
+        return mask
+
+    chars_over = none
+    if limits.max_chars:
+        chars_over = flag(f["twitter_chars"] > limits.max_chars,
+                          lambda i: f"Character count {f['twitter_chars'][i]} exceeds {limits.max_chars} limit")
+    low, high = limits.hashtags
+    hashtags_bad = flag((f["hashtags"] < low) | (f["hashtags"] > high),
+                        lambda i: f"Hashtag count {f['hashtags'][i]} not in range {limits.hashtag_range}")
+    paragraphs_bad = none
+    if limits.paragraphs:
+        paragraphs_bad = flag(~f["has_paragraphs"],
+                              lambda i: "Missing paragraph structure (no double newlines)")
+    elif limits.paragraphs is False:
+        paragraphs_bad = flag(f["has_paragraphs"],
+                              lambda i: f"{title} posts should not have multiple paragraphs")
+    emojis_low = flag(f["emojis"] < limits.min_emojis,
+                      lambda i: f"Emoji count {f['emojis'][i]} is less than minimum {limits.min_emojis}")
+    words_bad = none
+    if limits.words:
+        typical = limits.typical_words or limits.words
+        words_bad = flag((f["words"] < limits.words[0]) | (f["words"] > limits.words[1]),
+                         lambda i: f"Word count {f['words'][i]} not in typical range {typical[0]}-{typical[1]}")
+    image_missing = none
+    if limits.image_suggestion:
+        image_missing = flag(~f["has_image_suggestion"],
+                             lambda i: "Missing visual suggestion in [Image: ...] format")
+
+    violations = chars_over | hashtags_bad | paragraphs_bad | emojis_low | words_bad | image_missing
+    return ComplianceTable({
+        "valid": ~violations,
+        "issues": _object_column(issues),
+        "char_count": f["twitter_chars"],
+        "hashtag_count": f["hashtags"],
+        "word_count": f["words"],
+        "emoji_count": f["emojis"],
+        "chars_over_limit": chars_over,
+        "hashtags_out_of_range": hashtags_bad,
+        "paragraphs_violation": paragraphs_bad,
+        "emojis_below_min": emojis_low,
+        "words_out_of_range": words_bad,
+        "image_suggestion_missing": image_missing,
+    })
+
+
+def validate_posts(
+    posts: Iterable[str],
+    platform: str,
+    rules: Optional[BrandRules] = None,
+    workers: Optional[int] = None,
+) -> ComplianceTable:
+    """
+    Validate a column of *platform* posts against the brand's platform rules.
+
+    Args:
+        posts: Post texts (list, NumPy array, pandas Series, ...)
+        platform: "linkedin", "twitter"/"x" or "instagram"
+        rules: Optional ``BrandRules`` (defaults to the loaded brand rules)
+        workers: Process count for large batches (default BATCH_COMPLIANCE_WORKERS)
+
+    Returns:
+        ComplianceTable: ``valid``, ``issues``, counts and one boolean
+        column per violation type
+    """
+    return _chunked(_validate_chunk, list(posts), workers, platform, rules or load_brand_rules())
+
+
+# ============================================================================
+# Response audit (PlatformComplianceEvaluator)
+# ============================================================================
+
+def extract_post_section(text: str, platform: str) -> str:
+    """Extract a platform's section from a Publisher response."""
+    match = re.search(_SECTION_HEADERS[platform], text, re.IGNORECASE)
+    if not match:
+        return ""
+    start = match.end()
+    next_header = _NEXT_HEADER.search(text[start:])
+    end = start + next_header.start() if next_header else len(text)
+    return text[start:end].strip()
+
+
+def _clean_twitter(post: str) -> str:
+    clean = re.sub(r"\*\*.*?\*\*", "", post).strip()
+    return re.sub(r"\[.*?\]\(.*?\)", "", clean).strip()
+
+
+def _audit_chunk(responses: List[str], rules) -> ComplianceTable:
+    rules = _rules(rules)
+    # Section extraction and the competitor/banned-word scan are single
+    # regex passes per response; all counting is vectorized.
+    twitter = [extract_post_section(r, "twitter") for r in responses]
+    instagram = [extract_post_section(r, "instagram") for r in responses]
+    tw = text_features([_clean_twitter(t) for t in twitter])
+    ig = text_features(instagram)
+    has_twitter = np.fromiter((bool(t) for t in twitter), dtype=bool, count=len(responses))
+    has_instagram = np.fromiter((bool(t) for t in instagram), dtype=bool, count=len(responses))
+    matches = [rules.scan(r) for r in responses]
+    limit = rules.platform("twitter").max_chars
+
+    checks = {
+        "twitter_char_limit": ~(has_twitter & (tw["chars"] > limit)),
+        "instagram_has_hashtags": ~(has_instagram & ~ig["has_hash"]),
+        "instagram_has_emojis": ~(has_instagram & ~ig["has_emoji_range"]),
+        "contains_brand_hashtag": np.fromiter(
+            (rules.has_brand_hashtag(r) for r in responses), dtype=bool, count=len(responses)),
+        "no_competitor_mentions": np.fromiter(
+            (not m.competitors for m in matches), dtype=bool, count=len(responses)),
+        "no_banned_words": np.fromiter(
+            (not m.banned_words for m in matches), dtype=bool, count=len(responses)),
+    }
+    passed = np.sum([checks[c] for c in AUDIT_CHECKS], axis=0) if responses else np.zeros(0)
+    score = np.round(passed / len(AUDIT_CHECKS) * 5, 1)
+
+    issues: List[List[str]] = [[] for _ in responses]
+    for i in np.flatnonzero(~checks["twitter_char_limit"]):
+        issues[i].append(f"Twitter post is {tw['chars'][i]} chars (limit: {limit})")
+    for i in np.flatnonzero(~checks["instagram_has_hashtags"]):
+        issues[i].append("Instagram post missing hashtags")
+    for i in np.flatnonzero(~checks["instagram_has_emojis"]):
+        issues[i].append("Instagram post missing emojis")
+    for i in np.flatnonzero(~checks["contains_brand_hashtag"]):
+        issues[i].append(f"Missing mandatory {rules.mandatory_hashtag} hashtag")
+    for i in np.flatnonzero(~checks["no_competitor_mentions"]):
+        issues[i].append(f"Mentions competitor: {matches[i].competitors[0]}")
+    for i in np.flatnonzero(~checks["no_banned_words"]):
+        issues[i].append(f"Uses banned word: '{matches[i].banned_words[0]}'")
+
+    return ComplianceTable({
+        "platform_compliance": score,
+        **checks,
+        "twitter_chars": tw["chars"],
+        "issues": _object_column(issues),
+    })
+
+
+def audit_responses(
+    responses: Iterable[str],
+    rules: Optional[BrandRules] = None,
+    workers: Optional[int] = None,
+) -> ComplianceTable:
+    """
+    Brand/platform compliance of full Publisher responses.
+
+    Returns:
+        ComplianceTable: ``platform_compliance`` (0-5), one boolean column
+        per check in ``AUDIT_CHECKS``, ``twitter_chars`` and ``issues``
+    """
+    return _chunked(_audit_chunk, list(responses), workers, rules or load_brand_rules())
+
+
+# ============================================================================
+# CLI — audit a results file
+# ============================================================================
+
+def _main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Vectorized compliance audit of a posts JSONL file")
+    parser.add_argument("path", help="JSONL with linkedin_post / twitter_post / instagram_post fields")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--csv", help="Write the per-post table for each platform to <prefix>_<platform>.csv")
+    args = parser.parse_args(argv)
+
+    with open(args.path, "r", encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+
+    print(f"🔎 Auditing {len(rows):,} rows from {args.path}")
+    for platform in ("linkedin", "twitter", "instagram"):
+        posts = [r.get(f"{platform}_post", "") for r in rows]
+        start = time.perf_counter()
+        table = validate_posts(posts, platform, workers=args.workers)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"  {platform:<10} {json.dumps(table.summary())}  ({elapsed:.1f} ms)")
+        if args.csv:
+            table.to_pandas().to_csv(f"{args.csv}_{platform}.csv", index=False)
+
+
+if __name__ == "__main__":
+    _main(sys.argv[1:])
@@ -2,8 +2,15 @@
 Platform-Specific Formatting Utilities
 
 Provides validation functions for social media platform constraints.
+Limits (hashtag ranges, word counts, character limit) come from the
+compiled brand rules in ``grounding/brand-rules.json``.  The validators
+are single-post wrappers over the vectorized ``utils.batch_compliance``
+engine; use ``validate_posts`` directly for whole datasets.
 """
 
+from grounding.brand_rules import load_brand_rules
+from utils.batch_compliance import validate_posts
+
 
 def twitter_char_count(text: str) -> int:
     """
@@ -24,112 +31,51 @@ def twitter_char_count(text: str) -> int:
     return base_count + emoji_count
 
 
-def validate_linkedin_post(post: str) -> dict:
+def _validate_one(post: str, platform: str, rules, fields) -> dict:
+    table = validate_posts([post], platform, rules, workers=1)
+    return table.row(0, ("valid", "issues") + fields)
+
+
+def validate_linkedin_post(post: str, rules=None) -> dict:
     """
     Validate LinkedIn post constraints.
     
     Args:
         post: LinkedIn post text
+        rules: Optional ``BrandRules`` (defaults to the loaded brand rules)
         
     Returns:
         dict: Validation results with 'valid' boolean and 'issues' list
     """
-    issues = []
-    
-    # Count hashtags
-    hashtags = [word for word in post.split() if word.startswith('#')]
-    if len(hashtags) < 3 or len(hashtags) > 5:
-        issues.append(f"Hashtag count {len(hashtags)} not in range 3-5")
-    
-    # Check for paragraphs (newlines present)
-    if '\n\n' not in post:
-        issues.append("Missing paragraph structure (no double newlines)")
-    
-    # Word count check
-    word_count = len(post.split())
-    if word_count < 50 or word_count > 350:
-        issues.append(f"Word count {word_count} not in typical range 150-300")
-    
-    return {
-        'valid': len(issues) == 0,
-        'issues': issues,
-        'hashtag_count': len(hashtags),
-        'word_count': word_count
-    }
+    return _validate_one(post, "linkedin", rules, ("hashtag_count", "word_count"))
 
 
-def validate_twitter_post(post: str) -> dict:
+def validate_twitter_post(post: str, rules=None) -> dict:
     """
     Validate Twitter/X post constraints.
     
     Args:
         post: Twitter post text
+        rules: Optional ``BrandRules`` (defaults to the loaded brand rules)
         
     Returns:
         dict: Validation results with 'valid' boolean and 'issues' list
     """
-    issues = []
-    
-    # Character count (strict limit)
-    char_count = twitter_char_count(post)
-    if char_count > 280:
-        issues.append(f"Character count {char_count} exceeds 280 limit")
-    
-    # Count hashtags
-    hashtags = [word for word in post.split() if word.startswith('#')]
-    if len(hashtags) < 2 or len(hashtags) > 3:
-        issues.append(f"Hashtag count {len(hashtags)} not in range 2-3")
-    
-    # Check for paragraphs (should NOT have them)
-    if '\n\n' in post:
-        issues.append("Twitter posts should not have multiple paragraphs")
-    
-    return {
-        'valid': len(issues) == 0,
-        'issues': issues,
-        'char_count': char_count,
-        'hashtag_count': len(hashtags)
-    }
+    return _validate_one(post, "twitter", rules, ("char_count", "hashtag_count"))
 
 
-def validate_instagram_post(post: str) -> dict:
+def validate_instagram_post(post: str, rules=None) -> dict:
     """
     Validate Instagram post constraints.
     
     Args:
         post: Instagram post text (excluding visual suggestion)
+        rules: Optional ``BrandRules`` (defaults to the loaded brand rules)
         
     Returns:
         dict: Validation results with 'valid' boolean and 'issues' list
     """
-    issues = []
-    
-    # Count hashtags
-    hashtags = [word for word in post.split() if word.startswith('#')]
-    if len(hashtags) < 5 or len(hashtags) > 10:
-        issues.append(f"Hashtag count {len(hashtags)} not in range 5-10")
-    
-    # Count emojis
-    emoji_count = sum(1 for c in post if ord(c) > 0x1F300)
-    if emoji_count < 2:
-        issues.append(f"Emoji count {emoji_count} is less than minimum 2")
-    
-    # Word count check
-    word_count = len(post.split())
-    if word_count < 100 or word_count > 180:
-        issues.append(f"Word count {word_count} not in typical range 125-150")
-    
-    # Check for visual suggestion
-    if '[Image:' not in post and '[image:' not in post.lower():
-        issues.append("Missing visual suggestion in [Image: ...] format")
-    
-    return {
-        'valid': len(issues) == 0,
-        'issues': issues,
-        'hashtag_count': len(hashtags),
-        'emoji_count': emoji_count,
-        'word_count': word_count
-    }
+    return _validate_one(post, "instagram", rules, ("hashtag_count", "emoji_count", "word_count"))
 
 
 def format_validation_report(platform: str, validation: dict) -> str:
@@ -155,7 +101,8 @@ def format_validation_report(platform: str, validation: dict) -> str:
     
     # Add metrics
     if 'char_count' in validation:
-        report += f"  Character count: {validation['char_count']}/280\n"
+        limit = load_brand_rules().platform("twitter").max_chars
+        report += f"  Character count: {validation['char_count']}/{limit}\n"
     if 'word_count' in validation:
         report += f"  Word count: {validation['word_count']}\n"
     if 'hashtag_count' in validation:
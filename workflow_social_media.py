@@ -25,7 +25,6 @@ from azure.identity import DefaultAzureCredential
 # Agent Framework imports
 try:
     from agent_framework import Agent, WorkflowEvent, WorkflowRunResult
-    from agent_framework.azure import AzureOpenAIChatClient
     from agent_framework.github import GitHubCopilotAgent
     from agent_framework_orchestrations import GroupChatBuilder
 except ImportError as e:
@@ -38,9 +37,16 @@ except ImportError as e:
 from agents.creator import CREATOR_INSTRUCTIONS
 from agents.reviewer import REVIEWER_INSTRUCTIONS
 from agents.publisher import PUBLISHER_INSTRUCTIONS
+from agents.prompt_registry import get_prompt_registry
 from orchestration.speaker_selection import speaker_selector
 from orchestration.termination import should_terminate
+from orchestration.context_policy import build_context_middleware
+from orchestration.model_router import build_model_routing_middleware
+from orchestration.draft_sampling import build_draft_sampling_middleware
+from orchestration.review_cache import build_review_cache_middleware
+from orchestration.llm_client import create_chat_client, llm_mode
 from grounding.file_search import create_grounded_agent
+from grounding.pitfall_memory import pitfall_section, record_transcript
 from tools.filesystem_mcp import get_filesystem_tools, save_posts_manually, _cleanup_gateway
 from utils.transcript_formatter import format_conversation_transcript, format_workflow_summary
 from utils.markdown_formatter import format_posts_to_markdown
@@ -92,13 +98,9 @@ def build_group_chat():
     # Azure credentials
     credential = DefaultAzureCredential()
     
-    # Azure OpenAI Chat client (for Creator and Publisher)
+    # Chat client (Azure OpenAI, or record / replay / fake per ZAVA_LLM_MODE)
     try:
-        azure_client = AzureOpenAIChatClient(
-            endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-            credential=credential,
-            deployment_name=os.getenv("AZURE_OPENAI_CHAT_DEPLOYMENT_NAME")
-        )
+        azure_client = create_chat_client(credential)
         print("✅ Azure OpenAI client initialized")
     except Exception as e:
         print(f"❌ Failed to initialize Azure OpenAI client: {e}")
@@ -110,15 +112,27 @@ def build_group_chat():
         client=azure_client,
         name="Creator",
         instructions=CREATOR_INSTRUCTIONS,
-        brand_guidelines_path="grounding/brand-guidelines.md"
+        brand_guidelines_path="grounding/brand-guidelines.md",
+        middleware=[
+            *build_model_routing_middleware("Creator"),
+            *build_draft_sampling_middleware("Creator", downstream=build_context_middleware("Creator")),
+        ],
+        brief=CAMPAIGN_BRIEF,
+        pitfalls=pitfall_section()
     )
     
+    # Versioned, cache-friendly prompts for the remaining agents
+    reviewer_prompt = get_prompt_registry().register("Reviewer", REVIEWER_INSTRUCTIONS)
+    publisher_prompt = get_prompt_registry().register("Publisher", PUBLISHER_INSTRUCTIONS)
+
     # Create Reviewer agent (GitHub Copilot)
     print("\n🔍 Creating Reviewer agent...")
     try:
+        if llm_mode() != "live":
+            raise RuntimeError(f"LLM mode '{llm_mode()}' routes every agent through the chat client")
         reviewer = GitHubCopilotAgent(
             name="Reviewer",
-            instructions=REVIEWER_INSTRUCTIONS
+            instructions=reviewer_prompt.text
         )
         print("✅ Reviewer agent created (GitHub Copilot SDK)")
     except Exception as e:
@@ -127,7 +141,12 @@ def build_group_chat():
         reviewer = Agent(
             client=azure_client,
             name="Reviewer",
-            instructions=REVIEWER_INSTRUCTIONS
+            instructions=reviewer_prompt.text,
+            middleware=[
+                *build_model_routing_middleware("Reviewer"),
+                *build_review_cache_middleware("Reviewer"),
+                *build_context_middleware("Reviewer"),
+            ] or None
         )
     
     # Create Publisher agent with MCP filesystem tools
@@ -136,8 +155,9 @@ def build_group_chat():
     publisher = Agent(
         client=azure_client,
         name="Publisher",
-        instructions=PUBLISHER_INSTRUCTIONS,
-        tools=filesystem_tools if filesystem_tools else None
+        instructions=publisher_prompt.text,
+        tools=filesystem_tools if filesystem_tools else None,
+        middleware=[*build_model_routing_middleware("Publisher"), *build_context_middleware("Publisher")] or None
     )
     if not filesystem_tools:
         print("   ℹ️ Publisher will output to console only (no file save)")
@@ -309,6 +329,10 @@ async def run_workflow():
     # Display full transcript
     if messages:
         print(format_conversation_transcript(messages))
+
+    # Remember what the Reviewer sent back, for the next run's Creator
+    if record_transcript((getattr(m, 'author_name', None) or '', getattr(m, 'text', '') or '') for m in messages):
+        print("🧠 Reviewer pitfalls recorded for future Creator prompts")
     
     # Save to file (if not already saved by Publisher via MCP)
     print("\n💾 Saving workflow results...")